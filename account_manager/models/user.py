@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Lower
 
 
 class User(AbstractUser):
@@ -20,6 +21,10 @@ class User(AbstractUser):
     class Meta:
         verbose_name = 'User'
         verbose_name_plural = 'Users'
+        indexes = [
+            # case-insensitive email lookups, e.g. the enrollment import
+            models.Index(Lower('email'), name='user_email_lower_idx'),
+        ]
     
     def __str__(self):
         return self.email 
@@ -7,6 +7,7 @@ class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
+    keyset_ordering = ('id',)
 
     def get_queryset(self):
         if self.action == 'list':
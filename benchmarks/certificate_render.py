@@ -0,0 +1,69 @@
+"""
+Benchmark certificate rendering: raster with and without the per-process render
+cache, and the vector (reportlab) renderer.
+
+"uncached" clears the font and base layer cache before every certificate, which
+is what generate_certificate did before the cache existed. Each mode runs in its
+own process so the reported peak RSS is not shared between them.
+
+Usage:
+    python benchmarks/certificate_render.py [--count 20]
+"""
+import argparse
+import io
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MODES = ('uncached', 'cached', 'vector')
+
+
+def run(mode, count, results):
+    from course_manager.services.certificate_services import CertificateSeriveces
+
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    for index in range(count):
+        output = io.BytesIO()
+        student_name = f'Student {index}'
+        if mode == 'vector':
+            CertificateSeriveces.render_vector_certificate(
+                output, student_name, 'Introduction to Benchmarking', datetime(2025, 5, 1)
+            )
+            continue
+        if mode == 'uncached':
+            CertificateSeriveces.clear_cache()
+        image = CertificateSeriveces.render_certificate(
+            student_name, 'Introduction to Benchmarking', datetime(2025, 5, 1)
+        )
+        image.save(output, 'PDF', resolution=300.0)
+    elapsed = time.perf_counter() - started
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results[mode] = (elapsed / count * 1000, (peak - baseline) / 1024, len(output.getvalue()) / 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=20, help='Certificates rendered per mode')
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context('spawn')
+    results = context.Manager().dict()
+    for mode in MODES:
+        process = context.Process(target=run, args=(mode, args.count, results))
+        process.start()
+        process.join()
+
+    print(f'{"mode":<10} {"ms/certificate":>15} {"peak RSS growth (MB)":>22} {"PDF size (KB)":>14}')
+    for mode in MODES:
+        per_certificate, peak, size = results[mode]
+        print(f'{mode:<10} {per_certificate:>15.1f} {peak:>22.1f} {size:>14.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark GET /api/courses/ latency with per-request, persistent and pooled
+database connections against the Postgres configured in the environment.
+
+Each mode runs in its own process with the matching DB_* settings. Requests go
+through Django's test client; since the client does not run the connection
+cleanup a real server does at the end of a request, the benchmark calls
+close_old_connections() itself, so connections are closed, kept or returned to
+the pool as they would be under gunicorn. Data is seeded into the test database
+(test_<DB_NAME>), which is kept between runs.
+
+Usage:
+    python benchmarks/db_connections.py [--requests 300] [--threads 4] [--courses 10]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+MODES = {
+    'per-request': {'DB_CONN_MAX_AGE': '0', 'DB_POOL_SIZE': '0'},
+    'persistent': {'DB_CONN_MAX_AGE': '60', 'DB_POOL_SIZE': '0'},
+    'pooled': {'DB_CONN_MAX_AGE': '0'},  # DB_POOL_SIZE is set to --threads
+}
+
+
+def run_mode(args):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'eyouth.settings')
+    import django
+    django.setup()
+
+    from django.contrib.auth import get_user_model
+    from django.db import close_old_connections, connection, connections
+    from django.test import Client
+
+    from course_manager.models import Course
+    from eyouth.db_pool.pool import all_metrics
+
+    connection.creation.create_test_db(verbosity=0, keepdb=True)
+    User = get_user_model()
+    student, _ = User.objects.get_or_create(
+        email='bench-student@example.com', defaults={'username': 'bench-student', 'role': 'STUDENT'}
+    )
+    instructor, _ = User.objects.get_or_create(
+        email='bench-instructor@example.com', defaults={'username': 'bench-instructor', 'role': 'INSTRUCTOR'}
+    )
+    for index in range(Course.objects.filter(instructor=instructor).count(), args.courses):
+        Course.objects.create(title=f'Bench Course {index}', description='Benchmark', instructor=instructor)
+    connection.close()
+
+    latencies = []
+    lock = threading.Lock()
+    per_thread = args.requests // args.threads
+
+    def worker():
+        client = Client()
+        client.force_login(student)
+        timings = []
+        for _ in range(per_thread):
+            started = time.perf_counter()
+            response = client.get('/api/courses/')
+            close_old_connections()
+            timings.append((time.perf_counter() - started) * 1000)
+            assert response.status_code == 200, response.status_code
+        connections.close_all()
+        with lock:
+            latencies.extend(timings)
+
+    threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(json.dumps({
+        'mean': statistics.mean(latencies),
+        'p50': latencies[len(latencies) // 2],
+        'p95': latencies[int(len(latencies) * 0.95)],
+        'rps': len(latencies) / elapsed,
+        'pool': {f'{alias}:{name}': metrics for (alias, name), metrics in all_metrics().items()},
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--courses', type=int, default=10)
+    parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args)
+        return
+
+    print(f'{"mode":<12} {"mean ms":>9} {"p50 ms":>9} {"p95 ms":>9} {"req/s":>9}')
+    for mode, overrides in MODES.items():
+        env = {**os.environ, **overrides}
+        if mode == 'pooled':
+            env['DB_POOL_SIZE'] = str(args.threads)
+        output = subprocess.run(
+            [sys.executable, __file__, '--mode', mode, '--requests', str(args.requests),
+             '--threads', str(args.threads), '--courses', str(args.courses)],
+            env=env, cwd=ROOT, check=True, capture_output=True, text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f'{mode:<12} {result["mean"]:>9.2f} {result["p50"]:>9.2f} {result["p95"]:>9.2f} {result["rps"]:>9.1f}')
+        for name, metrics in result['pool'].items():
+            print(f'{"":<12} pool {name}: {metrics}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,33 +1,50 @@
 from django.contrib import admin
 from django.contrib import admin
+from django.contrib.postgres.search import SearchQuery
 
 from course_manager.models.course import Course
 from course_manager.models.module import Module
 from course_manager.models.lesson import Lesson
 from course_manager.models.enrollment import Enrollment, LessonProgress
-from course_manager.models.certificate import Certificate
+from course_manager.models.certificate import Certificate, CertificateRenderJob
+from course_manager.models.course_stats import CourseDailyStats
+from course_manager.services.search_services import SearchServices
+
+
+class FullTextSearchMixin:
+    """
+    Admin search that matches the long text fields through the indexed search_vector;
+    search_fields only lists the short ones, which are still matched with icontains.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if search_term:
+            query = SearchQuery(search_term, search_type='websearch', config=SearchServices.config)
+            results = results | queryset.filter(search_vector=query)
+        return results, may_have_duplicates
 
 @admin.register(Course)
-class CourseAdmin(admin.ModelAdmin):
+class CourseAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ('title', 'instructor', 'is_published', 'created_at', 'updated_at')
     list_filter = ('is_published', 'created_at', 'instructor')
-    search_fields = ('title', 'description', 'instructor__email')
+    search_fields = ('title', 'instructor__email')
     date_hierarchy = 'created_at'
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('created_at', 'updated_at', 'lesson_count')
 
 @admin.register(Module)
-class ModuleAdmin(admin.ModelAdmin):
+class ModuleAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ('title', 'course', 'order', 'created_at')
     list_filter = ('course', 'created_at')
-    search_fields = ('title', 'description', 'course__title')
+    search_fields = ('title', 'course__title')
     ordering = ('course', 'order')
     readonly_fields = ('created_at', 'updated_at')
 
 @admin.register(Lesson)
-class LessonAdmin(admin.ModelAdmin):
+class LessonAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ('title', 'module', 'content_type', 'order', 'created_at')
-    list_filter = ('content_type', 'created_at', 'module__course')
-    search_fields = ('title', 'content', 'module__title')
+    list_filter = ('content_type', 'created_at', 'course')
+    search_fields = ('title', 'module__title')
     ordering = ('module', 'order')
     readonly_fields = ('created_at', 'updated_at')
 
@@ -36,8 +53,7 @@ class EnrollmentAdmin(admin.ModelAdmin):
     list_display = ('student', 'course', 'enrolled_at', 'completed', 'completed_at')
     list_filter = ('completed', 'enrolled_at', 'completed_at')
     search_fields = ('student__email', 'course__title')
-    date_hierarchy = 'enrolled_at'
-    readonly_fields = ('enrolled_at',)
+    readonly_fields = ('enrolled_at', 'completed_lesson_count')
 
 @admin.register(LessonProgress)
 class LessonProgressAdmin(admin.ModelAdmin):
@@ -48,8 +64,24 @@ class LessonProgressAdmin(admin.ModelAdmin):
 
 @admin.register(Certificate)
 class CertificateAdmin(admin.ModelAdmin):
-    list_display = ('enrollment', 'issued_at')
-    list_filter = ('issued_at',)
+    list_display = ('enrollment', 'issued_at', 'status', 'rendered_at')
+    list_filter = ('status', 'issued_at')
     search_fields = ('enrollment__student__email', 'enrollment__course__title')
-    readonly_fields = ('issued_at',)
-    date_hierarchy = 'issued_at' 
+    readonly_fields = ('issued_at', 'rendered_at')
+
+@admin.register(CertificateRenderJob)
+class CertificateRenderJobAdmin(admin.ModelAdmin):
+    list_display = ('certificate', 'attempts', 'run_after', 'locked_at', 'created_at')
+    list_filter = ('attempts',)
+    search_fields = ('certificate__enrollment__student__email',)
+    readonly_fields = ('created_at', 'last_error')
+
+@admin.register(CourseDailyStats)
+class CourseDailyStatsAdmin(admin.ModelAdmin):
+    # per-day reporting reads the rollups; the raw tables have no date_hierarchy
+    list_display = ('course', 'date', 'enrollments', 'lesson_completions', 'certificates_issued')
+    list_filter = ('date',)
+    search_fields = ('course__title',)
+    date_hierarchy = 'date'
+    readonly_fields = ('course', 'date', 'enrollments', 'lesson_completions', 'certificates_issued')
+
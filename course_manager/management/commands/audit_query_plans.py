@@ -0,0 +1,77 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from course_manager.services.plan_audit_services import PlanAuditServices
+
+
+class Command(BaseCommand):
+    help = (
+        'Run the hot viewset actions and service calls, replay the SQL they send under EXPLAIN (ANALYZE, BUFFERS) '
+        'and report sequential scans, missing indexes and row-estimate errors. Everything runs in a transaction '
+        'that is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', action='store_true',
+                            help='Audit against a synthetic catalogue inserted for the run (rolled back afterwards)')
+        parser.add_argument('--courses', type=int, default=20, help='Seeded courses')
+        parser.add_argument('--students', type=int, default=2000, help='Seeded students, enrolled in 5 courses each')
+        parser.add_argument('--min-rows', type=int, default=PlanAuditServices.min_rows,
+                            help='Report sequential scans reading at least this many rows')
+        parser.add_argument('--only', action='append', help='Audit only this call, e.g. lesson.complete (repeatable)')
+        parser.add_argument('--output', help='Write the JSON report to this path')
+        parser.add_argument('--compare', help='A previous JSON report to diff the findings and timings against')
+        parser.add_argument('--fail-on-new', action='store_true',
+                            help='Exit with an error when --compare finds findings the previous report did not have')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('The plan audit needs PostgreSQL')
+        with transaction.atomic():
+            seeded = PlanAuditServices.seed(courses=options['courses'], students=options['students']) \
+                if options['seed'] else None
+            sample = PlanAuditServices.sample()
+            if sample is None:
+                raise CommandError('No courses or users to audit; pass --seed to audit a synthetic catalogue')
+            calls = PlanAuditServices.calls(*sample)
+            if options['only']:
+                unknown = set(options['only']) - set(calls)
+                if unknown:
+                    raise CommandError(f"Unknown call names: {', '.join(sorted(unknown))}")
+                calls = {name: calls[name] for name in options['only']}
+            queries = PlanAuditServices.audit(calls, options['min_rows'])
+            transaction.set_rollback(True)
+
+        report = {'server_version': connection.pg_version, 'seed': seeded, 'queries': queries}
+        for name, entry in queries.items():
+            if 'error' in entry:
+                self.stdout.write(self.style.WARNING(f"{name}: failed on replay: {entry['error']}"))
+                continue
+            style = self.style.WARNING if entry['findings'] else self.style.SUCCESS
+            self.stdout.write(style(f"{name}: {entry['execution_ms']} ms, {len(entry['findings'])} findings"))
+            for finding in entry['findings']:
+                self.stdout.write('    ' + ', '.join(f'{key}={value}' for key, value in finding.items()))
+        if options['output']:
+            with open(options['output'], 'w') as report_file:
+                json.dump(report, report_file, indent=2, sort_keys=True)
+            self.stdout.write(f"Report written to {options['output']}")
+
+        if options['compare']:
+            with open(options['compare']) as previous_file:
+                changes = PlanAuditServices.compare(json.load(previous_file)['queries'], queries)
+            new = 0
+            for name, change in changes.items():
+                if 'status' in change:
+                    self.stdout.write(f"{name}: {change['status']}")
+                    continue
+                new += len(change['new'])
+                for finding in change['new']:
+                    self.stdout.write(self.style.ERROR(f'{name}: new {finding}'))
+                for finding in change['resolved']:
+                    self.stdout.write(self.style.SUCCESS(f'{name}: resolved {finding}'))
+                if change['time_ratio'] and change['time_ratio'] >= 2 and queries[name]['execution_ms'] >= 1:
+                    self.stdout.write(self.style.WARNING(f"{name}: {change['time_ratio']}x slower"))
+            if new and options['fail_on_new']:
+                raise CommandError(f'{new} new plan findings since {options["compare"]}')
@@ -0,0 +1,40 @@
+import csv
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from course_manager.models.course import Course
+from course_manager.services.enrollment_import_services import EnrollmentImportServices
+
+
+class Command(BaseCommand):
+    help = 'Enroll students in a course from a CSV or JSON list of emails, reporting progress after every batch'
+
+    def add_arguments(self, parser):
+        parser.add_argument('course', type=int, help='Course id')
+        parser.add_argument('path', help="CSV or JSON file of student emails ('-' reads stdin)")
+        parser.add_argument('--format', choices=['csv', 'json'],
+                            help='Input format (default: from the file extension, else csv)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Emails resolved and enrolled per batch')
+
+    def handle(self, *args, **options):
+        course = Course.objects.filter(pk=options['course']).first()
+        if course is None:
+            raise CommandError(f"Course {options['course']} does not exist")
+        path = options['path']
+        file_format = options['format'] or ('json' if path.lower().endswith('.json') else 'csv')
+
+        source = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8-sig')
+        try:
+            emails = EnrollmentImportServices.read_emails(source, file_format)
+            for totals in EnrollmentImportServices.import_emails(course, emails, batch_size=options['batch_size']):
+                self.stdout.write(
+                    f"{totals['processed']} processed: {totals['created']} created, {totals['existing']} existing, "
+                    f"{totals['unknown']} unknown, {totals['skipped']} skipped"
+                )
+        except (ValueError, csv.Error) as error:
+            raise CommandError(f'Could not read {path}: {error}')
+        finally:
+            if source is not sys.stdin:
+                source.close()
+        self.stdout.write(self.style.SUCCESS(f"Enrolled {totals['created']} students in {course.title}"))
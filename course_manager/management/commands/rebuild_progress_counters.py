@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from course_manager.services.progress_services import ProgressCounterServices
+
+
+class Command(BaseCommand):
+    help = 'Rebuild Course.lesson_count and Enrollment.completed_lesson_count from the lesson and progress tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows updated per transaction')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        courses = ProgressCounterServices.rebuild_course_counters(batch_size=batch_size)
+        self.stdout.write(f'Rebuilt lesson counters for {courses} courses')
+        enrollments = ProgressCounterServices.rebuild_enrollment_counters(batch_size=batch_size)
+        self.stdout.write(f'Rebuilt progress counters for {enrollments} enrollments')
+        self.stdout.write(self.style.SUCCESS('Progress counters rebuilt'))
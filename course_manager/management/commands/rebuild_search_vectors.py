@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from course_manager.services.search_services import SearchServices
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search vectors of courses, modules and lessons, e.g. after bulk updates that skip signals'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows updated per statement')
+
+    def handle(self, *args, **options):
+        for model in SearchServices.documents:
+            rows = SearchServices.rebuild_vectors(model, batch_size=options['batch_size'])
+            self.stdout.write(f'Rebuilt search vectors for {rows} {model._meta.verbose_name_plural}')
+        self.stdout.write(self.style.SUCCESS('Search vectors rebuilt'))
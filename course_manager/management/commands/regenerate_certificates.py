@@ -0,0 +1,125 @@
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import as_completed
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from course_manager.models.certificate import Certificate
+from course_manager.services.certificate_queue_services import regenerate_certificate, render_pool
+
+
+class Command(BaseCommand):
+    help = (
+        'Regenerate certificate files on a process pool. Progress is checkpointed after every chunk, '
+        'so an interrupted run continues where it stopped when started again with the same filters.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', type=int, action='append', dest='courses', help='Course id (repeatable)')
+        parser.add_argument('--issued-from', type=date.fromisoformat, help='Only certificates issued on or after YYYY-MM-DD')
+        parser.add_argument('--issued-to', type=date.fromisoformat, help='Only certificates issued on or before YYYY-MM-DD')
+        parser.add_argument('--all', action='store_true', help='Regenerate every certificate')
+        parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count(),
+                            help='Rendering processes; 0 renders in this process')
+        parser.add_argument('--chunk-size', type=int, default=0,
+                            help='Certificates in flight per checkpoint (default: 4 per worker)')
+        parser.add_argument('--max-tasks-per-child', type=int, default=200,
+                            help='Recycle a worker process after this many certificates to bound its memory')
+        parser.add_argument('--checkpoint', default='regenerate_certificates.checkpoint.json',
+                            help='Checkpoint file path')
+        parser.add_argument('--restart', action='store_true', help='Ignore an existing checkpoint')
+
+    def handle(self, *args, **options):
+        filters = {
+            'courses': sorted(options['courses'] or []),
+            'issued_from': options['issued_from'].isoformat() if options['issued_from'] else None,
+            'issued_to': options['issued_to'].isoformat() if options['issued_to'] else None,
+        }
+        if not options['all'] and not any(filters.values()):
+            raise CommandError('Pass --course, --issued-from/--issued-to or --all')
+
+        checkpoint = self._load_checkpoint(options['checkpoint'], filters, options['restart'])
+        queryset = self._queryset(filters)
+        remaining = queryset.filter(pk__gt=checkpoint['last_pk']).count()
+        if checkpoint['last_pk']:
+            self.stdout.write(f"Resuming after certificate {checkpoint['last_pk']} ({checkpoint['done']} already done)")
+        self.stdout.write(f'{remaining} certificates to regenerate')
+
+        workers = options['workers']
+        chunk_size = options['chunk_size'] or max(workers, 1) * 4
+        pool = render_pool(workers, options['max_tasks_per_child']) if workers else None
+        started = time.monotonic()
+        processed = 0
+        try:
+            while True:
+                ids = list(
+                    queryset.filter(pk__gt=checkpoint['last_pk']).order_by('pk').values_list('pk', flat=True)[:chunk_size]
+                )
+                if not ids:
+                    break
+                checkpoint['failed'].extend(self._regenerate_chunk(pool, ids))
+                checkpoint['last_pk'] = ids[-1]
+                checkpoint['done'] += len(ids)
+                self._save_checkpoint(options['checkpoint'], checkpoint)
+
+                processed += len(ids)
+                rate = processed / max(time.monotonic() - started, 1e-6)
+                eta = (remaining - processed) / rate if rate else 0
+                self.stdout.write(f'{processed}/{remaining} certificates, {rate:.1f}/s, ETA {eta:.0f}s')
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        if checkpoint['failed']:
+            self.stderr.write(self.style.ERROR(
+                f"{len(checkpoint['failed'])} certificates failed: {', '.join(map(str, checkpoint['failed']))}"
+            ))
+        if os.path.exists(options['checkpoint']):
+            os.remove(options['checkpoint'])
+        self.stdout.write(self.style.SUCCESS(f"Regenerated {checkpoint['done'] - len(checkpoint['failed'])} certificates"))
+
+    def _queryset(self, filters):
+        queryset = Certificate.objects.all()
+        if filters['courses']:
+            queryset = queryset.filter(enrollment__course__in=filters['courses'])
+        if filters['issued_from']:
+            queryset = queryset.filter(issued_at__date__gte=filters['issued_from'])
+        if filters['issued_to']:
+            queryset = queryset.filter(issued_at__date__lte=filters['issued_to'])
+        return queryset
+
+    def _regenerate_chunk(self, pool, ids):
+        failed = []
+        if pool is None:
+            for certificate_id in ids:
+                try:
+                    regenerate_certificate(certificate_id)
+                except Exception as error:
+                    self.stderr.write(f'Certificate {certificate_id} failed: {error}')
+                    failed.append(certificate_id)
+            return failed
+        futures = {pool.submit(regenerate_certificate, certificate_id): certificate_id for certificate_id in ids}
+        for future in as_completed(futures):
+            if future.exception() is not None:
+                self.stderr.write(f'Certificate {futures[future]} failed: {future.exception()}')
+                failed.append(futures[future])
+        return failed
+
+    def _load_checkpoint(self, path, filters, restart):
+        empty = {'filters': filters, 'last_pk': 0, 'done': 0, 'failed': []}
+        if restart or not os.path.exists(path):
+            return empty
+        with open(path) as checkpoint_file:
+            checkpoint = json.load(checkpoint_file)
+        if checkpoint['filters'] != filters:
+            raise CommandError(f'{path} was written for different filters; pass --restart to discard it')
+        return checkpoint
+
+    def _save_checkpoint(self, path, checkpoint):
+        # write-then-rename so an interrupted run never leaves a truncated checkpoint
+        with open(f'{path}.tmp', 'w') as checkpoint_file:
+            json.dump(checkpoint, checkpoint_file)
+        os.replace(f'{path}.tmp', path)
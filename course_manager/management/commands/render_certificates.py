@@ -0,0 +1,56 @@
+import multiprocessing
+import time
+import traceback
+from concurrent.futures import as_completed
+
+from django.core.management.base import BaseCommand
+
+from course_manager.services.certificate_queue_services import (
+    CertificateQueueServices,
+    render_certificate_job,
+    render_pool,
+)
+
+
+class Command(BaseCommand):
+    help = 'Render queued certificates on a process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count(),
+                            help='Rendering processes; 0 renders in this process')
+        parser.add_argument('--batch-size', type=int, default=0, help='Jobs claimed per round (default: 2 per worker)')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--once', action='store_true', help='Exit when no jobs are due')
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        batch_size = options['batch_size'] or max(workers, 1) * 2
+        pool = render_pool(workers) if workers else None
+        try:
+            while True:
+                job_ids = CertificateQueueServices.claim_jobs(batch_size)
+                if not job_ids:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+                if pool is None:
+                    for job_id in job_ids:
+                        self._run(job_id, lambda job_id=job_id: render_certificate_job(job_id))
+                else:
+                    futures = {pool.submit(render_certificate_job, job_id): job_id for job_id in job_ids}
+                    for future in as_completed(futures):
+                        self._run(futures[future], future.result)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    def _run(self, job_id, result):
+        try:
+            result()
+        except Exception:
+            exhausted = CertificateQueueServices.fail(job_id, traceback.format_exc())
+            state = 'giving up' if exhausted else 'will retry'
+            self.stderr.write(self.style.ERROR(f'Certificate job {job_id} failed, {state}'))
+        else:
+            self.stdout.write(f'Rendered certificate job {job_id}')
@@ -0,0 +1,29 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from course_manager.services.course_stats_services import CourseStatsServices
+
+
+class Command(BaseCommand):
+    help = 'Roll Enrollment, LessonProgress and Certificate rows up into CourseDailyStats, from the last watermark'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lag', type=int, default=300,
+                            help='Seconds behind now to stop at, so rows of in-flight transactions are not skipped')
+        parser.add_argument('--interval', type=int, default=0,
+                            help='Keep running, rolling up every this many seconds (default: run once)')
+        parser.add_argument('--rebuild', action='store_true', help='Drop the rollups and rebuild them from scratch')
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            CourseStatsServices.reset()
+        while True:
+            start, until, rows = CourseStatsServices.roll_up(until=timezone.now() - timedelta(seconds=options['lag']))
+            self.stdout.write(f'Rolled up {start:%Y-%m-%d %H:%M} to {until:%Y-%m-%d %H:%M}: {rows} course days')
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS('Course stats rolled up'))
@@ -0,0 +1,43 @@
+# Generated by Django 5.0.2 on 2026-10-18 07:45
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Course = apps.get_model('course_manager', 'Course')
+    Enrollment = apps.get_model('course_manager', 'Enrollment')
+    Lesson = apps.get_model('course_manager', 'Lesson')
+    LessonProgress = apps.get_model('course_manager', 'LessonProgress')
+
+    lessons = Lesson.objects.filter(module__course=OuterRef('pk')).order_by().values('module__course').annotate(
+        total=Count('pk')
+    ).values('total')
+    Course.objects.update(lesson_count=Coalesce(Subquery(lessons, output_field=IntegerField()), Value(0)))
+
+    progress = LessonProgress.objects.filter(enrollment=OuterRef('pk')).order_by().values('enrollment').annotate(
+        total=Count('pk')
+    ).values('total')
+    Enrollment.objects.update(completed_lesson_count=Coalesce(Subquery(progress, output_field=IntegerField()), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course_manager', '0002_remove_lessonprogress_completed_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='lesson_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='enrollment',
+            name='completed_lesson_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
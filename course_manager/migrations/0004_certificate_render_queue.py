@@ -0,0 +1,50 @@
+# Generated by Django 5.0.2 on 2026-10-18 07:50
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def mark_rendered_certificates_ready(apps, schema_editor):
+    # certificates issued before the queue existed were rendered synchronously
+    Certificate = apps.get_model('course_manager', 'Certificate')
+    Certificate.objects.exclude(certificate_file='').exclude(certificate_file__isnull=True).update(
+        status='READY', rendered_at=F('issued_at')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course_manager', '0003_progress_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificate',
+            name='rendered_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='certificate',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('RENDERING', 'Rendering'), ('READY', 'Ready'), ('FAILED', 'Failed')], default='PENDING', max_length=10),
+        ),
+        migrations.CreateModel(
+            name='CertificateRenderJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('certificate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='render_jobs', to='course_manager.certificate')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['run_after'], name='cert_job_run_after_idx')],
+            },
+        ),
+        migrations.RunPython(mark_rendered_certificates_ready, migrations.RunPython.noop),
+    ]
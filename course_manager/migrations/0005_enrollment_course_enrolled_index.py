@@ -0,0 +1,19 @@
+# Generated by Django 5.0.2 on 2026-10-18 08:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course_manager', '0004_certificate_render_queue'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['course', 'enrolled_at'], name='enrollment_course_enrolled_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.2 on 2026-10-18 08:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course_manager', '0005_enrollment_course_enrolled_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='certificate',
+            index=models.Index(fields=['issued_at', 'id'], name='certificate_issued_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['created_at', 'id'], name='course_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lesson',
+            index=models.Index(fields=['order', 'id'], name='lesson_order_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='module',
+            index=models.Index(fields=['order', 'id'], name='module_order_id_idx'),
+        ),
+    ]
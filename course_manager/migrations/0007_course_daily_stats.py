@@ -0,0 +1,75 @@
+# Generated by Django 5.0.2 on 2026-10-18 08:34
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_completed_at(apps, schema_editor):
+    # completions recorded before completed_at was always set have no time; date them
+    # at the enrollment, the earliest they can have happened, so they are rolled up
+    Enrollment = apps.get_model('course_manager', 'Enrollment')
+    LessonProgress = apps.get_model('course_manager', 'LessonProgress')
+    enrolled_at = Enrollment.objects.filter(pk=OuterRef('enrollment')).values('enrolled_at')
+    LessonProgress.objects.filter(completed_at__isnull=True).update(completed_at=Subquery(enrolled_at))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course_manager', '0006_keyset_pagination_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('enrollments', models.PositiveIntegerField(default=0)),
+                ('lesson_completions', models.PositiveIntegerField(default=0)),
+                ('certificates_issued', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'Course daily stats',
+            },
+        ),
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('value', models.DateTimeField()),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='lessonprogress',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, default=django.utils.timezone.now, null=True),
+        ),
+        migrations.RunPython(backfill_completed_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['enrolled_at'], name='enrollment_enrolled_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lessonprogress',
+            index=models.Index(fields=['completed_at'], name='lessonprogress_completed_idx'),
+        ),
+        migrations.AddField(
+            model_name='coursedailystats',
+            name='course',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='course_manager.course'),
+        ),
+        migrations.AddIndex(
+            model_name='coursedailystats',
+            index=models.Index(fields=['date'], name='course_daily_stats_date_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='coursedailystats',
+            unique_together={('course', 'date')},
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.0.2 on 2026-10-18 08:39
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+# kept in step with SearchServices.documents
+DOCUMENTS = {
+    'Course': (('title', 'A'), ('description', 'B')),
+    'Module': (('title', 'A'), ('description', 'B')),
+    'Lesson': (('title', 'A'), ('content', 'B')),
+}
+
+
+def backfill_search_vectors(apps, schema_editor):
+    # one UPDATE per table, before the GIN indexes are built over the filled column
+    for model_name, fields in DOCUMENTS.items():
+        vector = None
+        for field, weight in fields:
+            part = SearchVector(field, weight=weight, config='english')
+            vector = part if vector is None else vector + part
+        apps.get_model('course_manager', model_name).objects.update(search_vector=vector)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course_manager', '0007_course_daily_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='lesson',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='module',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_search_vectors, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='course',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='course_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lesson',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='lesson_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='module',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='module_search_idx'),
+        ),
+    ]
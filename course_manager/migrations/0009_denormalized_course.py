@@ -0,0 +1,58 @@
+# Generated by Django 5.0.2 on 2026-10-18 09:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_course(apps, schema_editor):
+    # one UPDATE per table; Lesson.save and LessonProgress.save keep the copies in step from here on
+    Module = apps.get_model('course_manager', 'Module')
+    Lesson = apps.get_model('course_manager', 'Lesson')
+    Enrollment = apps.get_model('course_manager', 'Enrollment')
+    LessonProgress = apps.get_model('course_manager', 'LessonProgress')
+    Lesson.objects.update(course=Subquery(Module.objects.filter(pk=OuterRef('module')).values('course')[:1]))
+    LessonProgress.objects.update(
+        course=Subquery(Enrollment.objects.filter(pk=OuterRef('enrollment')).values('course')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course_manager', '0008_full_text_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lesson',
+            name='course',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='lessons', to='course_manager.course'),
+        ),
+        migrations.AddField(
+            model_name='lessonprogress',
+            name='course',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='course_manager.course'),
+        ),
+        migrations.RunPython(backfill_course, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='lesson',
+            name='course',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='lessons', to='course_manager.course'),
+        ),
+        migrations.AlterField(
+            model_name='lessonprogress',
+            name='course',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, to='course_manager.course'),
+        ),
+        migrations.AddIndex(
+            model_name='lesson',
+            index=models.Index(fields=['course', 'order'], name='lesson_course_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lessonprogress',
+            index=models.Index(fields=['course', 'enrollment'], name='lessonprogress_course_enr_idx'),
+        ),
+    ]
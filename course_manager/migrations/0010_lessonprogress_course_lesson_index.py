@@ -0,0 +1,17 @@
+# Generated by Django 5.0.2 on 2026-10-18 09:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course_manager', '0009_denormalized_course'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='lessonprogress',
+            index=models.Index(fields=['course', 'lesson'], name='lessonprogress_course_les_idx'),
+        ),
+    ]
@@ -2,7 +2,8 @@ from .course import Course
 from .module import Module
 from .lesson import Lesson
 from .enrollment import Enrollment, LessonProgress
-from .certificate import Certificate
+from .certificate import Certificate, CertificateRenderJob
+from .course_stats import CourseDailyStats, RollupWatermark
 
 __all__ = [
     'Course',
@@ -10,5 +11,8 @@ __all__ = [
     'Lesson',
     'Enrollment',
     'LessonProgress',
-    'Certificate'
+    'Certificate',
+    'CertificateRenderJob',
+    'CourseDailyStats',
+    'RollupWatermark',
 ] 
@@ -1,10 +1,45 @@
 from django.db import models
+from django.utils import timezone
 from course_manager.models.enrollment import Enrollment
 
 class Certificate(models.Model):
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        RENDERING = 'RENDERING', 'Rendering'
+        READY = 'READY', 'Ready'
+        FAILED = 'FAILED', 'Failed'
+
     enrollment = models.OneToOneField(Enrollment, on_delete=models.CASCADE, related_name='certificate')
     issued_at = models.DateTimeField(auto_now_add=True)
     certificate_file = models.FileField(upload_to='certificates/', null=True, blank=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    rendered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # keyset pagination key of CertificateViewSet
+            models.Index(fields=['issued_at', 'id'], name='certificate_issued_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.enrollment.student.email} - {self.enrollment.course.title} Certificate" 
+
+class CertificateRenderJob(models.Model):
+    """
+    A queued rendering of a certificate file, consumed by the render_certificates worker.
+    The row is deleted once the certificate is rendered.
+    """
+    certificate = models.ForeignKey(Certificate, on_delete=models.CASCADE, related_name='render_jobs')
+    attempts = models.PositiveIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['run_after'], name='cert_job_run_after_idx'),
+        ]
+
+    def __str__(self):
+        return f"Render job for certificate {self.certificate_id}"
@@ -1,10 +1,27 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import Exists, OuterRef, Subquery
 from django.conf import settings
 
-from course_manager.models.enrollment import LessonProgress
-from course_manager.models.lesson import Lesson
+from course_manager.models.enrollment import Enrollment
+from course_manager.models.mixins import CounterFieldsMixin
 
-class Course(models.Model):
+class CourseQuerySet(models.QuerySet):
+
+    def with_progress(self, user):
+        """
+        Annotate each course with the user's enrollment flag and completed lesson count
+        so progress can be serialized without per-row queries.
+        """
+        enrollment = Enrollment.objects.filter(course=OuterRef('pk'), student=user)
+        return self.annotate(
+            user_enrolled=Exists(enrollment),
+            user_completed_lesson_count=Subquery(enrollment.values('completed_lesson_count')[:1]),
+        )
+
+
+class Course(CounterFieldsMixin, models.Model):
     title = models.CharField(max_length=255)
     description = models.TextField()
     instructor = models.ForeignKey(
@@ -16,11 +33,32 @@ class Course(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_published = models.BooleanField(default=False)
     thumbnail = models.ImageField(upload_to='course_thumbnails/', null=True, blank=True)
+    lesson_count = models.PositiveIntegerField(default=0, editable=False)
+    # maintained by course_manager.signals.search_signals, see SearchServices
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    counter_fields = ('lesson_count',)
+
+    objects = CourseQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # keyset pagination key of CourseViewSet
+            models.Index(fields=['created_at', 'id'], name='course_created_id_idx'),
+            GinIndex(fields=['search_vector'], name='course_search_idx'),
+        ]
 
     def __str__(self):
         return self.title 
     
     def get_progress(self, user):
-        lessons = Lesson.objects.filter(module__course=self).count()
-        completed_lessons = LessonProgress.objects.filter(enrollment__student=user, lesson__module__course=self).count()
+        counters = Enrollment.objects.filter(course=self, student=user).values_list(
+            'completed_lesson_count', 'course__lesson_count'
+        ).first()
+        if counters is None:
+            return 0
+        return self.calculate_progress(*counters)
+
+    @staticmethod
+    def calculate_progress(completed_lessons, lessons):
         return completed_lessons / lessons * 100 if lessons > 0 else 0
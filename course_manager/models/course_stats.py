@@ -0,0 +1,33 @@
+from django.db import models
+
+
+class CourseDailyStats(models.Model):
+    """
+    Per-course, per-day (UTC) counts rolled up from Enrollment, LessonProgress and
+    Certificate by the rollup_course_stats command; reporting reads these instead
+    of the raw tables.
+    """
+    course = models.ForeignKey("course_manager.Course", on_delete=models.CASCADE, related_name='daily_stats')
+    date = models.DateField()
+    enrollments = models.PositiveIntegerField(default=0)
+    lesson_completions = models.PositiveIntegerField(default=0)
+    certificates_issued = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ['course', 'date']
+        indexes = [
+            models.Index(fields=['date'], name='course_daily_stats_date_idx'),
+        ]
+        verbose_name_plural = 'Course daily stats'
+
+    def __str__(self):
+        return f"{self.course_id} - {self.date}"
+
+
+class RollupWatermark(models.Model):
+    """How far a rollup has read its source tables; rows before `value` are rolled up."""
+    name = models.CharField(max_length=50, unique=True)
+    value = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
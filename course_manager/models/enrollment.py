@@ -1,7 +1,9 @@
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 from django.conf import settings
+from course_manager.models.mixins import CounterFieldsMixin
 
-class Enrollment(models.Model):
+class Enrollment(CounterFieldsMixin, models.Model):
     student = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -11,9 +13,18 @@ class Enrollment(models.Model):
     enrolled_at = models.DateTimeField(auto_now_add=True)
     completed = models.BooleanField(default=False)
     completed_at = models.DateTimeField(null=True, blank=True)
+    completed_lesson_count = models.PositiveIntegerField(default=0, editable=False)
+
+    counter_fields = ('completed_lesson_count',)
 
     class Meta:
         unique_together = ['student', 'course']
+        indexes = [
+            # CourseViewSet.enrollments: a course's enrollments ordered and filtered by enrolled_at
+            models.Index(fields=['course', 'enrolled_at'], name='enrollment_course_enrolled_idx'),
+            # rollup_course_stats reads enrollments by time
+            models.Index(fields=['enrolled_at'], name='enrollment_enrolled_idx'),
+        ]
 
     def __str__(self):
         return f"{self.student.email} - {self.course.title}"
@@ -21,10 +32,27 @@ class Enrollment(models.Model):
 class LessonProgress(models.Model):
     enrollment = models.ForeignKey(Enrollment, on_delete=models.CASCADE, related_name='lesson_progress')
     lesson = models.ForeignKey("course_manager.Lesson", on_delete=models.CASCADE)
-    completed_at = models.DateTimeField(null=True, blank=True)
+    # copy of enrollment.course_id, set on save, so per-course progress filters need no join
+    course = models.ForeignKey("course_manager.Course", on_delete=models.CASCADE, editable=False)
+    completed_at = models.DateTimeField(null=True, blank=True, default=timezone.now)
 
     class Meta:
         unique_together = ['enrollment', 'lesson']
+        indexes = [
+            # rollup_course_stats reads completions by time
+            models.Index(fields=['completed_at'], name='lessonprogress_completed_idx'),
+            # a course's progress rows per enrollment (progress, funnel, export)
+            models.Index(fields=['course', 'enrollment'], name='lessonprogress_course_enr_idx'),
+            # a course's completions per lesson (funnel)
+            models.Index(fields=['course', 'lesson'], name='lessonprogress_course_les_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.enrollment.student.email} - {self.lesson.title}" 
+        return f"{self.enrollment.student.email} - {self.lesson.title}"
+
+    def save(self, *args, **kwargs):
+        self.course_id = self.enrollment.course_id
+        # post_save updates Enrollment.completed_lesson_count; keep both writes in one transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
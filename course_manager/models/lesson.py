@@ -1,6 +1,17 @@
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
+from django.db.models import F
 from course_manager.models.module import Module
 
+
+class LessonQuerySet(models.QuerySet):
+
+    def with_instructor_id(self):
+        """Annotate the course's instructor_id so ownership checks need no extra queries."""
+        return self.annotate(instructor_id=F('course__instructor_id'))
+
+
 class Lesson(models.Model):
     class ContentType(models.TextChoices):
         VIDEO = 'VIDEO', 'Video'
@@ -8,6 +19,8 @@ class Lesson(models.Model):
         TEXT = 'TEXT', 'Text'
 
     module = models.ForeignKey(Module, on_delete=models.CASCADE, related_name='lessons')
+    # copy of module.course_id, set on save, so per-course lesson filters need no join
+    course = models.ForeignKey('course_manager.Course', on_delete=models.CASCADE, related_name='lessons', editable=False)
     title = models.CharField(max_length=255)
     content_type = models.CharField(max_length=5, choices=ContentType.choices)
     content = models.TextField(blank=True)
@@ -16,13 +29,37 @@ class Lesson(models.Model):
     order = models.PositiveIntegerField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # maintained by course_manager.signals.search_signals, see SearchServices
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # the course a save moved this lesson from, set by save() for the counter and outline signals
+    moved_from_course_id = None
+
+    objects = LessonQuerySet.as_manager()
 
     class Meta:
         ordering = ['order']
         unique_together = ['module', 'order']
+        indexes = [
+            # keyset pagination key of LessonViewSet
+            models.Index(fields=['order', 'id'], name='lesson_order_id_idx'),
+            # a course's lessons in order (funnel, progress, completion batches)
+            models.Index(fields=['course', 'order'], name='lesson_course_order_idx'),
+            GinIndex(fields=['search_vector'], name='lesson_search_idx'),
+        ]
 
     def __str__(self):
         return f"{self.module.title} - {self.title}" 
+
+    def save(self, *args, **kwargs):
+        self.course_id = self.module.course_id
+        # post_save updates Course.lesson_count; keep both writes in one transaction
+        with transaction.atomic():
+            previous = None if self._state.adding else (
+                Lesson.objects.filter(pk=self.pk).values_list('course_id', flat=True).first()
+            )
+            self.moved_from_course_id = previous if previous != self.course_id else None
+            super().save(*args, **kwargs)
     
     @property
     def instructor(self):
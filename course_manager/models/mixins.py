@@ -0,0 +1,23 @@
+from django.db import models
+
+
+class CounterFieldsMixin(models.Model):
+    """
+    Keeps denormalized counter columns out of full-row saves.
+
+    Counter fields listed in ``counter_fields`` are maintained with ``F()``
+    updates by the progress counter signals, so an in-memory instance may hold
+    a stale value. Saving such an instance must not overwrite the counter.
+    """
+    counter_fields = ()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
@@ -1,4 +1,16 @@
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+
+class ModuleQuerySet(models.QuerySet):
+
+    def with_instructor_id(self):
+        """Annotate the course's instructor_id so ownership checks need no extra queries."""
+        return self.annotate(instructor_id=F('course__instructor_id'))
+
 
 class Module(models.Model):
     course = models.ForeignKey("course_manager.Course", on_delete=models.CASCADE, related_name='modules')
@@ -7,14 +19,43 @@ class Module(models.Model):
     order = models.PositiveIntegerField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # maintained by course_manager.signals.search_signals, see SearchServices
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # the course a save moved this module from, set by save() for the outline signals
+    moved_from_course_id = None
+
+    objects = ModuleQuerySet.as_manager()
 
     class Meta:
         ordering = ['order']
         unique_together = ['course', 'order']
+        indexes = [
+            # keyset pagination key of ModuleViewSet
+            models.Index(fields=['order', 'id'], name='module_order_id_idx'),
+            GinIndex(fields=['search_vector'], name='module_search_idx'),
+        ]
 
     def __str__(self):
         return f"{self.course.title} - {self.title}" 
 
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            previous = None if self._state.adding else (
+                Module.objects.filter(pk=self.pk).values_list('course_id', flat=True).first()
+            )
+            self.moved_from_course_id = previous if previous != self.course_id else None
+            super().save(*args, **kwargs)
+            if self.moved_from_course_id is not None:
+                # a moved module takes its lessons' copy of course_id along; the update
+                # skips the Lesson signals, so move their share of Course.lesson_count too
+                Course = self._meta.get_field('course').related_model
+                moved = self.lessons.update(course_id=self.course_id)
+                Course.objects.filter(pk=self.moved_from_course_id).update(
+                    lesson_count=Greatest(F('lesson_count') - moved, 0)
+                )
+                Course.objects.filter(pk=self.course_id).update(lesson_count=F('lesson_count') + moved)
+
     @property
     def instructor(self):
         return self.course.instructor
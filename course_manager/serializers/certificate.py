@@ -7,4 +7,4 @@ class CertificateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Certificate
         fields = '__all__'
-        read_only_fields = ('enrollment', 'issued_at') 
+        read_only_fields = ('enrollment', 'issued_at', 'status', 'rendered_at') 
@@ -1,23 +1,55 @@
 from rest_framework import serializers
 from course_manager.models.course import Course
-from course_manager.models.enrollment import Enrollment
 from course_manager.serializers.module import ModuleSerializer
+from course_manager.services.course_outline_services import CourseOutlineServices
+from course_manager.services.enrolled_courses_services import EnrolledCoursesServices
+
+class CourseOutlineField(serializers.Field):
+    """
+    Read-only `modules` served from CourseOutlineServices' cache, with each lesson's
+    `completed` flag filled in from the request's completed lesson ids.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, course):
+        completed_lesson_ids = self.context.get('completed_lesson_ids', ())
+        outline = CourseOutlineServices.get_outline(course)
+        for module in outline:
+            for lesson in module['lessons']:
+                lesson['completed'] = lesson['id'] in completed_lesson_ids
+        return outline
+
 
 class CourseSerializer(serializers.ModelSerializer):
     progress = serializers.SerializerMethodField(source='get_progress')
     modules = ModuleSerializer(many=True, read_only=True)
 
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.context.get('use_outline_cache'):
+            fields['modules'] = CourseOutlineField()
+        return fields
+
     def get_progress(self, obj):
         if not 'request' in self.context:
             return None
+        if hasattr(obj, 'user_enrolled'):
+            # annotated by CourseQuerySet.with_progress
+            if not obj.user_enrolled:
+                return None
+            return Course.calculate_progress(obj.user_completed_lesson_count, obj.lesson_count)
         user = self.context['request'].user
-        if Enrollment.objects.filter(course=obj, student=user).exists():
+        if EnrolledCoursesServices.is_enrolled(user.pk, obj.id):
             return obj.get_progress(user)
         return None
     
     class Meta:
         model = Course
-        fields = '__all__'
+        exclude = ('search_vector',)
         read_only_fields = ('instructor',)
 
     
\ No newline at end of file
@@ -0,0 +1,19 @@
+from rest_framework import serializers
+from course_manager.models.course_stats import CourseDailyStats
+
+
+class CourseDailyStatsSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = CourseDailyStats
+        fields = ('date', 'enrollments', 'lesson_completions', 'certificates_issued')
+
+
+class CourseStatsFilterSerializer(serializers.Serializer):
+    since = serializers.DateField(required=False)
+    until = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        if 'since' in attrs and 'until' in attrs and attrs['since'] > attrs['until']:
+            raise serializers.ValidationError('since must not be after until.')
+        return attrs
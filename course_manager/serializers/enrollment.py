@@ -14,3 +14,22 @@ class EnrollmentSerializer(serializers.ModelSerializer):
         if 'student' in res:
             res['student'] = UserSerializer(instance.student).data
         return res
+
+
+class EnrollmentImportSerializer(serializers.Serializer):
+    emails = serializers.ListField(child=serializers.CharField(allow_blank=True), required=False)
+    file = serializers.FileField(required=False)
+    format = serializers.ChoiceField(choices=['csv', 'json'], required=False)
+
+    def validate(self, attrs):
+        if 'emails' not in attrs and 'file' not in attrs:
+            raise serializers.ValidationError('Provide a list of emails or a CSV/JSON file.')
+        return attrs
+
+
+class EnrollmentFilterSerializer(serializers.Serializer):
+    """Query parameters of CourseViewSet.enrollments; validate a plain dict, not the QueryDict."""
+    completed = serializers.BooleanField(required=False)
+    enrolled_after = serializers.DateTimeField(required=False)
+    enrolled_before = serializers.DateTimeField(required=False)
+
@@ -8,6 +8,8 @@ class LessonSerializer(serializers.ModelSerializer):
     def get_completed(self, obj):
         if 'request' not in self.context:
             return False
+        if 'completed_lesson_ids' in self.context:
+            return obj.id in self.context['completed_lesson_ids']
         if self.context['request'].user.is_authenticated:
             return LessonProgress.objects.filter(lesson=obj, enrollment__student=self.context['request'].user).exists()
         return False
@@ -15,4 +17,8 @@ class LessonSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Lesson
-        fields = '__all__' 
+        exclude = ('search_vector',)
+
+
+class LessonCompletionBatchSerializer(serializers.Serializer):
+    lessons = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=500)
@@ -7,7 +7,7 @@ class ModuleSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Module
-        fields = '__all__'
+        exclude = ('search_vector',)
         extra_kwargs = {
             'course': {
                 'required': False
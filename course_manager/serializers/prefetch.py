@@ -0,0 +1,29 @@
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+
+def prefetch_plan(serializer, queryset, join_field=None):
+    """
+    Apply to `queryset` the loading plan that serializing its rows with `serializer`
+    (a bound ModelSerializer, e.g. the child of a many=True serializer) needs:
+    nested to-one serializers are select_related, nested to-many serializers become
+    Prefetch objects ordered by the related model's Meta.ordering and planned the
+    same way, and fields listed in Meta.exclude are deferred (except `join_field`,
+    the foreign key a prefetch matches rows on). The number of queries then depends
+    on the nesting depth only, not on the number of related rows.
+    """
+    model = serializer.Meta.model
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*' or '.' in field.source:
+            continue
+        if isinstance(field, serializers.ListSerializer) and isinstance(field.child, serializers.ModelSerializer):
+            relation = model._meta.get_field(field.source)
+            related = field.child.Meta.model
+            related_queryset = related._default_manager.order_by(*related._meta.ordering, 'pk')
+            queryset = queryset.prefetch_related(
+                Prefetch(field.source, queryset=prefetch_plan(field.child, related_queryset, join_field=relation.field.name))
+            )
+        elif isinstance(field, serializers.ModelSerializer):
+            queryset = queryset.select_related(field.source)
+    deferred = [name for name in getattr(serializer.Meta, 'exclude', ()) if name != join_field]
+    return queryset.defer(*deferred) if deferred else queryset
@@ -0,0 +1,15 @@
+from rest_framework import serializers
+from course_manager.services.search_services import SearchServices
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=200)
+    kind = serializers.MultipleChoiceField(choices=SearchServices.kinds, required=False)
+
+
+class SearchResultSerializer(serializers.Serializer):
+    kind = serializers.CharField()
+    id = serializers.IntegerField()
+    title = serializers.CharField()
+    course = serializers.IntegerField(source='course_pk')
+    rank = serializers.FloatField()
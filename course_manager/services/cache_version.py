@@ -0,0 +1,38 @@
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+class CacheVersion:
+    """
+    A per-object version token that cache entries are keyed by, so bumping it
+    stops the old entries from being addressed and they simply expire. Versions
+    are random tokens rather than counters so an evicted version key can't bring
+    back an old entry.
+    """
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+
+    def key(self, object_id):
+        return f'{self.prefix}:{object_id}'
+
+    def get(self, object_id):
+        key = self.key(object_id)
+        version = cache.get(key)
+        if version is None:
+            # add() so concurrent first readers agree on one version
+            cache.add(key, uuid4().hex, timeout=None)
+            version = cache.get(key)
+        return version
+
+    def bump(self, object_id):
+        """
+        Bump now, for reads later in the writing transaction, and again once it
+        commits: a concurrent reader still sees the pre-commit rows and may have
+        cached them under the version set in between.
+        """
+        key = self.key(object_id)
+        cache.set(key, uuid4().hex, timeout=None)
+        transaction.on_commit(lambda: cache.set(key, uuid4().hex, timeout=None))
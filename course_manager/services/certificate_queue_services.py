@@ -0,0 +1,139 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+import django
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from course_manager.models.certificate import Certificate, CertificateRenderJob
+from course_manager.services.certificate_services import CertificateSeriveces
+
+
+class CertificateQueueServices:
+    """
+    DB-backed queue for certificate rendering.
+
+    Jobs are claimed with SELECT ... FOR UPDATE SKIP LOCKED so several workers
+    can drain the table concurrently. A claimed job whose worker died is picked
+    up again once CERTIFICATE_RENDER_LOCK_TIMEOUT has passed, or failed if
+    that was its last attempt.
+    """
+
+    @staticmethod
+    def enqueue(certificate):
+        if certificate.status != Certificate.Status.PENDING:
+            certificate.status = Certificate.Status.PENDING
+            Certificate.objects.filter(pk=certificate.pk).update(status=Certificate.Status.PENDING)
+        return CertificateRenderJob.objects.create(certificate=certificate)
+
+    @staticmethod
+    def claim_jobs(limit):
+        """Lock up to `limit` due jobs for this worker and return their ids."""
+        now = timezone.now()
+        stale = now - timedelta(seconds=settings.CERTIFICATE_RENDER_LOCK_TIMEOUT)
+        with transaction.atomic():
+            CertificateQueueServices.fail_abandoned_jobs(stale)
+            job_ids = list(
+                CertificateRenderJob.objects.select_for_update(skip_locked=True).filter(
+                    Q(locked_at__isnull=True) | Q(locked_at__lt=stale),
+                    run_after__lte=now,
+                    attempts__lt=settings.CERTIFICATE_RENDER_MAX_ATTEMPTS,
+                ).order_by('run_after').values_list('pk', flat=True)[:limit]
+            )
+            if job_ids:
+                CertificateRenderJob.objects.filter(pk__in=job_ids).update(locked_at=now, attempts=F('attempts') + 1)
+                Certificate.objects.filter(render_jobs__in=job_ids).update(status=Certificate.Status.RENDERING)
+        return job_ids
+
+    @staticmethod
+    def fail_abandoned_jobs(stale):
+        """
+        Fail the jobs locked before `stale` that have no attempts left: their worker died
+        during the final attempt, so fail() never ran and nothing would claim them again.
+        """
+        abandoned = dict(
+            CertificateRenderJob.objects.select_for_update(skip_locked=True).filter(
+                locked_at__lt=stale, attempts__gte=settings.CERTIFICATE_RENDER_MAX_ATTEMPTS,
+            ).values_list('pk', 'certificate_id')
+        )
+        if abandoned:
+            CertificateRenderJob.objects.filter(pk__in=abandoned).update(
+                locked_at=None, last_error='Worker stopped during the final attempt'
+            )
+            Certificate.objects.filter(pk__in=abandoned.values()).update(status=Certificate.Status.FAILED)
+
+    @staticmethod
+    def render_certificate(certificate, job=None):
+        """
+        Render the certificate file, then mark the certificate ready and delete its
+        render `job`, if any, in one transaction so a ready certificate is never claimed again.
+        """
+        CertificateSeriveces.generate_certificate(certificate)
+        with transaction.atomic():
+            certificate.status = Certificate.Status.READY
+            certificate.rendered_at = timezone.now()
+            certificate.save(update_fields=['status', 'rendered_at'])
+            if job is not None:
+                job.delete()
+
+    @staticmethod
+    def render(job_id):
+        """
+        Render the certificate of a claimed job and remove the job. Runs in the worker pool.
+        A job deleted since it was claimed (with its certificate or enrollment) counts as done.
+        """
+        job = CertificateRenderJob.objects.select_related(
+            'certificate__enrollment__student', 'certificate__enrollment__course'
+        ).filter(pk=job_id).first()
+        if job is not None:
+            CertificateQueueServices.render_certificate(job.certificate, job)
+        return job_id
+
+    @staticmethod
+    def fail(job_id, error):
+        """
+        Release a failed job for a later retry, or mark the certificate failed when out of attempts.
+        A job deleted in the meantime is not retried.
+        """
+        with transaction.atomic():
+            job = CertificateRenderJob.objects.select_for_update().filter(pk=job_id).first()
+            if job is None:
+                return True
+            job.locked_at = None
+            job.last_error = error
+            job.run_after = timezone.now() + timedelta(seconds=settings.CERTIFICATE_RENDER_RETRY_DELAY * job.attempts)
+            job.save(update_fields=['locked_at', 'last_error', 'run_after'])
+            exhausted = job.attempts >= settings.CERTIFICATE_RENDER_MAX_ATTEMPTS
+            Certificate.objects.filter(pk=job.certificate_id).update(
+                status=Certificate.Status.FAILED if exhausted else Certificate.Status.PENDING
+            )
+        return exhausted
+
+
+def render_pool(workers, max_tasks_per_child=None):
+    """
+    Process pool for rendering. Children are spawned and set up Django themselves
+    instead of sharing the parent's database connection.
+    """
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=django.setup,
+        max_tasks_per_child=max_tasks_per_child,
+    )
+
+
+# module level so they can be pickled into the worker process pool
+
+def render_certificate_job(job_id):
+    return CertificateQueueServices.render(job_id)
+
+
+def regenerate_certificate(certificate_id):
+    certificate = Certificate.objects.select_related('enrollment__student', 'enrollment__course').get(pk=certificate_id)
+    CertificateQueueServices.render_certificate(certificate)
+    return certificate_id
@@ -1,4 +1,6 @@
 
+from functools import lru_cache
+
 from django.conf import settings
 from PIL import Image, ImageDraw, ImageFont
 import os
@@ -6,15 +8,13 @@ import os
 
 
 class CertificateSeriveces:
-    
-    @staticmethod
-    def generate_certificate(certificate):
-        # Create a new image with a white background
-        width = 3500  
-        height = 2400
-        image = Image.new('RGB', (width, height), 'white')
-        draw = ImageDraw.Draw(image)
+    width = 3500
+    height = 2400
 
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def load_fonts():
+        """Load the certificate fonts once per process."""
         # Load fonts (you'll need to provide these font files in your project)
         try:
             title_font = ImageFont.truetype('DejaVuSerif-Bold.ttf', 120)
@@ -25,6 +25,22 @@ class CertificateSeriveces:
             title_font = ImageFont.load_default(120)
             main_font = ImageFont.load_default(80)
             subtitle_font = ImageFont.load_default(60)
+        return title_font, main_font, subtitle_font
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def base_layer():
+        """
+        Render the parts shared by every certificate (background, border and title) once per process.
+        Callers must copy the returned image before drawing on it.
+        """
+        width = CertificateSeriveces.width
+        height = CertificateSeriveces.height
+        title_font, _, _ = CertificateSeriveces.load_fonts()
+
+        # Create a new image with a white background
+        image = Image.new('RGB', (width, height), 'white')
+        draw = ImageDraw.Draw(image)
 
         # Add decorative border
         border_width = 20
@@ -44,11 +60,44 @@ class CertificateSeriveces:
             font=title_font,
             fill='#1f4068'
         )
+        return image
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def load_vector_fonts():
+        """Register the certificate fonts with reportlab once per process; TrueType fonts are embedded in the PDF."""
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.ttfonts import TTFError, TTFont
+
+        fonts = []
+        for name, fallback in (
+            ('DejaVuSerif-Bold', 'Times-Bold'),
+            ('DejaVuSerif', 'Times-Roman'),
+            ('DejaVuSerif-Italic', 'Times-Italic'),
+        ):
+            try:
+                pdfmetrics.registerFont(TTFont(name, f'{name}.ttf'))
+                fonts.append(name)
+            except (TTFError, OSError):
+                # Fallback to the standard PDF fonts if the TrueType fonts are not available
+                fonts.append(fallback)
+        return tuple(fonts)
+
+    @staticmethod
+    def clear_cache():
+        CertificateSeriveces.load_fonts.cache_clear()
+        CertificateSeriveces.base_layer.cache_clear()
+        CertificateSeriveces.load_vector_fonts.cache_clear()
+
+    @staticmethod
+    def render_certificate(student_name, course_name, completed_at):
+        """Draw the per-certificate text on a copy of the cached base layer."""
+        width = CertificateSeriveces.width
+        _, main_font, subtitle_font = CertificateSeriveces.load_fonts()
+        image = CertificateSeriveces.base_layer().copy()
+        draw = ImageDraw.Draw(image)
 
         # Add student name
-        student_name = certificate.enrollment.student.get_full_name()
-        if not student_name:
-            student_name = certificate.enrollment.student.email
         student_text = f"This is to certify that\n{student_name}"
         text_bbox = draw.multiline_textbbox((0, 0), student_text, font=main_font, align='center', stroke_width=10)
         text_width = (text_bbox[2] - text_bbox[0])
@@ -61,7 +110,6 @@ class CertificateSeriveces:
         )
 
         # Add course completion text
-        course_name = certificate.enrollment.course.title
         completion_text = f"has successfully completed the course\n{course_name}"
         completion_bbox = draw.multiline_textbbox((0, 0), completion_text, font=main_font, align='center', spacing=5)
         completion_width = completion_bbox[2] - completion_bbox[0]
@@ -74,7 +122,7 @@ class CertificateSeriveces:
         )
 
         # Add completion date
-        completion_date = certificate.enrollment.completed_at.strftime("%B %d, %Y")
+        completion_date = completed_at.strftime("%B %d, %Y")
         date_text = f"Completed on {completion_date}"
         date_bbox = draw.textbbox((0, 0), date_text, font=subtitle_font, stroke_width=5)
         date_width = (date_bbox[2] - date_bbox[0])
@@ -84,13 +132,66 @@ class CertificateSeriveces:
             font=subtitle_font,
             fill='#1b1b2f'
         )
+        return image
+
+    @staticmethod
+    def render_vector_certificate(output, student_name, course_name, completed_at):
+        """
+        Write the certificate layout as vector text and shapes to `output` (a path or file object).
+        Coordinates are the raster layout's pixels scaled from 300 dpi to PDF points.
+        """
+        from reportlab.lib.colors import HexColor
+        from reportlab.pdfgen import canvas
+
+        scale = 72 / 300
+        width = CertificateSeriveces.width * scale
+        height = CertificateSeriveces.height * scale
+        title_font, main_font, subtitle_font = CertificateSeriveces.load_vector_fonts()
+
+        pdf = canvas.Canvas(output, pagesize=(width, height))
+        pdf.setTitle('Certificate of Completion')
+
+        def draw_centred(text, font, size, top, color):
+            size = size * scale
+            pdf.setFont(font, size)
+            pdf.setFillColor(HexColor(color))
+            baseline = height - top * scale - size * 0.9
+            for line in text.split('\n'):
+                pdf.drawCentredString(width / 2, baseline, line)
+                baseline -= size * 1.2
+
+        # Add decorative border, stroked on the centre line of the raster border
+        border_width = 20 * scale
+        pdf.setStrokeColor(HexColor('#1f4068'))
+        pdf.setLineWidth(border_width)
+        pdf.rect(1.5 * border_width, 1.5 * border_width, width - 3 * border_width, height - 3 * border_width)
+
+        draw_centred("Certificate of Completion", title_font, 120, 300, '#1f4068')
+        draw_centred(f"This is to certify that\n{student_name}", main_font, 80, 700, '#1b1b2f')
+        draw_centred(f"has successfully completed the course\n{course_name}", main_font, 80, 1000, '#1b1b2f')
+        draw_centred(f"Completed on {completed_at.strftime('%B %d, %Y')}", subtitle_font, 60, 1400, '#1b1b2f')
+
+        pdf.showPage()
+        pdf.save()
+
+    @staticmethod
+    def generate_certificate(certificate):
+        student_name = certificate.enrollment.student.get_full_name()
+        if not student_name:
+            student_name = certificate.enrollment.student.email
+        course_name = certificate.enrollment.course.title
+        completed_at = certificate.enrollment.completed_at
 
         # Save the certificate
         certificate_path = f'certificates/{certificate.enrollment.student.id}_{certificate.enrollment.course.id}_certificate.pdf'
         full_path = os.path.join(settings.MEDIA_ROOT, certificate_path)
         os.makedirs(os.path.dirname(full_path), exist_ok=True)
-        image.save(full_path, 'PDF', resolution=300.0)
-        
+        if settings.CERTIFICATE_RENDERER == 'vector':
+            CertificateSeriveces.render_vector_certificate(full_path, student_name, course_name, completed_at)
+        else:
+            image = CertificateSeriveces.render_certificate(student_name, course_name, completed_at)
+            image.save(full_path, 'PDF', resolution=300.0)
+
         # Update certificate file field
         certificate.certificate_file.name = certificate_path
         certificate.save()
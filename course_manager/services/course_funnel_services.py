@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, FilteredRelation, Q
+
+from course_manager.models.lesson import Lesson
+from course_manager.services.cache_version import CacheVersion
+from course_manager.services.course_outline_services import CourseOutlineServices
+
+
+class CourseFunnelServices:
+    """
+    Caches how many enrolled students completed each lesson of a course.
+
+    Entries are keyed by a per-course progress version, bumped on every
+    LessonProgress and Enrollment write (by the funnel signals, or explicitly by
+    the bulk paths that skip signals) and again when the write commits, and by
+    the course's outline version, so added, moved or removed lessons are picked up too.
+    """
+    version = CacheVersion('course_funnel_version')
+
+    @staticmethod
+    def get_funnel(course):
+        key = (
+            f'course_funnel:{course.id}:{CourseFunnelServices.version.get(course.id)}'
+            f':{CourseOutlineServices.version.get(course.id)}'
+        )
+        funnel = cache.get(key)
+        if funnel is None:
+            funnel = CourseFunnelServices.compute_funnel(course)
+            cache.set(key, funnel, timeout=settings.COURSE_FUNNEL_CACHE_TIMEOUT)
+        return funnel
+
+    @staticmethod
+    def lessons(course):
+        """
+        The course's lessons in module/lesson order with their completion count, from one
+        grouped LEFT JOIN over LessonProgress. The join also matches the denormalized course
+        so the planner reads just this course's rows off the (course, lesson) index.
+        """
+        return Lesson.objects.filter(course=course).annotate(
+            progress=FilteredRelation('lessonprogress', condition=Q(lessonprogress__course=course)),
+        ).order_by('module__order', 'order').values(
+            'id', 'title', 'module_id', module_title=F('module__title'),
+        ).annotate(completed=Count('progress'))
+
+    @staticmethod
+    def compute_funnel(course):
+        """Completions per lesson in module/lesson order, with the share of enrolled students."""
+        enrolled = course.enrollments.count()
+        lessons = CourseFunnelServices.lessons(course)
+        return {
+            'course': course.id,
+            'enrolled': enrolled,
+            'lessons': [
+                {
+                    'module': lesson['module_id'],
+                    'module_title': lesson['module_title'],
+                    'lesson': lesson['id'],
+                    'title': lesson['title'],
+                    'completed': lesson['completed'],
+                    'completion_rate': round(lesson['completed'] / enrolled * 100, 2) if enrolled else 0,
+                }
+                for lesson in lessons
+            ],
+        }
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from course_manager.serializers.module import ModuleSerializer
+from course_manager.serializers.prefetch import prefetch_plan
+from course_manager.services.cache_version import CacheVersion
+
+
+class CourseOutlineServices:
+    """
+    Caches the user-independent modules/lessons tree of a course.
+
+    Entries are keyed by a per-course version that the outline signals bump on
+    every Course, Module and Lesson write and again when the write commits, so
+    a stale outline is never read: it simply stops being addressed and expires.
+    """
+    version = CacheVersion('course_outline_version')
+
+    @staticmethod
+    def get_outline(course):
+        """Return the serialized modules of `course` (with `completed` left False) from the cache."""
+        key = f'course_outline:{course.id}:{CourseOutlineServices.version.get(course.id)}'
+        outline = cache.get(key)
+        if outline is None:
+            modules = prefetch_plan(ModuleSerializer(), course.modules.order_by('order', 'pk'))
+            outline = ModuleSerializer(modules, many=True).data
+            cache.set(key, outline, timeout=settings.COURSE_OUTLINE_CACHE_TIMEOUT)
+        return outline
@@ -0,0 +1,83 @@
+from collections import defaultdict
+from datetime import datetime, time
+
+from django.db import transaction
+from django.db.models import Count, Min
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from course_manager.models.certificate import Certificate
+from course_manager.models.course_stats import CourseDailyStats, RollupWatermark
+from course_manager.models.enrollment import Enrollment, LessonProgress
+
+
+class CourseStatsServices:
+    """
+    Maintains CourseDailyStats from a watermark.
+
+    Each run recomputes every day from the watermark's day up to `until` with
+    one grouped count per source table (an index range scan on its timestamp),
+    replaces those days' rollup rows and moves the watermark to `until`. Whole
+    days are recomputed, so runs are idempotent and the current day simply
+    fills up; `until` should lag behind now so rows from transactions still in
+    flight are not skipped.
+    """
+    watermark_name = 'course_daily_stats'
+    # (model, timestamp field, course lookup, CourseDailyStats field)
+    sources = (
+        (Enrollment, 'enrolled_at', 'course', 'enrollments'),
+        (LessonProgress, 'completed_at', 'course', 'lesson_completions'),
+        (Certificate, 'issued_at', 'enrollment__course', 'certificates_issued'),
+    )
+
+    @staticmethod
+    def earliest():
+        timestamps = [
+            model.objects.aggregate(first=Min(timestamp))['first']
+            for model, timestamp, _, _ in CourseStatsServices.sources
+        ]
+        timestamps = [value for value in timestamps if value is not None]
+        return min(timestamps) if timestamps else None
+
+    @staticmethod
+    def roll_up(until=None):
+        """Roll up everything before `until` (default: now); returns the (from, until) window and rows written."""
+        until = until or timezone.now()
+        watermark, _ = RollupWatermark.objects.get_or_create(
+            name=CourseStatsServices.watermark_name,
+            defaults={'value': CourseStatsServices.earliest() or until},
+        )
+        with transaction.atomic():
+            # the lock keeps concurrent runs from interleaving their delete/insert
+            watermark = RollupWatermark.objects.select_for_update().get(pk=watermark.pk)
+            until = max(until, watermark.value)
+            first_day = timezone.localdate(watermark.value)
+            last_day = timezone.localdate(until)
+            start = datetime.combine(first_day, time.min, tzinfo=timezone.get_current_timezone())
+
+            counts = defaultdict(dict)
+            for model, timestamp, course_lookup, field in CourseStatsServices.sources:
+                rows = model.objects.filter(**{f'{timestamp}__gte': start, f'{timestamp}__lt': until}).annotate(
+                    day=TruncDate(timestamp)
+                ).order_by().values(course_lookup, 'day').annotate(total=Count('pk'))
+                for row in rows:
+                    counts[(row[course_lookup], row['day'])][field] = row['total']
+
+            CourseDailyStats.objects.filter(date__gte=first_day, date__lte=last_day).delete()
+            CourseDailyStats.objects.bulk_create(
+                [
+                    CourseDailyStats(course_id=course_id, date=day, **fields)
+                    for (course_id, day), fields in counts.items()
+                ],
+                batch_size=1000,
+            )
+            watermark.value = until
+            watermark.save(update_fields=['value'])
+        return start, until, len(counts)
+
+    @staticmethod
+    def reset():
+        """Drop all rollups and the watermark so the next run rebuilds from the first recorded row."""
+        with transaction.atomic():
+            CourseDailyStats.objects.all().delete()
+            RollupWatermark.objects.filter(name=CourseStatsServices.watermark_name).delete()
@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from course_manager.models.enrollment import Enrollment
+
+
+class EnrolledCoursesServices:
+    """
+    Caches the ids of the courses each student is enrolled in.
+
+    The enrollment signals drop a student's entry whenever one of their
+    Enrollment rows is created or deleted, and bulk paths that skip the
+    signals call invalidate() themselves. Entries are dropped again once the
+    transaction commits, so a reader that filled the cache from the
+    pre-commit state can't keep it; the timeout bounds anything else. The ids
+    are for read-side filtering only: writes let the database decide.
+    """
+
+    @staticmethod
+    def key(student_id):
+        return f'enrolled_courses:{student_id}'
+
+    @staticmethod
+    def get_course_ids(student_id):
+        """The set of course ids `student_id` is enrolled in."""
+        key = EnrolledCoursesServices.key(student_id)
+        course_ids = cache.get(key)
+        if course_ids is None:
+            course_ids = list(Enrollment.objects.filter(student=student_id).values_list('course_id', flat=True))
+            cache.set(key, course_ids, timeout=settings.ENROLLED_COURSES_CACHE_TIMEOUT)
+        return set(course_ids)
+
+    @staticmethod
+    def is_enrolled(student_id, course_id):
+        return course_id in EnrolledCoursesServices.get_course_ids(student_id)
+
+    @staticmethod
+    def invalidate(*student_ids):
+        keys = [EnrolledCoursesServices.key(student_id) for student_id in student_ids]
+        cache.delete_many(keys)
+        transaction.on_commit(lambda: cache.delete_many(keys))
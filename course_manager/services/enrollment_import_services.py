@@ -0,0 +1,110 @@
+import csv
+import json
+from itertools import islice
+
+from django.db import connection
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from account_manager.models.user import User
+from course_manager.models.enrollment import Enrollment
+from course_manager.services.course_funnel_services import CourseFunnelServices
+from course_manager.services.enrolled_courses_services import EnrolledCoursesServices
+
+
+class EnrollmentImportServices:
+    """
+    Enrolls students in a course from a list of emails.
+
+    Emails are processed in batches, each costing two queries whatever its
+    size: one resolves the batch's students, case-insensitively, and one insert
+    adds the missing enrollments and returns the ones it created. Conflicts are
+    ignored, so an import that races with students enrolling themselves never
+    fails, and such students are counted as existing.
+    """
+
+    @staticmethod
+    def read_emails(source, file_format):
+        """
+        Yield the emails in a text stream. CSV input uses the `email` column when the
+        first row is a header naming one, else the first column; JSON input is a list
+        of emails or of {"email": ...} objects.
+        """
+        if file_format == 'json':
+            rows = json.load(source)
+            if not isinstance(rows, list):
+                raise ValueError('Expected a JSON list of emails')
+            for row in rows:
+                yield row.get('email', '') if isinstance(row, dict) else str(row)
+            return
+
+        column = 0
+        for index, row in enumerate(csv.reader(source)):
+            if index == 0:
+                header = [cell.strip().lower() for cell in row]
+                if 'email' in header:
+                    column = header.index('email')
+                    continue
+            if len(row) > column:
+                yield row[column]
+
+    @staticmethod
+    def insert_missing(course_id, student_ids):
+        """
+        Enroll in the course every student of `student_ids` who is not enrolled yet, in one statement.
+        Returns the ids of the students that got a new enrollment; unique_together settles duplicates.
+        """
+        if not student_ids:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {Enrollment._meta.db_table} '
+                '(student_id, course_id, enrolled_at, completed, completed_lesson_count) '
+                'SELECT student_id, %s, %s, false, 0 FROM unnest(%s::bigint[]) AS student_id '
+                'ON CONFLICT (student_id, course_id) DO NOTHING '
+                'RETURNING student_id',
+                [course_id, timezone.now(), list(student_ids)],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    @staticmethod
+    def import_emails(course, emails, batch_size=1000):
+        """
+        Enroll the students behind `emails` in `course`. Yields the running totals
+        (processed, created, existing, unknown, skipped) after every batch; blank and
+        repeated emails are skipped, emails without a student account are unknown.
+        Emails are matched regardless of case.
+        """
+        totals = {'processed': 0, 'created': 0, 'existing': 0, 'unknown': 0, 'skipped': 0}
+        seen = set()
+        emails = iter(emails)
+        while True:
+            batch = list(islice(emails, batch_size))
+            if not batch:
+                if not totals['processed']:
+                    yield dict(totals)
+                return
+            totals['processed'] += len(batch)
+            wanted = []
+            for email in batch:
+                email = email.strip().lower()
+                if not email or email in seen:
+                    totals['skipped'] += 1
+                    continue
+                seen.add(email)
+                wanted.append(email)
+
+            students = dict(
+                User.objects.annotate(email_lower=Lower('email')).filter(
+                    email_lower__in=wanted, role=User.Role.STUDENT
+                ).values_list('pk', 'email_lower')
+            )
+            created = EnrollmentImportServices.insert_missing(course.id, sorted(students))
+            if created:
+                # the raw insert skips the Enrollment signals
+                CourseFunnelServices.version.bump(course.id)
+                EnrolledCoursesServices.invalidate(*created)
+            totals['created'] += len(created)
+            totals['existing'] += len(students) - len(created)
+            totals['unknown'] += len(wanted) - len(set(students.values()))
+            yield dict(totals)
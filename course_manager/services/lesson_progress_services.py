@@ -0,0 +1,119 @@
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from course_manager.models.certificate import Certificate
+from course_manager.models.enrollment import Enrollment, LessonProgress
+from course_manager.models.lesson import Lesson
+from course_manager.services.course_funnel_services import CourseFunnelServices
+
+
+class LessonProgressServices:
+    """
+    Writes LessonProgress rows in bulk. Rows inserted here skip the LessonProgress
+    signals, so the enrollment counter, the course-completion check and the
+    funnel cache version are applied explicitly, once per batch.
+    """
+
+    @staticmethod
+    def insert_missing(enrollment_id, course_id, lesson_ids):
+        """
+        Insert a LessonProgress row for every lesson that has none yet, in one statement.
+        `lesson_ids` must be lessons of the enrollment's course, `course_id`.
+        Returns the ids of the lessons that got a new row; unique_together settles duplicates.
+        """
+        if not lesson_ids:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {LessonProgress._meta.db_table} (enrollment_id, course_id, lesson_id, completed_at) '
+                'SELECT %s, %s, lesson_id, %s FROM unnest(%s::bigint[]) AS lesson_id '
+                'ON CONFLICT (enrollment_id, lesson_id) DO NOTHING '
+                'RETURNING lesson_id',
+                [enrollment_id, course_id, timezone.now(), list(lesson_ids)],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    @staticmethod
+    def insert_if_enrolled(student_id, lesson_id):
+        """
+        Insert the student's LessonProgress row for a lesson of a course they are enrolled in,
+        resolving the enrollment in the same statement. Returns the enrollment id if a row was
+        created, or None if it already existed or there is no such lesson or enrollment.
+        """
+        lesson_table = Lesson._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {LessonProgress._meta.db_table} (enrollment_id, course_id, lesson_id, completed_at) '
+                f'SELECT enrollment.id, enrollment.course_id, {lesson_table}.id, %s FROM {lesson_table} '
+                f'JOIN {Enrollment._meta.db_table} enrollment '
+                f'ON enrollment.course_id = {lesson_table}.course_id AND enrollment.student_id = %s '
+                f'WHERE {lesson_table}.id = %s '
+                'ON CONFLICT (enrollment_id, lesson_id) DO NOTHING '
+                'RETURNING enrollment_id',
+                [timezone.now(), student_id, lesson_id],
+            )
+            row = cursor.fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def complete_lesson(student, lesson_id):
+        """Mark one lesson completed for `student`; returns True if it was not completed before."""
+        with transaction.atomic():
+            enrollment_id = LessonProgressServices.insert_if_enrolled(student.pk, lesson_id)
+            if enrollment_id is None:
+                return False
+            LessonProgressServices.record_completions(enrollment_id, 1)
+        return True
+
+    @staticmethod
+    def complete_lessons(enrollment, lesson_ids):
+        """
+        Mark `lesson_ids` completed for `enrollment`. Ids that are not lessons of the
+        enrollment's course are skipped. Returns (created, already_completed, not_in_course)
+        lesson id sets.
+        """
+        requested = set(lesson_ids)
+        in_course = set(
+            Lesson.objects.filter(course=enrollment.course_id, pk__in=requested).values_list('pk', flat=True)
+        )
+        with transaction.atomic():
+            created = set(LessonProgressServices.insert_missing(enrollment.pk, enrollment.course_id, sorted(in_course)))
+            if created:
+                enrollment.completed = LessonProgressServices.record_completions(enrollment.pk, len(created))
+        return created, in_course - created, requested - in_course
+
+    @staticmethod
+    def record_completions(enrollment_id, count):
+        """
+        Apply what the LessonProgress signals would have done for `count` rows inserted
+        in bulk. Returns whether the enrollment is completed.
+        """
+        Enrollment.objects.filter(pk=enrollment_id).update(
+            completed_lesson_count=F('completed_lesson_count') + count
+        )
+        enrollment = LessonProgressServices.check_course_completion(enrollment_id)
+        CourseFunnelServices.version.bump(enrollment.course_id)
+        return enrollment.completed
+
+    @staticmethod
+    def check_course_completion(enrollment_id):
+        """
+        Mark the enrollment completed and issue its certificate once every lesson is done.
+
+        Compares the enrollment's completed lesson counter with the course's lesson
+        counter under a row lock on the enrollment, so the check is O(1) and concurrent
+        completions can't both see the transition. Lessons added later only raise the
+        target; an enrollment that already completed keeps its certificate.
+        Must run inside the transaction that recorded the progress. Returns the locked enrollment.
+        """
+        enrollment = Enrollment.objects.select_for_update(of=('self',)).select_related('course').get(pk=enrollment_id)
+        if enrollment.completed or enrollment.completed_lesson_count < enrollment.course.lesson_count:
+            return enrollment
+        enrollment.completed = True
+        enrollment.completed_at = timezone.now()
+        enrollment.save(update_fields=['completed', 'completed_at'])
+        Certificate.objects.create(
+            enrollment=enrollment,
+        )
+        return enrollment
@@ -0,0 +1,315 @@
+import json
+import re
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import resolve, reverse
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from course_manager.models.certificate import Certificate
+from course_manager.models.course import Course
+from course_manager.models.enrollment import Enrollment, LessonProgress
+from course_manager.models.lesson import Lesson
+from course_manager.models.module import Module
+from course_manager.services.lesson_progress_services import LessonProgressServices
+from course_manager.services.search_services import SearchServices
+
+
+class PlanAuditServices:
+    """
+    Runs the hot viewset actions and service calls, captures the SQL they send and
+    replays every statement under EXPLAIN (ANALYZE, BUFFERS), turning each plan into findings:
+
+    - seq_scan: a sequential scan that read at least `min_rows` rows
+    - missing_index: a sequential scan whose filter discarded most of the rows
+      it read, i.e. an index on the filtered columns would have skipped them
+    - row_estimate: a node whose estimated rows are off by more than
+      `estimate_ratio` from the actual rows, so the planner chose blind
+
+    Calls run against a dummy cache, so they take the path of a cache miss and
+    leave the live cache alone. Findings carry no timings, so reports of two
+    releases can be diffed on them directly; timings and buffers are reported
+    alongside for context.
+    """
+    min_rows = 5000
+    selectivity = 0.1
+    estimate_ratio = 10
+    statement = re.compile(r'^[\s(]*(SELECT|INSERT|UPDATE|DELETE|WITH)\b', re.IGNORECASE)
+    # QuerySet.iterator() reads through a server-side cursor declared around the query
+    cursor_declaration = re.compile(r'^\s*DECLARE\s+\S+\s+.*?CURSOR\s+(WITH(OUT)?\s+HOLD\s+)?FOR\s+', re.IGNORECASE | re.DOTALL)
+
+    @staticmethod
+    def calls(student, instructor, course):
+        """
+        The audited calls by name: the hot viewset actions requested as the clients do,
+        and the service calls the signals and bulk paths make.
+        """
+        request = PlanAuditServices.request
+        completed = LessonProgress.objects.filter(enrollment__student=student).values('lesson')
+        lessons = list(Lesson.objects.filter(course=course).exclude(pk__in=completed).order_by('order', 'pk')[:5])
+        lesson = lessons[0] if lessons else Lesson.objects.filter(course=course).order_by('order', 'pk').first()
+        enrollment = Enrollment.objects.filter(course=course, student=student).first()
+        other_course = Course.objects.filter(is_published=True).exclude(enrollments__student=student).order_by('pk').first()
+        words = course.title.split()
+        calls = {
+            # CourseViewSet
+            'course.list.student': lambda: request(student, 'get', reverse('course-list')),
+            'course.list.instructor': lambda: request(instructor, 'get', reverse('course-list')),
+            'course.retrieve': lambda: request(student, 'get', reverse('course-detail', args=[course.pk])),
+            'course.enroll': lambda: request(student, 'post', reverse('course-enroll', args=[(other_course or course).pk])),
+            'course.enrollments': lambda: request(instructor, 'get', reverse('course-enrollments', args=[course.pk])),
+            'course.funnel': lambda: request(instructor, 'get', reverse('course-funnel', args=[course.pk])),
+            'course.daily_stats': lambda: request(instructor, 'get', reverse('course-daily-stats', args=[course.pk])),
+            'course.export_progress': lambda: request(instructor, 'get', reverse('course-export-progress', args=[course.pk])),
+            'course.complete_lessons': lambda: request(
+                student, 'put', reverse('course-complete-lessons', args=[course.pk]),
+                {'lessons': [item.pk for item in lessons]},
+            ),
+            # ModuleViewSet
+            'module.list.instructor': lambda: request(instructor, 'get', reverse('module-list')),
+            # LessonViewSet
+            'lesson.list.student': lambda: request(student, 'get', reverse('lesson-list')),
+            'lesson.retrieve': lambda: request(student, 'get', reverse('lesson-detail', args=[lesson.pk])),
+            'lesson.complete': lambda: request(student, 'put', reverse('lesson-complete', args=[lesson.pk])),
+            # CertificateViewSet
+            'certificate.list.student': lambda: request(student, 'get', reverse('certificate-list')),
+            'certificate.list.instructor': lambda: request(instructor, 'get', reverse('certificate-list')),
+            # SearchViewSet
+            'search': lambda: request(None, 'get', reverse('search-list'), {'q': words[0] if words else 'course'}),
+            # signals and services
+            'lesson.save': lambda: Lesson.objects.get(pk=lesson.pk).save(),
+        }
+        if lesson is None:
+            del calls['lesson.retrieve'], calls['lesson.complete'], calls['lesson.save']
+        if enrollment is not None:
+            calls['service.check_course_completion'] = lambda: LessonProgressServices.check_course_completion(enrollment.pk)
+        return calls
+
+    @staticmethod
+    def host():
+        # pagination links validate the request's host against ALLOWED_HOSTS
+        for host in settings.ALLOWED_HOSTS:
+            if host != '*':
+                return host.lstrip('.')
+        return 'localhost'
+
+    @staticmethod
+    def request(user, method, path, data=None):
+        """Dispatch a request for `path` to its view as `user` (None for anonymous) and read the whole response."""
+        factory = APIRequestFactory(SERVER_NAME=PlanAuditServices.host())
+        if method == 'get':
+            request = factory.get(path, data)
+        else:
+            request = getattr(factory, method)(path, data, format='json')
+        if user is not None:
+            force_authenticate(request, user=user)
+        match = resolve(path)
+        response = match.func(request, *match.args, **match.kwargs)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return response
+
+    @staticmethod
+    def capture(call):
+        """The SQL statements `call` sends, in order. The call runs against a dummy cache and is rolled back."""
+        dummy_cache = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+        with override_settings(CACHES=dummy_cache), transaction.atomic():
+            with CaptureQueriesContext(connection) as queries:
+                call()
+            transaction.set_rollback(True)
+        statements = []
+        for query in queries.captured_queries:
+            sql = PlanAuditServices.cursor_declaration.sub('', query['sql'])
+            if PlanAuditServices.statement.match(sql):
+                statements.append(sql)
+        return statements
+
+    @staticmethod
+    def sample():
+        """
+        A (student, instructor, course) triple from the data: the busiest student, the largest
+        of their courses (or of all courses) and its instructor.
+        """
+        User = get_user_model()
+        student = User.objects.filter(role=User.Role.STUDENT).annotate(
+            enrollment_count=Count('courses_enrolled')
+        ).order_by('-enrollment_count', 'pk').first()
+        if student is None:
+            return None
+        courses = Course.objects.order_by('-lesson_count', 'pk')
+        course = courses.filter(enrollments__student=student).first() or courses.first()
+        if course is None:
+            return None
+        return student, course.instructor, course
+
+    @staticmethod
+    def seed(courses=20, modules=5, lessons=10, students=2000, enrollments=5):
+        """
+        Bulk-insert a synthetic catalogue (the progress counters are not maintained)
+        and refresh the planner statistics. Meant to run inside a transaction that is rolled back.
+        """
+        User = get_user_model()
+        now = timezone.now()
+        instructor = User.objects.create_user(
+            username='plan_audit_instructor', email='plan_audit_instructor@example.com', role='INSTRUCTOR'
+        )
+        course_rows = Course.objects.bulk_create(
+            Course(title=f'Audit Course {index}', description='Plan audit', instructor=instructor,
+                   is_published=True, lesson_count=modules * lessons)
+            for index in range(courses)
+        )
+        module_rows = Module.objects.bulk_create(
+            Module(course=course, title=f'Module {order}', order=order)
+            for course in course_rows for order in range(modules)
+        )
+        lesson_rows = Lesson.objects.bulk_create(
+            Lesson(module=module, course_id=module.course_id, title=f'Lesson {order}', content_type='TEXT', order=order)
+            for module in module_rows for order in range(lessons)
+        )
+        student_rows = User.objects.bulk_create(
+            User(username=f'plan_audit_{index}', email=f'plan_audit_{index}@example.com', role='STUDENT', password='!')
+            for index in range(students)
+        )
+        enrollment_rows = Enrollment.objects.bulk_create(
+            Enrollment(student=student, course=course_rows[(index + offset) % courses])
+            for index, student in enumerate(student_rows) for offset in range(min(enrollments, courses))
+        )
+        lessons_by_course = {}
+        for lesson in lesson_rows:
+            lessons_by_course.setdefault(lesson.course_id, []).append(lesson)
+        progress_rows = LessonProgress.objects.bulk_create(
+            (
+                LessonProgress(enrollment=enrollment, course_id=enrollment.course_id, lesson=lesson, completed_at=now)
+                for index, enrollment in enumerate(enrollment_rows)
+                for lesson in lessons_by_course[enrollment.course_id][:index % (modules * lessons)]
+            ),
+            batch_size=5000,
+        )
+        Certificate.objects.bulk_create(
+            Certificate(enrollment=enrollment) for enrollment in enrollment_rows[::10]
+        )
+        # bulk_create skipped the search signal
+        SearchServices.update_vectors(Course, instructor=instructor)
+        SearchServices.update_vectors(Module, course__instructor=instructor)
+        SearchServices.update_vectors(Lesson, course__instructor=instructor)
+        with connection.cursor() as cursor:
+            for model in (User, Course, Module, Lesson, Enrollment, LessonProgress, Certificate):
+                cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
+        return {
+            'courses': len(course_rows), 'lessons': len(lesson_rows), 'students': len(student_rows),
+            'enrollments': len(enrollment_rows), 'progress': len(progress_rows),
+        }
+
+    @staticmethod
+    def explain(sql):
+        """EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) of `sql`, which is executed; returns the top-level plan document."""
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}')
+            (plan,) = cursor.fetchone()
+        return (json.loads(plan) if isinstance(plan, str) else plan)[0]
+
+    @staticmethod
+    def nodes(plan, limited=False):
+        """
+        (node, limited) for every node of the plan tree, where `limited` tells that a Limit
+        above the node stopped it early, so its actual rows fall short of the estimate by design.
+        """
+        yield plan, limited
+        limited = limited or plan['Node Type'] == 'Limit'
+        for child in plan.get('Plans', ()):
+            yield from PlanAuditServices.nodes(child, limited)
+
+    @staticmethod
+    def findings(plan, min_rows=None):
+        """Findings for one plan tree, in plan order."""
+        min_rows = PlanAuditServices.min_rows if min_rows is None else min_rows
+        findings = []
+        for node, limited in PlanAuditServices.nodes(plan):
+            loops = node.get('Actual Loops', 1) or 1
+            actual = node.get('Actual Rows', 0) * loops
+            if node['Node Type'] == 'Seq Scan':
+                removed = node.get('Rows Removed by Filter', 0) * loops
+                scanned = actual + removed
+                if scanned >= min_rows:
+                    finding = {'kind': 'seq_scan', 'relation': node['Relation Name'], 'rows_scanned': scanned}
+                    if 'Filter' in node and actual <= scanned * PlanAuditServices.selectivity:
+                        finding = {**finding, 'kind': 'missing_index', 'filter': node['Filter']}
+                    findings.append(finding)
+            estimated = node.get('Plan Rows', 0) * loops
+            if not limited and max(estimated, actual) >= min_rows / 10 and \
+                    max(estimated, actual) > PlanAuditServices.estimate_ratio * max(min(estimated, actual), 1):
+                findings.append({
+                    'kind': 'row_estimate', 'node': node['Node Type'], 'relation': node.get('Relation Name'),
+                    'estimated': estimated, 'actual': actual,
+                })
+        return findings
+
+    @staticmethod
+    def audit(calls, min_rows=None):
+        """
+        The report entry of every statement of every named call, named `<call>#<n>`. The
+        statements of a call are replayed in order, so each is explained against the rows
+        written by the ones before it, and the replay is rolled back. A statement that fails
+        again on replay, like the enroll INSERT its unique constraint rejects, is reported
+        with its error instead of a plan.
+        """
+        report = {}
+        for name, call in calls.items():
+            statements = PlanAuditServices.capture(call)
+            with transaction.atomic():
+                for index, sql in enumerate(statements, start=1):
+                    try:
+                        with transaction.atomic():
+                            result = PlanAuditServices.explain(sql)
+                    except DatabaseError as exc:
+                        report[f'{name}#{index}'] = {
+                            'sql': sql, 'error': str(exc).splitlines()[0], 'plan': [], 'execution_ms': 0,
+                            'planning_ms': 0, 'shared_hit_blocks': 0, 'shared_read_blocks': 0, 'findings': [],
+                        }
+                        continue
+                    plan = result['Plan']
+                    report[f'{name}#{index}'] = {
+                        'sql': sql,
+                        'plan': [
+                            f"{node['Node Type']}" + (f" on {node['Relation Name']}" if 'Relation Name' in node else '')
+                            + (f" using {node['Index Name']}" if 'Index Name' in node else '')
+                            for node, _ in PlanAuditServices.nodes(plan)
+                        ],
+                        'execution_ms': round(result.get('Execution Time', 0), 3),
+                        'planning_ms': round(result.get('Planning Time', 0), 3),
+                        'shared_hit_blocks': plan.get('Shared Hit Blocks', 0),
+                        'shared_read_blocks': plan.get('Shared Read Blocks', 0),
+                        'findings': PlanAuditServices.findings(plan, min_rows),
+                    }
+                transaction.set_rollback(True)
+        return report
+
+    @staticmethod
+    def finding_key(finding):
+        # identifies a finding across releases regardless of row counts
+        return (finding['kind'], finding.get('relation'), finding.get('node'), finding.get('filter'))
+
+    @staticmethod
+    def compare(previous, current):
+        """
+        Per query: findings that appeared or disappeared since `previous`, and the
+        execution time ratio. Queries missing from either report are listed as such.
+        """
+        changes = {}
+        for name in sorted(set(previous) | set(current)):
+            if name not in current or name not in previous:
+                changes[name] = {'status': 'removed' if name not in current else 'added'}
+                continue
+            before = {PlanAuditServices.finding_key(item) for item in previous[name]['findings']}
+            after = {PlanAuditServices.finding_key(item) for item in current[name]['findings']}
+            old_time = previous[name]['execution_ms']
+            changes[name] = {
+                'new': sorted(after - before, key=str),
+                'resolved': sorted(before - after, key=str),
+                'time_ratio': round(current[name]['execution_ms'] / old_time, 2) if old_time else None,
+            }
+        return changes
@@ -0,0 +1,53 @@
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from course_manager.models.course import Course
+from course_manager.models.enrollment import Enrollment, LessonProgress
+from course_manager.models.lesson import Lesson
+
+
+class ProgressCounterServices:
+    """
+    Recomputes the denormalized progress counters from the source tables.
+
+    Each batch is a single UPDATE whose new value is a correlated COUNT, so a
+    concurrent F() increment from the signals is never lost: it either is
+    already visible to the count or is applied on top of the rebuilt value.
+    """
+
+    @staticmethod
+    def _count_subquery(queryset, group_by):
+        counts = queryset.filter(**{group_by: OuterRef('pk')}).order_by().values(group_by).annotate(
+            total=Count('pk')
+        ).values('total')
+        return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+    @staticmethod
+    def _rebuild_in_batches(queryset, batch_size, **updates):
+        processed = 0
+        last_pk = 0
+        while True:
+            pks = list(queryset.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                return processed
+            with transaction.atomic():
+                queryset.filter(pk__in=pks).update(**updates)
+            processed += len(pks)
+            last_pk = pks[-1]
+
+    @staticmethod
+    def rebuild_course_counters(batch_size=500):
+        """Recompute Course.lesson_count; returns the number of courses processed."""
+        lesson_count = ProgressCounterServices._count_subquery(Lesson.objects.all(), 'course')
+        return ProgressCounterServices._rebuild_in_batches(
+            Course.objects.all(), batch_size, lesson_count=lesson_count
+        )
+
+    @staticmethod
+    def rebuild_enrollment_counters(batch_size=1000):
+        """Recompute Enrollment.completed_lesson_count; returns the number of enrollments processed."""
+        completed_lesson_count = ProgressCounterServices._count_subquery(LessonProgress.objects.all(), 'enrollment')
+        return ProgressCounterServices._rebuild_in_batches(
+            Enrollment.objects.all(), batch_size, completed_lesson_count=completed_lesson_count
+        )
@@ -0,0 +1,73 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import F, Value
+
+from course_manager.models.course import Course
+from course_manager.models.lesson import Lesson
+from course_manager.models.module import Module
+
+
+class SearchServices:
+    """
+    Full-text search over published courses, modules and lessons.
+
+    Each model keeps a weighted `search_vector` (title A, body B) that is
+    refreshed in the database after every save and matched through its GIN
+    index, so only matching rows are ranked.
+    """
+    config = 'english'
+    # model: ((field, weight), ...)
+    documents = {
+        Course: (('title', 'A'), ('description', 'B')),
+        Module: (('title', 'A'), ('description', 'B')),
+        Lesson: (('title', 'A'), ('content', 'B')),
+    }
+    kinds = ('course', 'module', 'lesson')
+
+    @staticmethod
+    def vector(model):
+        """The weighted SearchVector expression for `model`'s document fields."""
+        vector = None
+        for field, weight in SearchServices.documents[model]:
+            part = SearchVector(field, weight=weight, config=SearchServices.config)
+            vector = part if vector is None else vector + part
+        return vector
+
+    @staticmethod
+    def update_vectors(model, **filters):
+        """Recompute search_vector for the rows of `model` matching `filters` in one UPDATE."""
+        return model.objects.filter(**filters).update(search_vector=SearchServices.vector(model))
+
+    @staticmethod
+    def rebuild_vectors(model, batch_size=1000):
+        """Recompute every search_vector of `model` in pk batches; returns the number of rows processed."""
+        processed = 0
+        last_pk = 0
+        while True:
+            pks = list(model.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                return processed
+            SearchServices.update_vectors(model, pk__in=pks)
+            processed += len(pks)
+            last_pk = pks[-1]
+
+    @staticmethod
+    def search(text, kinds=None):
+        """
+        Rows of {kind, id, title, course_pk, rank} matching `text` (web search syntax:
+        words, "phrases", OR, -excluded), best match first. Only published courses
+        and their modules and lessons are searched.
+        """
+        query = SearchQuery(text, search_type='websearch', config=SearchServices.config)
+        querysets = {
+            'course': (Course.objects.filter(is_published=True), F('id')),
+            'module': (Module.objects.filter(course__is_published=True), F('course_id')),
+            'lesson': (Lesson.objects.filter(course__is_published=True), F('course_id')),
+        }
+        results = [
+            queryset.filter(search_vector=query).order_by().values(
+                'id', 'title', kind=Value(kind), course_pk=course, rank=SearchRank(F('search_vector'), query)
+            )
+            for kind, (queryset, course) in querysets.items()
+            if not kinds or kind in kinds
+        ]
+        return results[0].union(*results[1:], all=True).order_by('-rank', 'kind', 'id')
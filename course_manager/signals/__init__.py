@@ -1,2 +1,7 @@
+from .progress_counter_signals import *
 from .certificate_signals import *
 from .course_complete_signals import *
+from .course_outline_signals import *
+from .course_funnel_signals import *
+from .search_signals import *
+from .enrolled_courses_signals import *
@@ -1,14 +1,15 @@
 from django.db.models.signals import post_save
 from django.dispatch import receiver
-from django.conf import settings
-from PIL import Image, ImageDraw, ImageFont
 from course_manager.models.certificate import Certificate
-import os
 
-from course_manager.services.certificate_services import CertificateSeriveces
+from course_manager.services.certificate_queue_services import CertificateQueueServices
 
 
 @receiver(post_save, sender=Certificate)
 def create_certificate(sender, instance, created, **kwargs):
+    """
+    Queue the certificate file for rendering by the render_certificates worker.
+    The job row is written in the same transaction as the certificate.
+    """
     if created:
-        CertificateSeriveces.generate_certificate(instance) 
+        CertificateQueueServices.enqueue(instance)
@@ -1,10 +1,7 @@
-
-
 from django.db.models.signals import post_save
 from django.dispatch import receiver
-from course_manager.models.certificate import Certificate
 from course_manager.models.enrollment import LessonProgress
-from datetime import datetime
+from course_manager.services.lesson_progress_services import LessonProgressServices
 
 
 @receiver(post_save, sender=LessonProgress)
@@ -12,11 +9,7 @@ def on_lesson_progress_save(sender, instance, created, **kwargs):
     """
     This function is called after a LessonProgress object is saved.
     It checks if the progress is 100% and if so, it generate a certificate for the user.
+    Runs after on_lesson_progress_count, inside LessonProgress.save's transaction.
     """
-    if created and instance.enrollment.course.get_progress(instance.enrollment.student) == 100:
-        instance.enrollment.completed = True
-        instance.enrollment.completed_at = datetime.now()
-        instance.enrollment.save(update_fields=['completed', 'completed_at'])
-        Certificate.objects.create(
-            enrollment=instance.enrollment,
-        )
+    if created:
+        LessonProgressServices.check_course_completion(instance.enrollment_id)
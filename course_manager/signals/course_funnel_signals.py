@@ -0,0 +1,16 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from course_manager.models.enrollment import Enrollment, LessonProgress
+from course_manager.services.course_funnel_services import CourseFunnelServices
+
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def on_enrollment_change(sender, instance, **kwargs):
+    CourseFunnelServices.version.bump(instance.course_id)
+
+
+@receiver(post_save, sender=LessonProgress)
+@receiver(post_delete, sender=LessonProgress)
+def on_lesson_progress_change(sender, instance, **kwargs):
+    CourseFunnelServices.version.bump(instance.course_id)
@@ -0,0 +1,38 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from course_manager.models.course import Course
+from course_manager.models.lesson import Lesson
+from course_manager.models.module import Module
+from course_manager.services.course_outline_services import CourseOutlineServices
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def on_course_change(sender, instance, **kwargs):
+    CourseOutlineServices.version.bump(instance.pk)
+
+
+@receiver(post_save, sender=Module)
+@receiver(post_delete, sender=Module)
+def on_module_change(sender, instance, **kwargs):
+    CourseOutlineServices.version.bump(instance.course_id)
+
+
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+def on_lesson_change(sender, instance, **kwargs):
+    CourseOutlineServices.version.bump(instance.course_id)
+
+
+@receiver(pre_save, sender=Module)
+def on_module_move(sender, instance, **kwargs):
+    """A module moved to another course also changes the outline of the course it left."""
+    if instance.moved_from_course_id is not None:
+        CourseOutlineServices.version.bump(instance.moved_from_course_id)
+
+
+@receiver(pre_save, sender=Lesson)
+def on_lesson_move(sender, instance, **kwargs):
+    """A lesson moved to a module of another course also changes the outline of the course it left."""
+    if instance.moved_from_course_id is not None:
+        CourseOutlineServices.version.bump(instance.moved_from_course_id)
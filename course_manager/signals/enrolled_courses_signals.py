@@ -0,0 +1,15 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from course_manager.models.enrollment import Enrollment
+from course_manager.services.enrolled_courses_services import EnrolledCoursesServices
+
+
+@receiver(post_save, sender=Enrollment)
+def on_enrollment_save(sender, instance, created, **kwargs):
+    if created:
+        EnrolledCoursesServices.invalidate(instance.student_id)
+
+
+@receiver(post_delete, sender=Enrollment)
+def on_enrollment_delete(sender, instance, **kwargs):
+    EnrolledCoursesServices.invalidate(instance.student_id)
@@ -0,0 +1,44 @@
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from course_manager.models.course import Course
+from course_manager.models.enrollment import Enrollment, LessonProgress
+from course_manager.models.lesson import Lesson
+
+
+@receiver(post_save, sender=Lesson)
+def on_lesson_save(sender, instance, created, **kwargs):
+    """
+    Keep Course.lesson_count in sync when a lesson is added or moved to another course.
+    Lesson.save wraps the write and these updates in one transaction.
+    """
+    if created:
+        Course.objects.filter(pk=instance.course_id).update(lesson_count=F('lesson_count') + 1)
+    elif instance.moved_from_course_id is not None:
+        Course.objects.filter(pk=instance.moved_from_course_id).update(lesson_count=Greatest(F('lesson_count') - 1, 0))
+        Course.objects.filter(pk=instance.course_id).update(lesson_count=F('lesson_count') + 1)
+
+
+@receiver(post_delete, sender=Lesson)
+def on_lesson_delete(sender, instance, **kwargs):
+    Course.objects.filter(pk=instance.course_id).update(lesson_count=Greatest(F('lesson_count') - 1, 0))
+
+
+@receiver(post_save, sender=LessonProgress)
+def on_lesson_progress_count(sender, instance, created, **kwargs):
+    """
+    Keep Enrollment.completed_lesson_count in sync when a lesson is completed.
+    Must be connected before on_lesson_progress_save, which reads the counter.
+    """
+    if created:
+        Enrollment.objects.filter(pk=instance.enrollment_id).update(
+            completed_lesson_count=F('completed_lesson_count') + 1
+        )
+
+
+@receiver(post_delete, sender=LessonProgress)
+def on_lesson_progress_delete(sender, instance, **kwargs):
+    Enrollment.objects.filter(pk=instance.enrollment_id).update(
+        completed_lesson_count=Greatest(F('completed_lesson_count') - 1, 0)
+    )
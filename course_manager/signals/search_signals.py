@@ -0,0 +1,17 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from course_manager.models.course import Course
+from course_manager.models.lesson import Lesson
+from course_manager.models.module import Module
+from course_manager.services.search_services import SearchServices
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_save, sender=Module)
+@receiver(post_save, sender=Lesson)
+def on_searchable_save(sender, instance, update_fields=None, **kwargs):
+    """Refresh the saved row's search_vector unless the save left its document fields alone."""
+    fields = {field for field, _ in SearchServices.documents[sender]}
+    if update_fields is not None and not fields.intersection(update_fields):
+        return
+    SearchServices.update_vectors(sender, pk=instance.pk)
@@ -2,10 +2,44 @@ from datetime import datetime, timezone
 import pytest
 from rest_framework.test import APIClient
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from ..models import Course, Module, Lesson, Certificate, Enrollment
 
 User = get_user_model()
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+@pytest.fixture
+def assert_query_budget(settings):
+    """
+    Returns check(viewset, action, send, grow, sizes=(1, 10)). For every size, grow(size)
+    brings the rows the action reads to `size` (one page at most), send() performs the
+    request, and the queries QueryBudgetMixin recorded must stay within
+    viewset.query_budgets[action] - so an N+1 fails at the larger size.
+    """
+    settings.QUERY_BUDGET_HEADERS = True
+
+    def check(viewset, action, send, grow, sizes=(1, 10)):
+        assert action in viewset.query_budgets, f'{viewset.__name__}.{action} has no query budget'
+        budget = viewset.query_budgets[action]
+        for size in sizes:
+            grow(size)
+            with CaptureQueriesContext(connection) as queries:
+                response = send()
+            assert response.status_code < 400, response.data
+            count = int(response['X-Query-Count'])
+            assert count <= budget, (
+                f'{viewset.__name__}.{action} ran {count} queries with {size} rows, budget is {budget}:\n'
+                + '\n'.join(query['sql'] for query in queries.captured_queries)
+            )
+    return check
+
 @pytest.fixture
 def api_client():
     return APIClient()
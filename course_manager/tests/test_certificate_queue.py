@@ -0,0 +1,161 @@
+import json
+from datetime import timedelta
+
+import pytest
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import DatabaseError
+from django.utils import timezone
+from course_manager.models import Certificate, CertificateRenderJob, Course, Enrollment
+from course_manager.services.certificate_queue_services import CertificateQueueServices
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestCertificateQueue:
+
+    def test_creating_certificate_queues_render_job(self, certificate):
+        """Test that a new certificate is queued instead of rendered inline"""
+        certificate.refresh_from_db()
+        assert certificate.status == Certificate.Status.PENDING
+        assert not certificate.certificate_file
+        assert CertificateRenderJob.objects.filter(certificate=certificate).count() == 1
+
+    @patch('course_manager.services.certificate_queue_services.CertificateSeriveces.generate_certificate')
+    def test_worker_renders_queued_certificate(self, mock_generate, certificate):
+        """Test that the worker renders the certificate and removes the job"""
+        call_command('render_certificates', workers=0, once=True)
+
+        mock_generate.assert_called_once()
+        certificate.refresh_from_db()
+        assert certificate.status == Certificate.Status.READY
+        assert certificate.rendered_at is not None
+        assert not CertificateRenderJob.objects.exists()
+
+    @patch('course_manager.services.certificate_queue_services.CertificateSeriveces.generate_certificate')
+    def test_worker_retries_then_marks_failed(self, mock_generate, certificate, settings):
+        """Test that a failing job is retried and the certificate is marked failed when out of attempts"""
+        settings.CERTIFICATE_RENDER_MAX_ATTEMPTS = 2
+        settings.CERTIFICATE_RENDER_RETRY_DELAY = 0
+        mock_generate.side_effect = OSError('disk full')
+
+        call_command('render_certificates', workers=0, once=True)
+
+        assert mock_generate.call_count == 2
+        certificate.refresh_from_db()
+        assert certificate.status == Certificate.Status.FAILED
+        job = CertificateRenderJob.objects.get(certificate=certificate)
+        assert job.attempts == 2
+        assert 'disk full' in job.last_error
+
+    @patch('course_manager.services.certificate_queue_services.CertificateSeriveces.generate_certificate')
+    def test_ready_status_rolls_back_with_job_delete(self, mock_generate, certificate):
+        """Test that a certificate is not left ready when its job could not be removed"""
+        (job_id,) = CertificateQueueServices.claim_jobs(1)
+
+        with patch.object(CertificateRenderJob, 'delete', side_effect=DatabaseError('connection lost')):
+            with pytest.raises(DatabaseError):
+                CertificateQueueServices.render(job_id)
+
+        certificate.refresh_from_db()
+        assert certificate.status == Certificate.Status.RENDERING
+        assert certificate.rendered_at is None
+
+    @patch('course_manager.services.certificate_queue_services.CertificateSeriveces.generate_certificate')
+    def test_worker_survives_deleted_enrollments(self, mock_generate, certificate, course, settings):
+        """Test that jobs whose enrollment is deleted after the claim or during rendering don't stop the worker"""
+        settings.CERTIFICATE_RENDER_RETRY_DELAY = 0
+        others = []
+        for index in range(2):
+            student = User.objects.create_user(username=f'other{index}', email=f'other{index}@example.com', password='x')
+            enrollment = Enrollment.objects.create(student=student, course=course, completed=True, completed_at=timezone.now())
+            others.append(Certificate.objects.create(enrollment=enrollment))
+        claim_jobs = CertificateQueueServices.claim_jobs
+
+        def claim_then_delete(limit):
+            job_ids = claim_jobs(limit)
+            Enrollment.objects.filter(certificate=certificate).delete()
+            return job_ids
+
+        def delete_while_rendering(rendered):
+            if rendered.pk == others[0].pk:
+                Enrollment.objects.filter(certificate=rendered).delete()
+        mock_generate.side_effect = delete_while_rendering
+
+        with patch.object(CertificateQueueServices, 'claim_jobs', side_effect=claim_then_delete):
+            call_command('render_certificates', workers=0, once=True)
+
+        assert list(Certificate.objects.values_list('pk', 'status')) == [(others[1].pk, Certificate.Status.READY)]
+        assert not CertificateRenderJob.objects.exists()
+
+    def test_stale_job_without_attempts_left_is_failed(self, certificate, settings):
+        """Test that a job whose worker died during the final attempt fails instead of staying locked"""
+        CertificateRenderJob.objects.filter(certificate=certificate).update(
+            attempts=settings.CERTIFICATE_RENDER_MAX_ATTEMPTS,
+            locked_at=timezone.now() - timedelta(seconds=settings.CERTIFICATE_RENDER_LOCK_TIMEOUT + 1),
+        )
+        Certificate.objects.filter(pk=certificate.pk).update(status=Certificate.Status.RENDERING)
+
+        assert CertificateQueueServices.claim_jobs(10) == []
+
+        certificate.refresh_from_db()
+        assert certificate.status == Certificate.Status.FAILED
+        job = CertificateRenderJob.objects.get(certificate=certificate)
+        assert job.locked_at is None
+        assert job.last_error
+
+
+@pytest.mark.django_db
+class TestRegenerateCertificates:
+
+    @pytest.fixture
+    def certificates(self, course, instructor):
+        other_course = Course.objects.create(title='Other Course', description='Other', instructor=instructor)
+        certificates = []
+        for index in range(3):
+            student = User.objects.create_user(
+                username=f'student{index}', email=f'student{index}@example.com', password='testpass123'
+            )
+            for target in (course, other_course):
+                enrollment = Enrollment.objects.create(
+                    student=student, course=target, completed=True, completed_at=timezone.now()
+                )
+                certificates.append(Certificate.objects.create(enrollment=enrollment))
+        return certificates
+
+    @patch('course_manager.services.certificate_queue_services.CertificateSeriveces.generate_certificate')
+    def test_regenerates_certificates_of_course(self, mock_generate, certificates, course, tmp_path):
+        """Test that only the filtered course is regenerated and the checkpoint is removed"""
+        checkpoint = tmp_path / 'checkpoint.json'
+        call_command('regenerate_certificates', course=[course.id], workers=0, chunk_size=2, checkpoint=str(checkpoint))
+
+        regenerated = {call.args[0].id for call in mock_generate.call_args_list}
+        assert regenerated == {c.id for c in certificates if c.enrollment.course_id == course.id}
+        assert not checkpoint.exists()
+        assert set(Certificate.objects.filter(id__in=regenerated).values_list('status', flat=True)) == {
+            Certificate.Status.READY
+        }
+
+    @patch('course_manager.services.certificate_queue_services.CertificateSeriveces.generate_certificate')
+    def test_resumes_from_checkpoint(self, mock_generate, certificates, tmp_path):
+        """Test that an interrupted run continues after the last checkpointed certificate"""
+        ordered = sorted(c.id for c in certificates)
+        checkpoint = tmp_path / 'checkpoint.json'
+        checkpoint.write_text(json.dumps({
+            'filters': {'courses': [], 'issued_from': None, 'issued_to': None},
+            'last_pk': ordered[3],
+            'done': 4,
+            'failed': [],
+        }))
+
+        call_command('regenerate_certificates', all=True, workers=0, checkpoint=str(checkpoint))
+
+        assert [call.args[0].id for call in mock_generate.call_args_list] == ordered[4:]
+
+    def test_requires_a_filter(self, tmp_path):
+        """Test that the command refuses to regenerate everything without --all"""
+        with pytest.raises(CommandError):
+            call_command('regenerate_certificates', workers=0, checkpoint=str(tmp_path / 'checkpoint.json'))
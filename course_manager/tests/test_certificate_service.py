@@ -1,13 +1,21 @@
 import pytest
 import os
 from unittest.mock import patch, MagicMock
-from PIL import Image, ImageDraw
+from PIL import Image, ImageDraw, ImageFont
 from django.conf import settings
 from datetime import datetime
 from course_manager.services.certificate_services import CertificateSeriveces
 from course_manager.models import Certificate
 
 
+@pytest.fixture(autouse=True)
+def clear_render_cache():
+    # fonts and the base layer are cached per process; don't leak mocks between tests
+    CertificateSeriveces.clear_cache()
+    yield
+    CertificateSeriveces.clear_cache()
+
+
 @pytest.mark.django_db
 class TestCertificateService:
     
@@ -19,6 +27,7 @@ class TestCertificateService:
         # Setup mocks
         mock_image_instance = MagicMock()
         mock_image.new.return_value = mock_image_instance
+        mock_image_instance.copy.return_value = mock_image_instance
         
         mock_draw_instance = MagicMock()
         mock_draw.Draw.return_value = mock_draw_instance
@@ -102,4 +111,43 @@ class TestCertificateService:
             
             # Check file naming convention
             expected_filename = f'certificates/{certificate.enrollment.student.id}_{certificate.enrollment.course.id}_certificate.pdf'
-            assert certificate.certificate_file.name == expected_filename 
+            assert certificate.certificate_file.name == expected_filename
+
+    def test_base_layer_is_cached(self):
+        """Test that fonts and the static base layer are built once per process"""
+        with patch.object(ImageFont, 'truetype', wraps=ImageFont.truetype) as mock_truetype:
+            first = CertificateSeriveces.base_layer()
+            font_loads = mock_truetype.call_count
+            second = CertificateSeriveces.base_layer()
+            CertificateSeriveces.load_fonts()
+
+        assert first is second
+        assert font_loads > 0
+        assert mock_truetype.call_count == font_loads
+
+    def test_render_does_not_modify_base_layer(self):
+        """Test that per-certificate text is drawn on a copy of the base layer"""
+        base = CertificateSeriveces.base_layer()
+        before = base.tobytes()
+        image = CertificateSeriveces.render_certificate('Test Student', 'Test Course', datetime(2023, 5, 15))
+
+        assert image is not base
+        assert image.size == base.size
+        assert base.tobytes() == before
+        assert image.tobytes() != before
+
+    def test_vector_renderer_writes_small_pdf(self, certificate, settings, tmp_path):
+        """Test that the vector renderer writes a compact PDF when selected through settings"""
+        settings.CERTIFICATE_RENDERER = 'vector'
+        settings.MEDIA_ROOT = str(tmp_path)
+        certificate.enrollment.completed_at = datetime(2023, 5, 15)
+        certificate.enrollment.save()
+
+        with patch('course_manager.services.certificate_services.Image') as mock_image:
+            CertificateSeriveces.generate_certificate(certificate)
+
+        mock_image.new.assert_not_called()
+        with open(os.path.join(tmp_path, certificate.certificate_file.name), 'rb') as pdf:
+            content = pdf.read()
+        assert content.startswith(b'%PDF')
+        assert len(content) < 100 * 1024
@@ -1,7 +1,21 @@
+import csv
+import io
+import json
+from datetime import timedelta
+
 import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
-from ..models import Course, Enrollment
+from ..models import Certificate, Course, Enrollment, Lesson, LessonProgress, Module
+from ..serializers.course import CourseSerializer
+from ..serializers.prefetch import prefetch_plan
+from ..services.course_funnel_services import CourseFunnelServices
+from ..services.course_outline_services import CourseOutlineServices
+from ..views.course import CourseViewSet
 
 @pytest.mark.django_db
 class TestCourseAPI:
@@ -30,3 +44,376 @@ class TestCourseAPI:
         response = api_client.post(url)
         assert response.status_code == status.HTTP_201_CREATED
         assert Enrollment.objects.filter(student=student, course=course).exists() 
+
+
+@pytest.mark.django_db
+class TestCourseProgressAnnotation:
+    def test_list_reports_progress_for_enrolled_courses(self, api_client, course, lesson, enrollment, student):
+        LessonProgress.objects.create(enrollment=enrollment, lesson=lesson)
+        Course.objects.create(title='Other Course', description='Other', instructor=course.instructor, is_published=True)
+        api_client.force_authenticate(user=student)
+        response = api_client.get(reverse('course-list'))
+        assert response.status_code == status.HTTP_200_OK
+        progress = {item['id']: item['progress'] for item in response.data['results']}
+        assert progress[course.id] == 100
+        assert list(progress.values()).count(None) == 1
+
+    def test_list_query_count_is_constant(self, api_client, instructor, student):
+        def list_query_count():
+            with CaptureQueriesContext(connection) as queries:
+                response = api_client.get(reverse('course-list'))
+            assert response.status_code == status.HTTP_200_OK
+            return len(queries)
+
+        api_client.force_authenticate(user=student)
+        course = Course.objects.create(title='Course 0', description='Description', instructor=instructor)
+        Enrollment.objects.create(student=student, course=course)
+        single_page = list_query_count()
+
+        for index in range(1, 10):
+            course = Course.objects.create(title=f'Course {index}', description='Description', instructor=instructor)
+            Enrollment.objects.create(student=student, course=course)
+        assert list_query_count() == single_page
+
+
+@pytest.mark.django_db
+class TestCompletedLessonsContext:
+    def test_retrieve_marks_completed_lessons(self, api_client, course, module, lesson, enrollment, student):
+        other_lesson = Lesson.objects.create(module=module, title='Other Lesson', content_type='TEXT', order=2)
+        LessonProgress.objects.create(enrollment=enrollment, lesson=lesson)
+        api_client.force_authenticate(user=student)
+        response = api_client.get(reverse('course-detail', args=[course.id]))
+        assert response.status_code == status.HTTP_200_OK
+        completed = {item['id']: item['completed'] for item in response.data['modules'][0]['lessons']}
+        assert completed == {lesson.id: True, other_lesson.id: False}
+
+    def test_retrieve_query_count_ignores_lesson_count(self, api_client, course, module, enrollment, student):
+        def retrieve_query_count():
+            with CaptureQueriesContext(connection) as queries:
+                response = api_client.get(reverse('course-detail', args=[course.id]))
+            assert response.status_code == status.HTTP_200_OK
+            return len(queries)
+
+        api_client.force_authenticate(user=student)
+        lesson = Lesson.objects.create(module=module, title='Lesson 1', content_type='TEXT', order=1)
+        LessonProgress.objects.create(enrollment=enrollment, lesson=lesson)
+        single_lesson = retrieve_query_count()
+
+        for order in range(2, 12):
+            Lesson.objects.create(module=module, title=f'Lesson {order}', content_type='TEXT', order=order)
+        assert retrieve_query_count() == single_lesson
+
+
+@pytest.mark.django_db
+class TestCourseOutlineCache:
+    def retrieve(self, api_client, course):
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(reverse('course-detail', args=[course.id]))
+        assert response.status_code == status.HTTP_200_OK
+        return response, len(queries)
+
+    def test_second_retrieve_skips_module_and_lesson_queries(self, api_client, course, module, lesson, student):
+        api_client.force_authenticate(user=student)
+        first, cold_queries = self.retrieve(api_client, course)
+        second, warm_queries = self.retrieve(api_client, course)
+        assert second.data['modules'] == first.data['modules']
+        assert warm_queries == cold_queries - 2
+
+    def test_lesson_change_invalidates_outline(self, api_client, course, module, lesson, student):
+        api_client.force_authenticate(user=student)
+        self.retrieve(api_client, course)
+
+        lesson.title = 'Renamed Lesson'
+        lesson.save()
+        Lesson.objects.create(module=module, title='New Lesson', content_type='TEXT', order=2)
+
+        response, _ = self.retrieve(api_client, course)
+        titles = [item['title'] for item in response.data['modules'][0]['lessons']]
+        assert titles == ['Renamed Lesson', 'New Lesson']
+
+    def test_outline_read_before_commit_is_not_served_after(
+        self, course, module, lesson, django_capture_on_commit_callbacks, django_assert_num_queries
+    ):
+        """Test that an outline cached while the write was uncommitted misses once the write commits"""
+        with django_capture_on_commit_callbacks(execute=True):
+            with transaction.atomic():
+                lesson.title = 'Renamed Lesson'
+                lesson.save()
+                # a reader in another transaction would cache the pre-commit outline here
+                CourseOutlineServices.get_outline(course)
+                read_version = CourseOutlineServices.version.get(course.id)
+
+        assert CourseOutlineServices.version.get(course.id) != read_version
+        with django_assert_num_queries(2):
+            CourseOutlineServices.get_outline(course)
+
+    def test_completed_flags_are_per_user(self, api_client, course, module, lesson, enrollment, student, instructor):
+        LessonProgress.objects.create(enrollment=enrollment, lesson=lesson)
+
+        api_client.force_authenticate(user=student)
+        response, _ = self.retrieve(api_client, course)
+        assert response.data['modules'][0]['lessons'][0]['completed'] is True
+
+        api_client.force_authenticate(user=instructor)
+        response, _ = self.retrieve(api_client, course)
+        assert response.data['modules'][0]['lessons'][0]['completed'] is False
+
+
+@pytest.mark.django_db
+class TestCoursePrefetchPlan:
+
+    def build(self, course, modules, lessons):
+        # created in reverse so only an explicit ordering returns them by `order`
+        for module_order in reversed(range(modules)):
+            module = Module.objects.create(course=course, title=f'Module {module_order}', order=module_order)
+            for lesson_order in reversed(range(lessons)):
+                Lesson.objects.create(module=module, title=f'Lesson {lesson_order}', content_type='TEXT', order=lesson_order)
+
+    def test_plan_follows_serializer_fields(self):
+        """Test that nested module and lesson serializers become ordered prefetches and excluded fields are deferred"""
+        queryset = prefetch_plan(CourseSerializer(), Course.objects.all())
+
+        (modules,) = queryset._prefetch_related_lookups
+        assert modules.prefetch_through == 'modules'
+        assert modules.queryset.query.order_by == ('order', 'pk')
+        (lessons,) = modules.queryset._prefetch_related_lookups
+        assert lessons.prefetch_through == 'lessons'
+        assert lessons.queryset.query.order_by == ('order', 'pk')
+        assert queryset.query.deferred_loading == ({'search_vector'}, True)
+
+    def test_list_returns_nested_rows_in_order(self, api_client, course, student):
+        """Test that listed courses nest modules and lessons by `order`"""
+        self.build(course, modules=3, lessons=2)
+        api_client.force_authenticate(user=student)
+
+        modules = api_client.get(reverse('course-list')).data['results'][0]['modules']
+
+        assert [item['order'] for item in modules] == [0, 1, 2]
+        assert [item['order'] for item in modules[0]['lessons']] == [0, 1]
+
+    def test_detail_query_count_does_not_grow(self, api_client, instructor, student):
+        """Test that a cold course detail costs the same queries for one lesson or fifty"""
+        api_client.force_authenticate(user=student)
+        counts = []
+        for index, (modules, lessons) in enumerate(((1, 1), (5, 10))):
+            course = Course.objects.create(title=f'Plan {index}', description='Plan', instructor=instructor, is_published=True)
+            self.build(course, modules, lessons)
+            with CaptureQueriesContext(connection) as queries:
+                response = api_client.get(reverse('course-detail', args=[course.id]))
+            assert len(response.data['modules']) == modules
+            counts.append(len(queries))
+        assert counts[0] == counts[1]
+
+
+@pytest.mark.django_db
+class TestCourseEnrollmentsAction:
+
+    @pytest.fixture
+    def enrollments(self, course):
+        now = timezone.now()
+        enrollments = []
+        for index in range(12):
+            user = get_user_model().objects.create_user(
+                username=f'roster_{index}', email=f'roster{index}@example.com', password='testpass123', role='STUDENT'
+            )
+            enrollment = Enrollment.objects.create(student=user, course=course, completed=index % 3 == 0)
+            Enrollment.objects.filter(pk=enrollment.pk).update(enrolled_at=now - timedelta(days=12 - index))
+            enrollments.append(enrollment)
+        return enrollments
+
+    def test_enrollments_are_paginated(self, api_client, instructor, course, enrollments):
+        """Test that the roster is paginated in enrollment order with the student embedded"""
+        api_client.force_authenticate(user=instructor)
+        url = reverse('course-enrollments', args=[course.id])
+        response = api_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['count'] == 12
+        assert [item['id'] for item in response.data['results']] == [item.id for item in enrollments[:10]]
+        assert response.data['results'][0]['student']['email'] == 'roster0@example.com'
+
+        response = api_client.get(url, {'page': 2})
+        assert [item['id'] for item in response.data['results']] == [item.id for item in enrollments[10:]]
+
+    def test_enrollments_filters(self, api_client, instructor, course, enrollments):
+        """Test filtering the roster by completion and by an enrolled_at range"""
+        api_client.force_authenticate(user=instructor)
+        url = reverse('course-enrollments', args=[course.id])
+
+        response = api_client.get(url, {'completed': 'true'})
+        assert [item['id'] for item in response.data['results']] == [item.id for item in enrollments[::3]]
+
+        since = (timezone.now() - timedelta(days=3, hours=12)).isoformat()
+        until = (timezone.now() - timedelta(days=1, hours=12)).isoformat()
+        response = api_client.get(url, {'enrolled_after': since, 'enrolled_before': until})
+        assert [item['id'] for item in response.data['results']] == [enrollments[9].id, enrollments[10].id]
+
+    def test_enrollments_rejects_bad_filters(self, api_client, instructor, course):
+        """Test that malformed filter values are rejected"""
+        api_client.force_authenticate(user=instructor)
+        response = api_client.get(reverse('course-enrollments', args=[course.id]), {'enrolled_after': 'yesterday'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestProgressExport:
+
+    @pytest.fixture
+    def progress(self, course, module, lesson, enrollment):
+        Lesson.objects.create(module=module, title='Lesson 2', content_type='TEXT', order=2)
+        LessonProgress.objects.create(enrollment=enrollment, lesson=lesson)
+        other = get_user_model().objects.create_user(
+            username='finisher', email='finisher@example.com', password='testpass123', role='STUDENT'
+        )
+        finished = Enrollment.objects.create(student=other, course=course)
+        for item in Lesson.objects.filter(module=module):
+            LessonProgress.objects.create(enrollment=finished, lesson=item)
+        return enrollment, Enrollment.objects.get(pk=finished.pk)
+
+    def test_csv_export(self, api_client, instructor, course, progress):
+        """Test that the CSV export streams one row per enrollment with progress and certificate"""
+        enrollment, finished = progress
+        api_client.force_authenticate(user=instructor)
+        response = api_client.get(reverse('course-export-progress', args=[course.id]))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        assert response['Content-Type'] == 'text/csv'
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        assert [row['student_email'] for row in rows] == ['student@example.com', 'finisher@example.com']
+        assert rows[0]['completed_lessons'] == '1'
+        assert rows[0]['progress_percent'] == '50.0'
+        assert rows[0]['certificate_issued_at'] == ''
+        assert rows[1]['progress_percent'] == '100.0'
+        assert rows[1]['completed_at'] == finished.completed_at.isoformat()
+        assert rows[1]['certificate_issued_at'] == Certificate.objects.get(enrollment=finished).issued_at.isoformat()
+
+    def test_ndjson_export(self, api_client, instructor, course, progress):
+        """Test that the NDJSON export carries the same rows"""
+        api_client.force_authenticate(user=instructor)
+        response = api_client.get(reverse('course-export-progress', args=[course.id]), {'output': 'ndjson'})
+
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        assert [row['completed_lessons'] for row in rows] == [1, 2]
+        assert rows[0]['student_name'] == 'Test Student'
+        assert rows[0]['certificate_issued_at'] is None
+
+    def test_export_reads_rows_with_one_query(self, api_client, instructor, course, progress):
+        """Test that streaming the rows runs a single joined query whatever the number of enrollments"""
+        api_client.force_authenticate(user=instructor)
+        response = api_client.get(reverse('course-export-progress', args=[course.id]), {'output': 'ndjson'})
+        with CaptureQueriesContext(connection) as queries:
+            b''.join(response.streaming_content)
+        assert len(queries) == 1
+
+    def test_streamed_queries_count_towards_the_budget(self, api_client, instructor, course, progress,
+                                                        monkeypatch, caplog):
+        """Test that the queries run while the export streams are checked against its budget once it is consumed"""
+        monkeypatch.setitem(CourseViewSet.query_budgets, 'export_progress', 1)
+        api_client.force_authenticate(user=instructor)
+        response = api_client.get(reverse('course-export-progress', args=[course.id]))
+        assert 'over its budget' not in caplog.text
+
+        b''.join(response.streaming_content)
+        assert 'CourseViewSet.export_progress ran 2 queries, over its budget of 1' in caplog.text
+
+    def test_export_is_for_the_course_instructor(self, api_client, student, course):
+        """Test that students cannot export course progress"""
+        api_client.force_authenticate(user=student)
+        response = api_client.get(reverse('course-export-progress', args=[course.id]))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+class TestCourseFunnel:
+
+    @pytest.fixture
+    def lessons(self, course, module, lesson):
+        second_module = Module.objects.create(course=course, title='Module 2', order=2)
+        return [
+            lesson,
+            Lesson.objects.create(module=module, title='Lesson 2', content_type='TEXT', order=2),
+            Lesson.objects.create(module=second_module, title='Lesson 3', content_type='TEXT', order=1),
+        ]
+
+    def enroll(self, course, index, completed_lessons):
+        user = get_user_model().objects.create_user(
+            username=f'funnel_{index}', email=f'funnel{index}@example.com', password='testpass123', role='STUDENT'
+        )
+        enrollment = Enrollment.objects.create(student=user, course=course)
+        for item in completed_lessons:
+            LessonProgress.objects.create(enrollment=enrollment, lesson=item)
+        return enrollment
+
+    def test_funnel_counts_completions_per_lesson(self, api_client, instructor, course, lessons):
+        """Test that the funnel lists every lesson in order with its completion count"""
+        self.enroll(course, 1, lessons)
+        self.enroll(course, 2, lessons[:2])
+        self.enroll(course, 3, lessons[:1])
+        self.enroll(course, 4, [])
+
+        api_client.force_authenticate(user=instructor)
+        response = api_client.get(reverse('course-funnel', args=[course.id]))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['enrolled'] == 4
+        assert [(item['lesson'], item['completed']) for item in response.data['lessons']] == [
+            (lessons[0].id, 3), (lessons[1].id, 2), (lessons[2].id, 1)
+        ]
+        assert response.data['lessons'][0]['completion_rate'] == 75.0
+
+    def test_funnel_is_cached_until_next_progress_write(self, api_client, instructor, course, lessons):
+        """Test that a cached funnel is served without SQL and refreshed after a completion"""
+        enrollment = self.enroll(course, 1, lessons[:1])
+        api_client.force_authenticate(user=instructor)
+        url = reverse('course-funnel', args=[course.id])
+        api_client.get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            api_client.get(url)
+        assert len(queries) == 1  # the course, for the permission check
+
+        LessonProgress.objects.create(enrollment=enrollment, lesson=lessons[1])
+        response = api_client.get(url)
+        assert response.data['lessons'][1]['completed'] == 1
+
+    def test_funnel_read_before_commit_is_not_served_after(
+        self, course, lessons, enrollment, django_capture_on_commit_callbacks, django_assert_num_queries
+    ):
+        """Test that a funnel cached while a completion was uncommitted misses once it commits"""
+        with django_capture_on_commit_callbacks(execute=True):
+            with transaction.atomic():
+                LessonProgress.objects.create(enrollment=enrollment, lesson=lessons[0])
+                # a reader in another transaction would cache the pre-commit funnel here
+                CourseFunnelServices.get_funnel(course)
+                read_version = CourseFunnelServices.version.get(course.id)
+
+        assert CourseFunnelServices.version.get(course.id) != read_version
+        with django_assert_num_queries(2):
+            CourseFunnelServices.get_funnel(course)
+
+    def test_funnel_refreshes_after_bulk_writes(self, api_client, instructor, student, course, lessons, enrollment):
+        """Test that the batch completion and enrollment import paths, which skip signals, refresh the funnel"""
+        api_client.force_authenticate(user=instructor)
+        url = reverse('course-funnel', args=[course.id])
+        assert api_client.get(url).data['enrolled'] == 1
+
+        api_client.force_authenticate(user=student)
+        api_client.put(reverse('course-complete-lessons', args=[course.id]), {'lessons': [lessons[2].id]}, format='json')
+        api_client.force_authenticate(user=instructor)
+        assert api_client.get(url).data['lessons'][2]['completed'] == 1
+
+        other = get_user_model().objects.create_user(
+            username='imported', email='imported@example.com', password='testpass123', role='STUDENT'
+        )
+        response = api_client.post(
+            reverse('course-import-enrollments', args=[course.id]), {'emails': [other.email]}, format='json'
+        )
+        b''.join(response.streaming_content)
+        assert api_client.get(url).data['enrolled'] == 2
+
+    def test_funnel_is_for_the_course_instructor(self, api_client, student, course):
+        """Test that students cannot read the funnel"""
+        api_client.force_authenticate(user=student)
+        response = api_client.get(reverse('course-funnel', args=[course.id]))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
@@ -1,5 +1,8 @@
 import pytest
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 from course_manager.models import Course, Enrollment, Module, Lesson, LessonProgress
 
 User = get_user_model()
@@ -112,4 +115,64 @@ class TestCourseModel:
         progress = course.get_progress(student)
         
         # Assert progress is 100%
-        assert progress == 100.0 
+        assert progress == 100.0
+
+
+@pytest.mark.django_db
+class TestDenormalizedCourse:
+
+    def test_lesson_copies_module_course(self, course, module, lesson):
+        """Test that a lesson stores its module's course"""
+        assert Lesson.objects.get(pk=lesson.pk).course_id == course.id
+
+    def test_moving_module_moves_lessons(self, instructor, module, lesson):
+        """Test that moving a module to another course updates its lessons' course"""
+        other = Course.objects.create(title='Other', description='Other', instructor=instructor)
+        module.course = other
+        module.save()
+        assert Lesson.objects.get(pk=lesson.pk).course_id == other.id
+
+    def test_moves_carry_lesson_counts(self, course, instructor, module, lesson):
+        """Test that moving a module or a lesson to another course moves its share of Course.lesson_count"""
+        Lesson.objects.create(module=module, title='Lesson 2', content_type='TEXT', order=2)
+        other = Course.objects.create(title='Other', description='Other', instructor=instructor)
+        module.course = other
+        module.save()
+        course.refresh_from_db()
+        other.refresh_from_db()
+        assert (course.lesson_count, other.lesson_count) == (0, 2)
+
+        back = Module.objects.create(course=course, title='Back', order=2)
+        lesson.module = back
+        lesson.save()
+        course.refresh_from_db()
+        other.refresh_from_db()
+        assert (course.lesson_count, other.lesson_count) == (1, 1)
+
+        module.title = 'Renamed'
+        module.save()
+        other.refresh_from_db()
+        assert other.lesson_count == 1
+
+    def test_progress_copies_enrollment_course(self, api_client, course, module, lesson, enrollment, student):
+        """Test that progress rows written by save, the single and the batch completion carry the course"""
+        second = Lesson.objects.create(module=module, title='Lesson 2', content_type='TEXT', order=2)
+        third = Lesson.objects.create(module=module, title='Lesson 3', content_type='TEXT', order=3)
+        Lesson.objects.create(module=module, title='Lesson 4', content_type='TEXT', order=4)
+        LessonProgress.objects.create(enrollment=enrollment, lesson=lesson)
+        api_client.force_authenticate(user=student)
+        api_client.put(reverse('lesson-complete', args=[second.id]))
+        api_client.put(reverse('course-complete-lessons', args=[course.id]), {'lessons': [third.id]}, format='json')
+
+        assert list(LessonProgress.objects.values_list('course_id', flat=True)) == [course.id] * 3
+
+    def test_student_lesson_list_filters_one_table(self, api_client, course, module, lesson, enrollment, student):
+        """Test that a student's lesson list filters by course without joining modules"""
+        api_client.force_authenticate(user=student)
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(reverse('lesson-list'))
+
+        assert [item['id'] for item in response.data['results']] == [lesson.id]
+        lesson_queries = [query['sql'] for query in queries.captured_queries if 'FROM "course_manager_lesson"' in query['sql']]
+        assert lesson_queries and not any('course_manager_module' in sql for sql in lesson_queries)
+
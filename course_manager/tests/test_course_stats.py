@@ -0,0 +1,103 @@
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from course_manager.models import CourseDailyStats, Enrollment, LessonProgress, Certificate
+from course_manager.services.course_stats_services import CourseStatsServices
+
+DAY_1 = datetime(2024, 3, 1, 10, tzinfo=dt_timezone.utc)
+DAY_2 = datetime(2024, 3, 2, 10, tzinfo=dt_timezone.utc)
+
+
+@pytest.mark.django_db
+class TestCourseDailyStats:
+
+    def enroll(self, course, index, at):
+        user = get_user_model().objects.create_user(
+            username=f'stats_{index}', email=f'stats{index}@example.com', password='testpass123', role='STUDENT'
+        )
+        enrollment = Enrollment.objects.create(student=user, course=course)
+        Enrollment.objects.filter(pk=enrollment.pk).update(enrolled_at=at)
+        return enrollment
+
+    def complete(self, enrollment, lesson, at):
+        LessonProgress.objects.create(enrollment=enrollment, lesson=lesson, completed_at=at)
+
+    def stats(self, course):
+        return {
+            row.date: (row.enrollments, row.lesson_completions, row.certificates_issued)
+            for row in CourseDailyStats.objects.filter(course=course)
+        }
+
+    def test_roll_up_counts_per_day(self, course, lesson):
+        """Test that a roll-up counts enrollments, completions and certificates per course and day"""
+        first = self.enroll(course, 1, DAY_1)
+        second = self.enroll(course, 2, DAY_1)
+        self.enroll(course, 3, DAY_2)
+        self.complete(first, lesson, DAY_1)
+        self.complete(second, lesson, DAY_2)
+        certificate = Certificate.objects.get(enrollment=first)
+        Certificate.objects.filter(pk=certificate.pk).update(issued_at=DAY_2)
+
+        CourseStatsServices.roll_up(until=DAY_2 + timedelta(days=1))
+
+        stats = self.stats(course)
+        assert stats[date(2024, 3, 1)] == (2, 1, 0)
+        assert stats[date(2024, 3, 2)] == (1, 1, 1)
+
+    def test_incremental_runs_are_idempotent(self, course, lesson):
+        """Test that repeated runs recompute the open day instead of counting rows twice"""
+        first = self.enroll(course, 1, DAY_1)
+        CourseStatsServices.roll_up(until=DAY_1 + timedelta(hours=1))
+        CourseStatsServices.roll_up(until=DAY_1 + timedelta(hours=1))
+        assert self.stats(course)[date(2024, 3, 1)] == (1, 0, 0)
+
+        self.enroll(course, 2, DAY_1 + timedelta(hours=2))
+        self.complete(first, lesson, DAY_2)
+        CourseStatsServices.roll_up(until=DAY_1 + timedelta(hours=3))
+        assert self.stats(course) == {date(2024, 3, 1): (2, 0, 0)}
+
+        CourseStatsServices.roll_up(until=DAY_2 + timedelta(hours=1))
+        assert self.stats(course)[date(2024, 3, 1)] == (2, 0, 0)
+        assert self.stats(course)[date(2024, 3, 2)][1] == 1
+
+    def test_rebuild_command_recomputes_from_scratch(self, course):
+        """Test that --rebuild drops drifted rollups and recomputes them"""
+        self.enroll(course, 1, DAY_1)
+        CourseStatsServices.roll_up(until=DAY_2)
+        CourseDailyStats.objects.update(enrollments=9)
+
+        call_command('rollup_course_stats', rebuild=True, lag=0)
+
+        assert self.stats(course)[date(2024, 3, 1)] == (1, 0, 0)
+
+    def test_daily_stats_endpoint(self, api_client, instructor, course):
+        """Test that the endpoint returns the days and totals in the requested range"""
+        self.enroll(course, 1, DAY_1)
+        self.enroll(course, 2, DAY_2)
+        CourseStatsServices.roll_up(until=DAY_2 + timedelta(days=1))
+
+        api_client.force_authenticate(user=instructor)
+        response = api_client.get(
+            reverse('course-daily-stats', args=[course.id]), {'since': '2024-03-02', 'until': '2024-03-31'}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['totals'] == {'enrollments': 1, 'lesson_completions': 0, 'certificates_issued': 0}
+        assert [item['date'] for item in response.data['days']] == ['2024-03-02']
+
+    def test_daily_stats_rejects_inverted_range(self, api_client, instructor, course):
+        """Test that since after until is a bad request"""
+        api_client.force_authenticate(user=instructor)
+        response = api_client.get(
+            reverse('course-daily-stats', args=[course.id]), {'since': '2024-03-02', 'until': '2024-03-01'}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_daily_stats_requires_course_instructor(self, api_client, student, course):
+        """Test that students cannot read the daily stats"""
+        api_client.force_authenticate(user=student)
+        response = api_client.get(reverse('course-daily-stats', args=[course.id]))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
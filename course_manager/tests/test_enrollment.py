@@ -1,7 +1,21 @@
+import io
+import json
+
 import pytest
 from django.urls import reverse
 from rest_framework import status
-from course_manager.models import Enrollment, LessonProgress
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from course_manager.models import Certificate, Enrollment, Lesson, LessonProgress
+from course_manager.services.enrolled_courses_services import EnrolledCoursesServices
+from course_manager.services.enrollment_import_services import EnrollmentImportServices
+
+User = get_user_model()
 
 @pytest.mark.django_db
 class TestEnrollmentAPI:
@@ -129,4 +143,209 @@ class TestEnrollmentAPI:
         # Verify enrollment is now marked as completed
         enrollment.refresh_from_db()
         assert enrollment.completed == True
-        assert enrollment.completed_at is not None 
+        assert enrollment.completed_at is not None
+
+
+@pytest.mark.django_db
+class TestCourseCompletionDetection:
+
+    def test_lessons_added_after_start_raise_the_target(self, enrollment, module, lesson):
+        """Test that a course with a lesson added mid-way completes only when the new lesson is done"""
+        second = Lesson.objects.create(module=module, title='Lesson 2', content_type='TEXT', order=2)
+        LessonProgress.objects.create(enrollment=enrollment, lesson=lesson)
+        third = Lesson.objects.create(module=module, title='Lesson 3', content_type='TEXT', order=3)
+
+        LessonProgress.objects.create(enrollment=enrollment, lesson=second)
+        enrollment.refresh_from_db()
+        assert not enrollment.completed
+
+        LessonProgress.objects.create(enrollment=enrollment, lesson=third)
+        enrollment.refresh_from_db()
+        assert enrollment.completed
+        assert Certificate.objects.filter(enrollment=enrollment).count() == 1
+
+    def test_completed_enrollment_keeps_single_certificate(self, enrollment, module, lesson):
+        """Test that completing a lesson added after course completion does not issue a second certificate"""
+        LessonProgress.objects.create(enrollment=enrollment, lesson=lesson)
+        completed_at = Enrollment.objects.get(pk=enrollment.pk).completed_at
+        new_lesson = Lesson.objects.create(module=module, title='Lesson 2', content_type='TEXT', order=2)
+
+        LessonProgress.objects.create(enrollment=enrollment, lesson=new_lesson)
+
+        enrollment.refresh_from_db()
+        assert enrollment.completed
+        assert enrollment.completed_at == completed_at
+        assert Certificate.objects.filter(enrollment=enrollment).count() == 1
+
+    def test_completion_check_does_not_grow_with_lessons(self, enrollment, module):
+        """Test that recording progress runs the same queries for a short and a long course"""
+        def queries_for_progress(count):
+            lessons = [
+                Lesson.objects.create(module=module, title='Lesson', content_type='TEXT', order=module.lessons.count() + 1)
+                for _ in range(count)
+            ]
+            LessonProgress.objects.bulk_create(
+                LessonProgress(enrollment=enrollment, course_id=enrollment.course_id, lesson=item) for item in lessons[:-2]
+            )
+            with CaptureQueriesContext(connection) as queries:
+                LessonProgress.objects.create(enrollment=enrollment, lesson=lessons[-2])
+            return len(queries)
+
+        assert queries_for_progress(3) == queries_for_progress(30)
+
+
+@pytest.mark.django_db
+class TestEnrollmentImport:
+
+    @pytest.fixture
+    def students(self):
+        return [
+            User.objects.create_user(
+                username=f'import_student_{index}', email=f'import{index}@example.com',
+                password='testpass123', role='STUDENT'
+            )
+            for index in range(3)
+        ]
+
+    def read_progress(self, response):
+        return [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+
+    def test_import_json_emails(self, api_client, instructor, course, students, student):
+        """Test that an instructor can import a JSON list of emails and gets the totals"""
+        Enrollment.objects.create(student=student, course=course)
+        api_client.force_authenticate(user=instructor)
+        url = reverse('course-import-enrollments', args=[course.id])
+        emails = [item.email for item in students] + [student.email, 'nobody@example.com', instructor.email, '', students[0].email]
+        response = api_client.post(url, {'emails': emails}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert self.read_progress(response)[-1] == {
+            'processed': 8, 'created': 3, 'existing': 1, 'unknown': 2, 'skipped': 2
+        }
+        assert Enrollment.objects.filter(course=course).count() == 4
+
+    def test_import_csv_file(self, api_client, instructor, course, students):
+        """Test that a CSV upload with an email column enrolls the listed students"""
+        api_client.force_authenticate(user=instructor)
+        url = reverse('course-import-enrollments', args=[course.id])
+        upload = SimpleUploadedFile(
+            'cohort.csv', f'name,email\nA,{students[0].email}\nB,{students[1].email}\n'.encode(), content_type='text/csv'
+        )
+        response = api_client.post(url, {'file': upload}, format='multipart')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert self.read_progress(response)[-1]['created'] == 2
+        assert set(Enrollment.objects.filter(course=course).values_list('student', flat=True)) == {
+            students[0].id, students[1].id
+        }
+
+    def test_import_rejects_invalid_json_file(self, api_client, instructor, course):
+        """Test that an unreadable file is rejected before any enrollment is written"""
+        api_client.force_authenticate(user=instructor)
+        url = reverse('course-import-enrollments', args=[course.id])
+        upload = SimpleUploadedFile('cohort.json', b'{"emails": ', content_type='application/json')
+        response = api_client.post(url, {'file': upload}, format='multipart')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_import_requires_course_owner(self, api_client, course, students, student):
+        """Test that students and other instructors cannot import enrollments"""
+        other_instructor = User.objects.create_user(
+            username='other_instructor', email='other_instructor@example.com', password='testpass123', role='INSTRUCTOR'
+        )
+        url = reverse('course-import-enrollments', args=[course.id])
+        for user in (student, other_instructor):
+            api_client.force_authenticate(user=user)
+            response = api_client.post(url, {'emails': [students[0].email]}, format='json')
+            assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert not Enrollment.objects.exists()
+
+    def test_batches_use_constant_queries(self, course, students):
+        """Test that each batch costs the same number of queries whatever its size"""
+        with CaptureQueriesContext(connection) as queries:
+            list(EnrollmentImportServices.import_emails(course, [students[0].email]))
+        single = len(queries)
+        with CaptureQueriesContext(connection) as queries:
+            list(EnrollmentImportServices.import_emails(course, [item.email for item in students[1:]]))
+        assert len(queries) == single
+
+    def test_command_streams_progress(self, course, students, tmp_path):
+        """Test that the management command imports in batches and reports every batch"""
+        path = tmp_path / 'cohort.csv'
+        path.write_text('\n'.join(item.email for item in students) + '\nnobody@example.com\n')
+
+        output = io.StringIO()
+        call_command('import_enrollments', course.id, str(path), batch_size=2, stdout=output)
+
+        lines = output.getvalue().splitlines()
+        assert lines[0].startswith('2 processed: 2 created')
+        assert lines[1].startswith('4 processed: 3 created, 0 existing, 1 unknown')
+        assert Enrollment.objects.filter(course=course).count() == 3
+
+    def test_emails_match_regardless_of_case(self, course, students):
+        """Test that emails are matched and de-duplicated case-insensitively"""
+        emails = [students[0].email.upper(), students[0].email, f' {students[1].email.title()} ']
+        totals = list(EnrollmentImportServices.import_emails(course, emails))[-1]
+
+        assert totals == {'processed': 3, 'created': 2, 'existing': 0, 'unknown': 0, 'skipped': 1}
+        assert Enrollment.objects.filter(course=course).count() == 2
+
+    def test_created_counts_inserted_rows(self, course, students):
+        """Test that students enrolled before the insert are reported as existing, not created"""
+        Enrollment.objects.bulk_create([Enrollment(student=students[0], course=course)])
+        assert EnrollmentImportServices.insert_missing(course.id, [item.id for item in students]) == [
+            students[1].id, students[2].id
+        ]
+
+    def test_command_rejects_malformed_csv(self, course, tmp_path):
+        """Test that the management command reports an unreadable CSV as a command error"""
+        path = tmp_path / 'cohort.csv'
+        path.write_text('email\nbroken\0line\n')
+
+        with pytest.raises(CommandError, match='Could not read'):
+            call_command('import_enrollments', course.id, str(path), stdout=io.StringIO())
+
+
+@pytest.mark.django_db
+class TestEnrolledCoursesCache:
+
+    def test_course_ids_are_cached(self, student, course, enrollment, django_assert_num_queries):
+        """Test that a student's enrolled course ids are read from the database once"""
+        assert EnrolledCoursesServices.get_course_ids(student.pk) == {course.id}
+        with django_assert_num_queries(0):
+            assert EnrolledCoursesServices.is_enrolled(student.pk, course.id)
+
+    def test_enroll_and_unenroll_invalidate(self, api_client, student, course):
+        """Test that creating and deleting an enrollment refreshes the cached ids"""
+        assert EnrolledCoursesServices.get_course_ids(student.pk) == set()
+        api_client.force_authenticate(user=student)
+        api_client.post(reverse('course-enroll', args=[course.id]))
+        assert EnrolledCoursesServices.get_course_ids(student.pk) == {course.id}
+
+        Enrollment.objects.filter(student=student).delete()
+        assert EnrolledCoursesServices.get_course_ids(student.pk) == set()
+
+    def test_enroll_ignores_stale_cache(self, api_client, student, course, enrollment):
+        """Test that enrolling again answers 400 even when the cached ids miss the enrollment"""
+        cache.set(EnrolledCoursesServices.key(student.pk), [])
+        api_client.force_authenticate(user=student)
+        response = api_client.post(reverse('course-enroll', args=[course.id]))
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['detail'] == 'Already enrolled in this course.'
+        assert EnrolledCoursesServices.get_course_ids(student.pk) == {course.id}
+
+    def test_bulk_import_invalidates(self, student, course):
+        """Test that the enrollment import, which skips signals, refreshes the imported students' ids"""
+        assert EnrolledCoursesServices.get_course_ids(student.pk) == set()
+        list(EnrollmentImportServices.import_emails(course, [student.email]))
+        assert EnrolledCoursesServices.get_course_ids(student.pk) == {course.id}
+
+    def test_lesson_list_follows_enrollment(self, api_client, student, course, lesson):
+        """Test that a student's lesson list shows a course's lessons right after enrolling"""
+        api_client.force_authenticate(user=student)
+        assert api_client.get(reverse('lesson-list')).data['results'] == []
+
+        api_client.post(reverse('course-enroll', args=[course.id]))
+        assert [item['id'] for item in api_client.get(reverse('lesson-list')).data['results']] == [lesson.id]
+
@@ -1,8 +1,14 @@
+import statistics
+import threading
+import time
+
 import pytest
 from django.urls import reverse
 from rest_framework import status
 from django.contrib.auth import get_user_model
-from course_manager.models import Lesson, LessonProgress
+from django.db import connection
+from rest_framework.test import APIClient
+from course_manager.models import Certificate, Course, Lesson, LessonProgress
 
 User = get_user_model()
 
@@ -296,6 +302,14 @@ class TestLessonAPI:
             lesson=lesson
         ).exists()
     
+    def test_complete_returns_404_outside_enrolled_courses(self, api_client, student, lesson):
+        """Test that a lesson of a course the student is not enrolled in is reported as not found"""
+        api_client.force_authenticate(user=student)
+        response = api_client.put(reverse('lesson-complete', args=[lesson.id]))
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert response.data == api_client.put(reverse('lesson-complete', args=[lesson.id + 1000])).data
+
     def test_instructor_cannot_mark_lesson_complete(self, api_client, instructor, course, module, lesson):
         """Test that an instructor cannot mark a lesson as complete (only students can)"""
         # Set up the course and instructor
@@ -320,4 +334,134 @@ class TestLessonAPI:
         # Verify no lesson progress was created
         assert not LessonProgress.objects.filter(
             lesson=lesson
-        ).exists() 
+        ).exists()
+
+
+@pytest.mark.django_db
+class TestLessonCompletionBatch:
+
+    def test_batch_reports_per_lesson_results(self, api_client, student, course, module, lesson, enrollment, instructor):
+        """Test that the batch endpoint completes new lessons and reports the others"""
+        done = Lesson.objects.create(module=module, title='Done', content_type='TEXT', order=2)
+        pending = Lesson.objects.create(module=module, title='Pending', content_type='TEXT', order=3)
+        LessonProgress.objects.create(enrollment=enrollment, lesson=done)
+        other_course = Course.objects.create(title='Other', description='Other', instructor=instructor)
+        other_module = other_course.modules.create(title='Other Module', order=1)
+        foreign = Lesson.objects.create(module=other_module, title='Foreign', content_type='TEXT', order=1)
+
+        api_client.force_authenticate(user=student)
+        url = reverse('course-complete-lessons', args=[course.id])
+        response = api_client.put(url, {'lessons': [lesson.id, done.id, foreign.id, lesson.id]}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['results'] == [
+            {'lesson': lesson.id, 'result': 'completed'},
+            {'lesson': done.id, 'result': 'already_completed'},
+            {'lesson': foreign.id, 'result': 'not_in_course'},
+        ]
+        assert response.data['course_completed'] is False
+        assert not LessonProgress.objects.filter(lesson__in=[pending, foreign]).exists()
+        enrollment.refresh_from_db()
+        assert enrollment.completed_lesson_count == 2
+
+    def test_batch_completes_course_once(self, api_client, student, course, module, lesson, enrollment):
+        """Test that completing the last lessons in a batch completes the course and issues one certificate"""
+        second = Lesson.objects.create(module=module, title='Second', content_type='TEXT', order=2)
+
+        api_client.force_authenticate(user=student)
+        url = reverse('course-complete-lessons', args=[course.id])
+        response = api_client.put(url, {'lessons': [lesson.id, second.id]}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['course_completed'] is True
+        enrollment.refresh_from_db()
+        assert enrollment.completed
+        assert enrollment.completed_at is not None
+        assert Certificate.objects.filter(enrollment=enrollment).count() == 1
+
+    def test_batch_requires_enrollment(self, api_client, student, course, lesson):
+        """Test that a student who is not enrolled cannot complete lessons in a batch"""
+        api_client.force_authenticate(user=student)
+        url = reverse('course-complete-lessons', args=[course.id])
+        response = api_client.put(url, {'lessons': [lesson.id]}, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not LessonProgress.objects.exists()
+
+    def test_batch_returns_404_for_non_numeric_course(self, api_client, student, lesson):
+        """Test that a course id that is not a number is reported as not found"""
+        api_client.force_authenticate(user=student)
+        url = reverse('course-complete-lessons', args=['abc'])
+        response = api_client.put(url, {'lessons': [lesson.id]}, format='json')
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_batch_rejects_instructors(self, api_client, instructor, course, lesson):
+        """Test that only students can use the batch endpoint"""
+        api_client.force_authenticate(user=instructor)
+        url = reverse('course-complete-lessons', args=[course.id])
+        response = api_client.put(url, {'lessons': [lesson.id]}, format='json')
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db(transaction=True)
+class TestLessonCompletionConcurrency:
+
+    def complete_in_parallel(self, user, lesson_ids):
+        """PUT lesson-complete for every id at once from its own thread and connection"""
+        barrier = threading.Barrier(len(lesson_ids))
+        results = []
+
+        def complete(lesson_id):
+            client = APIClient()
+            client.force_authenticate(user=user)
+            barrier.wait()
+            started = time.perf_counter()
+            response = client.put(reverse('lesson-complete', args=[lesson_id]))
+            results.append((response.status_code, time.perf_counter() - started))
+            connection.close()
+
+        threads = [threading.Thread(target=complete, args=(lesson_id,)) for lesson_id in lesson_ids]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_parallel_duplicate_completions(self, student, enrollment, lesson, module, record_property):
+        """Test that parallel completions of one lesson create a single row and never error"""
+        Lesson.objects.create(module=module, title='Remaining', content_type='TEXT', order=2)
+
+        results = self.complete_in_parallel(student, [lesson.id] * 8)
+
+        codes = [code for code, _ in results]
+        latencies = sorted(elapsed for _, elapsed in results)
+        record_property('error_rate', sum(code >= 500 for code in codes) / len(codes))
+        record_property('p50_ms', round(statistics.median(latencies) * 1000, 2))
+        record_property('max_ms', round(latencies[-1] * 1000, 2))
+        assert codes.count(status.HTTP_200_OK) == 1
+        assert codes.count(status.HTTP_400_BAD_REQUEST) == 7
+        assert LessonProgress.objects.filter(enrollment=enrollment, lesson=lesson).count() == 1
+        enrollment.refresh_from_db()
+        assert enrollment.completed_lesson_count == 1
+
+    def test_parallel_distinct_completions(self, student, enrollment, lesson, module, record_property):
+        """Test that parallel completions of different lessons are all recorded and counted"""
+        lessons = [lesson] + [
+            Lesson.objects.create(module=module, title=f'Lesson {order}', content_type='TEXT', order=order)
+            for order in range(2, 9)
+        ]
+        Lesson.objects.create(module=module, title='Remaining', content_type='TEXT', order=9)
+
+        results = self.complete_in_parallel(student, [item.id for item in lessons])
+
+        codes = [code for code, _ in results]
+        latencies = sorted(elapsed for _, elapsed in results)
+        record_property('error_rate', sum(code >= 500 for code in codes) / len(codes))
+        record_property('p50_ms', round(statistics.median(latencies) * 1000, 2))
+        record_property('max_ms', round(latencies[-1] * 1000, 2))
+        assert codes == [status.HTTP_200_OK] * len(lessons)
+        enrollment.refresh_from_db()
+        assert enrollment.completed_lesson_count == len(lessons)
+
@@ -0,0 +1,84 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from course_manager.models import Course, Lesson, Module
+
+
+def walk(api_client, url, params):
+    """Follow `next` links from the first keyset page; returns the pages' result ids."""
+    pages = []
+    response = api_client.get(url, params)
+    while True:
+        assert response.status_code == status.HTTP_200_OK
+        assert 'count' not in response.data
+        pages.append([item['id'] for item in response.data['results']])
+        if response.data['next'] is None:
+            return pages
+        response = api_client.get(response.data['next'])
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+
+    def test_courses_page_by_created_at_and_id(self, api_client, instructor, student):
+        """Test that cursor pages cover every course once in (created_at, id) order, ties included"""
+        courses = [
+            Course.objects.create(title=f'Course {index}', description='Keyset', instructor=instructor)
+            for index in range(25)
+        ]
+        # half of the courses share one created_at, so the id tie-break decides their order
+        Course.objects.filter(pk__in=[item.pk for item in courses[::2]]).update(created_at=timezone.now())
+        expected = list(Course.objects.order_by('created_at', 'id').values_list('id', flat=True))
+
+        api_client.force_authenticate(user=student)
+        pages = walk(api_client, reverse('course-list'), {'pagination': 'cursor'})
+
+        assert [len(page) for page in pages] == [10, 10, 5]
+        assert sum(pages, []) == expected
+
+    def test_lessons_page_by_order_and_id(self, api_client, course, instructor):
+        """Test that lessons sharing an order across modules are paged by (order, id)"""
+        for module_order in range(4):
+            module = Module.objects.create(course=course, title=f'Module {module_order}', order=module_order)
+            for lesson_order in range(3):
+                Lesson.objects.create(module=module, title='Lesson', content_type='TEXT', order=lesson_order)
+        expected = list(Lesson.objects.order_by('order', 'id').values_list('id', flat=True))
+
+        api_client.force_authenticate(user=instructor)
+        pages = walk(api_client, reverse('lesson-list'), {'pagination': 'cursor', 'page_size': 5})
+
+        assert [len(page) for page in pages] == [5, 5, 2]
+        assert sum(pages, []) == expected
+
+    def test_deep_page_costs_the_same_as_the_first(self, api_client, instructor, student):
+        """Test that a deep keyset page runs the same queries as the first, with no COUNT"""
+        for index in range(30):
+            Course.objects.create(title=f'Course {index}', description='Keyset', instructor=instructor)
+        api_client.force_authenticate(user=student)
+        url = reverse('course-list')
+
+        with CaptureQueriesContext(connection) as first_page:
+            response = api_client.get(url, {'pagination': 'cursor'})
+        next_url = api_client.get(response.data['next']).data['next']
+        with CaptureQueriesContext(connection) as deep_page:
+            api_client.get(next_url)
+
+        assert len(deep_page) == len(first_page)
+        assert not any('COUNT(' in query['sql'] for query in deep_page.captured_queries)
+
+    def test_page_numbers_remain_the_default(self, api_client, course, student):
+        """Test that requests without a pagination choice still get numbered pages"""
+        api_client.force_authenticate(user=student)
+        response = api_client.get(reverse('course-list'))
+        assert response.data['count'] == 1
+        assert response.data['previous'] is None
+
+    def test_invalid_cursor(self, api_client, course, student):
+        """Test that a tampered cursor is rejected"""
+        api_client.force_authenticate(user=student)
+        for cursor in ('not-a-cursor', 'WyJ4Il0=', 'WyJ4IiwgIngiXQ=='):
+            response = api_client.get(reverse('course-list'), {'cursor': cursor})
+            assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -4,6 +4,7 @@ from rest_framework import status
 from rest_framework.test import APIRequestFactory
 from rest_framework.views import APIView
 from django.contrib.auth import get_user_model
+from course_manager.models import Lesson, Module
 from course_manager.views.permissions import IsInstructorOrReadOnly, IsInstructor, IsStudent
 
 User = get_user_model()
@@ -132,4 +133,44 @@ class TestCustomPermissions:
         request = factory.get('/some-url/')
         request.user = instructor
         
-        assert permission.has_permission(request, view) is False 
+        assert permission.has_permission(request, view) is False
+
+
+@pytest.mark.django_db
+class TestObjectPermissionQueries:
+
+    @pytest.fixture
+    def other_instructor(self):
+        return User.objects.create_user(
+            username='other_instructor', email='other@example.com', password='testpass123', role='INSTRUCTOR'
+        )
+
+    def test_annotated_lesson_check_runs_no_queries(self, instructor, lesson, django_assert_num_queries):
+        """Test that ownership of a lesson loaded with_instructor_id is checked without queries"""
+        request = APIRequestFactory().patch('/some-url/')
+        request.user = instructor
+        annotated = Lesson.objects.with_instructor_id().get(pk=lesson.pk)
+
+        with django_assert_num_queries(0):
+            assert IsInstructorOrReadOnly().has_object_permission(request, APIView(), annotated) is True
+
+    @pytest.mark.parametrize('url_name', ['lesson-detail', 'module-detail'])
+    def test_forbidden_write_runs_only_the_lookup(self, api_client, other_instructor, module, lesson, url_name,
+                                                  django_assert_num_queries):
+        """Test that rejecting another instructor's detail write costs only the object lookup"""
+        pk = lesson.pk if url_name == 'lesson-detail' else module.pk
+        api_client.force_authenticate(user=other_instructor)
+
+        with django_assert_num_queries(1):
+            response = api_client.patch(reverse(url_name, args=[pk]), {'title': 'Taken'}, format='json')
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_owner_can_write_lesson_and_module(self, api_client, instructor, module, lesson):
+        """Test that the owning instructor still passes the join-free check"""
+        api_client.force_authenticate(user=instructor)
+
+        assert api_client.patch(reverse('lesson-detail', args=[lesson.pk]), {'title': 'Renamed'}, format='json').status_code == status.HTTP_200_OK
+        assert api_client.patch(reverse('module-detail', args=[module.pk]), {'title': 'Renamed'}, format='json').status_code == status.HTTP_200_OK
+        assert Module.objects.get(pk=module.pk).title == 'Renamed'
+
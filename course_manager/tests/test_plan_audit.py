@@ -0,0 +1,98 @@
+import json
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from course_manager.models import Course, LessonProgress
+from course_manager.services.plan_audit_services import PlanAuditServices
+
+
+def scan(relation, rows, removed=0, estimated=None, **extra):
+    return {
+        'Node Type': 'Seq Scan', 'Relation Name': relation, 'Actual Rows': rows, 'Actual Loops': 1,
+        'Rows Removed by Filter': removed, 'Plan Rows': rows if estimated is None else estimated, **extra,
+    }
+
+
+class TestPlanFindings:
+
+    def test_selective_seq_scan_is_a_missing_index(self):
+        """Test that a sequential scan discarding most rows is reported as a missing index"""
+        findings = PlanAuditServices.findings(scan('lesson', 10, removed=20000, Filter='(module_id = 1)'))
+        assert findings == [{
+            'kind': 'missing_index', 'relation': 'lesson', 'rows_scanned': 20010, 'filter': '(module_id = 1)'
+        }]
+
+    def test_small_seq_scan_is_ignored(self):
+        """Test that sequential scans over small tables are not reported"""
+        assert PlanAuditServices.findings(scan('lesson', 10, removed=100, Filter='(module_id = 1)')) == []
+
+    def test_row_estimate_error(self):
+        """Test that an estimate off by more than the allowed ratio is reported, except under a Limit"""
+        node = {'Node Type': 'Index Scan', 'Relation Name': 'enrollment', 'Actual Rows': 5000, 'Actual Loops': 1,
+                'Plan Rows': 10}
+        assert PlanAuditServices.findings(node)[0]['kind'] == 'row_estimate'
+
+        limited = {'Node Type': 'Limit', 'Actual Rows': 10, 'Plan Rows': 10, 'Plans': [{**node, 'Actual Rows': 10, 'Plan Rows': 5000}]}
+        assert PlanAuditServices.findings(limited) == []
+
+    def test_compare_lists_new_and_resolved_findings(self):
+        """Test that comparing reports keys findings by kind and relation, not row counts"""
+        seq = {'kind': 'seq_scan', 'relation': 'lesson', 'rows_scanned': 6000}
+        previous = {'a': {'findings': [seq], 'execution_ms': 2.0}, 'b': {'findings': [], 'execution_ms': 1.0}}
+        current = {'a': {'findings': [{**seq, 'rows_scanned': 9000}], 'execution_ms': 4.0},
+                   'b': {'findings': [seq], 'execution_ms': 1.0}}
+
+        changes = PlanAuditServices.compare(previous, current)
+
+        assert changes['a'] == {'new': [], 'resolved': [], 'time_ratio': 2.0}
+        assert changes['b']['new'] == [('seq_scan', 'lesson', None, None)]
+
+
+@pytest.mark.django_db
+class TestAuditQueryPlansCommand:
+
+    def test_seeded_audit_writes_a_report(self, tmp_path):
+        """Test that the command explains the SQL of every hot call against seeded data and rolls everything back"""
+        output = tmp_path / 'plans.json'
+        call_command('audit_query_plans', seed=True, courses=3, students=20, output=str(output))
+
+        report = json.loads(output.read_text())
+        assert report['seed']['courses'] == 3
+        calls = {name.split('#')[0] for name in report['queries']}
+        assert {'course.list.student', 'course.enroll', 'lesson.list.student', 'lesson.complete',
+                'certificate.list.student', 'service.check_course_completion'} <= calls
+        assert all('findings' in entry and (entry['plan'] or entry.get('error')) for entry in report['queries'].values())
+        assert not Course.objects.exists()
+        assert not LessonProgress.objects.exists()
+
+    def test_audit_explains_the_sql_the_view_sends(self, student, course, lesson, enrollment):
+        """Test that lesson completion is audited on its INSERT ... SELECT, not on a hand-written queryset"""
+        calls = PlanAuditServices.calls(student, course.instructor, course)
+        statements = PlanAuditServices.capture(calls['lesson.complete'])
+
+        assert any(sql.startswith('INSERT INTO course_manager_lessonprogress') for sql in statements)
+        assert not LessonProgress.objects.exists()
+
+    def test_statement_failing_on_replay_is_reported(self, student, course, lesson, enrollment):
+        """Test that the enroll INSERT the unique constraint rejects is reported with its error, not raised"""
+        calls = PlanAuditServices.calls(student, course.instructor, course)
+        report = PlanAuditServices.audit({'course.enroll': calls['course.enroll']})
+
+        failed = [entry for entry in report.values() if 'error' in entry]
+        assert len(failed) == 1
+        assert failed[0]['sql'].startswith('INSERT INTO "course_manager_enrollment"')
+        assert 'duplicate key' in failed[0]['error']
+        assert all(entry['plan'] for entry in report.values() if 'error' not in entry)
+
+    def test_fail_on_new_findings(self, tmp_path):
+        """Test that --fail-on-new errors when a finding appears since the previous report"""
+        previous = tmp_path / 'previous.json'
+        call_command('audit_query_plans', seed=True, courses=3, students=20, min_rows=0, output=str(previous))
+        report = json.loads(previous.read_text())
+        for entry in report['queries'].values():
+            entry['findings'] = []
+        previous.write_text(json.dumps(report))
+
+        with pytest.raises(CommandError, match='new plan findings'):
+            call_command('audit_query_plans', seed=True, courses=3, students=20, min_rows=0,
+                         compare=str(previous), fail_on_new=True)
@@ -0,0 +1,65 @@
+import pytest
+from django.core.management import call_command
+from course_manager.models import Course, Enrollment, Lesson, LessonProgress
+
+
+@pytest.mark.django_db
+class TestProgressCounters:
+
+    def test_lesson_count_follows_lessons(self, course, module):
+        """Test that Course.lesson_count is maintained on lesson create and delete"""
+        lesson1 = Lesson.objects.create(module=module, title='Lesson 1', content_type='TEXT', order=1)
+        Lesson.objects.create(module=module, title='Lesson 2', content_type='TEXT', order=2)
+        course.refresh_from_db()
+        assert course.lesson_count == 2
+
+        lesson1.delete()
+        course.refresh_from_db()
+        assert course.lesson_count == 1
+
+    def test_completed_lesson_count_follows_progress(self, enrollment, lesson):
+        """Test that Enrollment.completed_lesson_count is maintained on progress create and delete"""
+        progress = LessonProgress.objects.create(enrollment=enrollment, lesson=lesson)
+        enrollment.refresh_from_db()
+        assert enrollment.completed_lesson_count == 1
+
+        progress.delete()
+        enrollment.refresh_from_db()
+        assert enrollment.completed_lesson_count == 0
+
+    def test_deleting_lesson_decrements_progress(self, enrollment, lesson):
+        """Test that cascaded progress deletes keep the enrollment counter in sync"""
+        LessonProgress.objects.create(enrollment=enrollment, lesson=lesson)
+        lesson.delete()
+        enrollment.refresh_from_db()
+        enrollment.course.refresh_from_db()
+        assert enrollment.completed_lesson_count == 0
+        assert enrollment.course.lesson_count == 0
+
+    def test_stale_instance_save_keeps_counter(self, course, module):
+        """Test that saving a stale Course instance does not overwrite lesson_count"""
+        Lesson.objects.create(module=module, title='Lesson 1', content_type='TEXT', order=1)
+        course.title = 'Renamed'
+        course.save()
+        course.refresh_from_db()
+        assert course.title == 'Renamed'
+        assert course.lesson_count == 1
+
+    def test_get_progress_is_single_query(self, course, enrollment, lesson, student, django_assert_num_queries):
+        """Test that get_progress reads the counters with one query"""
+        LessonProgress.objects.create(enrollment=enrollment, lesson=lesson)
+        with django_assert_num_queries(1):
+            assert course.get_progress(student) == 100
+
+    def test_rebuild_command_repairs_drift(self, course, enrollment, lesson):
+        """Test that the rebuild command recomputes drifted counters"""
+        LessonProgress.objects.create(enrollment=enrollment, lesson=lesson)
+        Course.objects.update(lesson_count=7)
+        Enrollment.objects.update(completed_lesson_count=5)
+
+        call_command('rebuild_progress_counters', batch_size=1)
+
+        course.refresh_from_db()
+        enrollment.refresh_from_db()
+        assert course.lesson_count == 1
+        assert enrollment.completed_lesson_count == 1
@@ -0,0 +1,219 @@
+from datetime import timedelta
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from course_manager.models import Certificate, Course, CourseDailyStats, Enrollment, Lesson, LessonProgress, Module
+from course_manager.views.certificate import CertificateViewSet
+from course_manager.views.course import CourseViewSet
+from course_manager.views.lesson import LessonViewSet
+from course_manager.views.module import ModuleViewSet
+from course_manager.views.search import SearchViewSet
+
+User = get_user_model()
+
+
+def make_course(instructor, lessons=1, modules=1, title='Budget Course'):
+    course = Course.objects.create(title=title, description='Budget', instructor=instructor, is_published=True)
+    for module_order in range(modules):
+        module = Module.objects.create(course=course, title=f'Module {module_order}', order=module_order)
+        for lesson_order in range(lessons):
+            Lesson.objects.create(module=module, title=f'Lesson {lesson_order}', content_type='TEXT', order=lesson_order)
+    return course
+
+
+def make_students(count, offset=0):
+    return [
+        User.objects.create_user(
+            username=f'budget_student_{index}', email=f'budget_student_{index}@example.com',
+            password='testpass123', role='STUDENT'
+        )
+        for index in range(offset, offset + count)
+    ]
+
+
+@pytest.mark.django_db
+class TestQueryBudgetHeaders:
+
+    def test_headers_report_queries_and_budget(self, api_client, course, student, settings):
+        """Test that query count, DB time and budget are returned as headers when enabled"""
+        settings.QUERY_BUDGET_HEADERS = True
+        api_client.force_authenticate(user=student)
+        response = api_client.get(reverse('course-list'))
+        assert int(response['X-Query-Count']) > 0
+        assert float(response['X-Query-Time-Ms']) >= 0
+        assert int(response['X-Query-Budget']) == CourseViewSet.query_budgets['list']
+
+    def test_headers_hidden_when_disabled(self, api_client, course, student, settings):
+        """Test that no query headers are returned in production mode"""
+        settings.QUERY_BUDGET_HEADERS = False
+        api_client.force_authenticate(user=student)
+        response = api_client.get(reverse('course-list'))
+        assert 'X-Query-Count' not in response
+
+    def test_over_budget_action_fails_the_check(self, api_client, course, student, assert_query_budget, monkeypatch):
+        """Test that the budget check fails when an action runs more queries than declared"""
+        monkeypatch.setattr(CourseViewSet, 'query_budgets', {**CourseViewSet.query_budgets, 'list': 1})
+        api_client.force_authenticate(user=student)
+        with pytest.raises(AssertionError, match='budget is 1'):
+            assert_query_budget(CourseViewSet, 'list', lambda: api_client.get(reverse('course-list')), lambda size: None)
+
+
+@pytest.mark.django_db
+class TestQueryBudgets:
+    """Every action stays within its declared budget with one row and with a full page"""
+
+    def test_course_list(self, api_client, instructor, student, assert_query_budget):
+        def grow(size):
+            while Course.objects.count() < size:
+                Enrollment.objects.create(student=student, course=make_course(instructor))
+        api_client.force_authenticate(user=student)
+        assert_query_budget(CourseViewSet, 'list', lambda: api_client.get(reverse('course-list')), grow)
+
+    def test_course_retrieve(self, api_client, course, enrollment, student, assert_query_budget):
+        def grow(size):
+            while course.modules.count() < size:
+                module = Module.objects.create(course=course, title='Module', order=course.modules.count())
+                Lesson.objects.create(module=module, title='Lesson', content_type='TEXT', order=1)
+        api_client.force_authenticate(user=student)
+        assert_query_budget(
+            CourseViewSet, 'retrieve', lambda: api_client.get(reverse('course-detail', kwargs={'pk': course.pk})), grow
+        )
+
+    def test_course_enroll(self, api_client, instructor, student, assert_query_budget):
+        courses = []
+        def grow(size):
+            courses.append(make_course(instructor, lessons=size))
+        api_client.force_authenticate(user=student)
+        assert_query_budget(
+            CourseViewSet, 'enroll', lambda: api_client.post(reverse('course-enroll', kwargs={'pk': courses[-1].pk})), grow
+        )
+
+    def test_course_enrollments(self, api_client, course, instructor, assert_query_budget):
+        def grow(size):
+            for new_student in make_students(size - course.enrollments.count(), offset=course.enrollments.count()):
+                Enrollment.objects.create(student=new_student, course=course)
+        api_client.force_authenticate(user=instructor)
+        assert_query_budget(
+            CourseViewSet, 'enrollments',
+            lambda: api_client.get(reverse('course-enrollments', kwargs={'pk': course.pk})), grow
+        )
+
+    def test_course_complete_lessons(self, api_client, module, lesson, enrollment, student, assert_query_budget):
+        lessons = []
+        def grow(size):
+            # a batch of `size` new lessons, with the uncompleted `lesson` left over
+            lessons[:] = [
+                Lesson.objects.create(module=module, title='Lesson', content_type='TEXT', order=module.lessons.count() + 1)
+                for _ in range(size)
+            ]
+        api_client.force_authenticate(user=student)
+        assert_query_budget(
+            CourseViewSet, 'complete_lessons',
+            lambda: api_client.put(
+                reverse('course-complete-lessons', kwargs={'pk': module.course_id}),
+                {'lessons': [lesson.pk for lesson in lessons]}, format='json'
+            ),
+            grow
+        )
+
+    def test_course_funnel(self, api_client, course, module, instructor, assert_query_budget):
+        def grow(size):
+            while module.lessons.count() < size:
+                Lesson.objects.create(module=module, title='Lesson', content_type='TEXT', order=module.lessons.count())
+            for new_student in make_students(size - course.enrollments.count(), offset=course.enrollments.count()):
+                enrollment = Enrollment.objects.create(student=new_student, course=course)
+                LessonProgress.objects.create(enrollment=enrollment, lesson=module.lessons.first())
+        api_client.force_authenticate(user=instructor)
+        assert_query_budget(
+            CourseViewSet, 'funnel', lambda: api_client.get(reverse('course-funnel', kwargs={'pk': course.pk})), grow
+        )
+
+    def test_course_daily_stats(self, api_client, course, instructor, assert_query_budget):
+        def grow(size):
+            today = timezone.localdate()
+            CourseDailyStats.objects.bulk_create(
+                [CourseDailyStats(course=course, date=today - timedelta(days=day), enrollments=1) for day in range(size)],
+                ignore_conflicts=True,
+            )
+        api_client.force_authenticate(user=instructor)
+        assert_query_budget(
+            CourseViewSet, 'daily_stats',
+            lambda: api_client.get(reverse('course-daily-stats', kwargs={'pk': course.pk})), grow
+        )
+
+    def test_module_list(self, api_client, course, instructor, assert_query_budget):
+        def grow(size):
+            while course.modules.count() < size:
+                module = Module.objects.create(course=course, title='Module', order=course.modules.count())
+                Lesson.objects.create(module=module, title='Lesson', content_type='TEXT', order=1)
+        api_client.force_authenticate(user=instructor)
+        assert_query_budget(ModuleViewSet, 'list', lambda: api_client.get(reverse('module-list')), grow)
+
+    def test_module_retrieve(self, api_client, module, enrollment, student, assert_query_budget):
+        def grow(size):
+            while module.lessons.count() < size:
+                Lesson.objects.create(module=module, title='Lesson', content_type='TEXT', order=module.lessons.count())
+        api_client.force_authenticate(user=student)
+        assert_query_budget(
+            ModuleViewSet, 'retrieve', lambda: api_client.get(reverse('module-detail', kwargs={'pk': module.pk})), grow
+        )
+
+    def test_lesson_list(self, api_client, module, lesson, enrollment, student, assert_query_budget):
+        def grow(size):
+            # completed lessons next to the uncompleted `lesson`, so the course is never finished
+            while module.lessons.count() < size:
+                lesson = Lesson.objects.create(module=module, title='Lesson', content_type='TEXT', order=module.lessons.count() + 1)
+                LessonProgress.objects.create(enrollment=enrollment, lesson=lesson)
+        api_client.force_authenticate(user=student)
+        assert_query_budget(LessonViewSet, 'list', lambda: api_client.get(reverse('lesson-list')), grow)
+
+    def test_lesson_retrieve(self, api_client, lesson, enrollment, student, assert_query_budget):
+        api_client.force_authenticate(user=student)
+        assert_query_budget(
+            LessonViewSet, 'retrieve',
+            lambda: api_client.get(reverse('lesson-detail', kwargs={'pk': lesson.pk})), lambda size: None
+        )
+
+    def test_lesson_complete(self, api_client, module, lesson, enrollment, student, assert_query_budget):
+        lessons = []
+        def grow(size):
+            # `size` lessons besides the uncompleted `lesson`, all but the newest already completed
+            for lesson in lessons:
+                LessonProgress.objects.get_or_create(enrollment=enrollment, lesson=lesson)
+            while len(lessons) < size:
+                lessons.append(Lesson.objects.create(module=module, title='Lesson', content_type='TEXT', order=len(lessons) + 2))
+            for lesson in lessons[:-1]:
+                LessonProgress.objects.get_or_create(enrollment=enrollment, lesson=lesson)
+        api_client.force_authenticate(user=student)
+        assert_query_budget(
+            LessonViewSet, 'complete',
+            lambda: api_client.put(reverse('lesson-complete', kwargs={'pk': lessons[-1].pk})), grow
+        )
+
+    def test_certificate_list(self, api_client, instructor, student, assert_query_budget):
+        def grow(size):
+            while Certificate.objects.count() < size:
+                enrollment = Enrollment.objects.create(student=student, course=make_course(instructor))
+                Certificate.objects.create(enrollment=enrollment)
+        api_client.force_authenticate(user=student)
+        assert_query_budget(CertificateViewSet, 'list', lambda: api_client.get(reverse('certificate-list')), grow)
+
+    def test_certificate_retrieve(self, api_client, certificate, student, assert_query_budget):
+        api_client.force_authenticate(user=student)
+        assert_query_budget(
+            CertificateViewSet, 'retrieve',
+            lambda: api_client.get(reverse('certificate-detail', kwargs={'pk': certificate.pk})), lambda size: None
+        )
+
+    def test_search(self, api_client, instructor, assert_query_budget):
+        course = make_course(instructor, title='Searchable Course')
+        module = course.modules.get()
+
+        def grow(size):
+            while module.lessons.count() < size:
+                Lesson.objects.create(module=module, title='Searchable lesson', content_type='TEXT', order=module.lessons.count() + 1)
+        assert_query_budget(
+            SearchViewSet, 'list', lambda: api_client.get(reverse('search-list'), {'q': 'searchable'}), grow
+        )
+
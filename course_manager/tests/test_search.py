@@ -0,0 +1,71 @@
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from course_manager.models import Course, Lesson, Module
+
+
+@pytest.mark.django_db
+class TestSearch:
+
+    def search(self, api_client, **params):
+        return api_client.get(reverse('search-list'), params)
+
+    def test_search_matches_courses_modules_and_lessons(self, api_client, course, module):
+        """Test that courses, module titles and lesson text are searched and returned with their course"""
+        course.title = 'Python Basics'
+        course.save()
+        module.title = 'Python functions'
+        module.save()
+        lesson = Lesson.objects.create(
+            module=module, title='Closures', content_type='TEXT', order=1, content='Nested python functions capture variables.'
+        )
+
+        response = self.search(api_client, q='python')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert {(item['kind'], item['id']) for item in response.data['results']} == {
+            ('course', course.id), ('module', module.id), ('lesson', lesson.id)
+        }
+        assert {item['course'] for item in response.data['results']} == {course.id}
+
+    def test_title_matches_rank_above_body_matches(self, api_client, module):
+        """Test that a match in a title ranks above a match in the text"""
+        in_text = Lesson.objects.create(module=module, title='Intro', content_type='TEXT', order=1, content='About recursion.')
+        in_title = Lesson.objects.create(module=module, title='Recursion', content_type='TEXT', order=2, content='Base cases.')
+
+        results = self.search(api_client, q='recursion', kind='lesson').data['results']
+
+        assert [item['id'] for item in results] == [in_title.id, in_text.id]
+        assert results[0]['rank'] > results[1]['rank']
+
+    def test_search_skips_unpublished_courses(self, api_client, instructor):
+        """Test that unpublished courses and their lessons are not returned"""
+        draft = Course.objects.create(title='Secret Draft', description='Draft', instructor=instructor)
+        draft_module = Module.objects.create(course=draft, title='Module', order=1)
+        Lesson.objects.create(module=draft_module, title='Secret lesson', content_type='TEXT', order=1)
+
+        assert self.search(api_client, q='secret').data['results'] == []
+
+    def test_vector_follows_edits(self, api_client, lesson):
+        """Test that editing a lesson's text updates what it is found by"""
+        lesson.content = 'Generators yield values lazily.'
+        lesson.save()
+        assert [item['id'] for item in self.search(api_client, q='generators').data['results']] == [lesson.id]
+
+        lesson.content = 'Decorators wrap functions.'
+        lesson.save()
+        assert self.search(api_client, q='generators').data['results'] == []
+
+    def test_search_requires_query(self, api_client):
+        """Test that a missing query is a bad request"""
+        assert self.search(api_client).status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_rebuild_command_repairs_stale_vectors(self, api_client, lesson):
+        """Test that the rebuild command recomputes vectors left stale by a queryset update"""
+        Lesson.objects.filter(pk=lesson.pk).update(title='Iterators')
+        assert self.search(api_client, q='iterators').data['results'] == []
+
+        call_command('rebuild_search_vectors', batch_size=1)
+
+        assert [item['id'] for item in self.search(api_client, q='iterators').data['results']] == [lesson.id]
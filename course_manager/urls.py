@@ -5,6 +5,7 @@ from course_manager.views.certificate import CertificateViewSet
 from course_manager.views.course import CourseViewSet
 from course_manager.views.lesson import LessonViewSet
 from course_manager.views.module import ModuleViewSet
+from course_manager.views.search import SearchViewSet
 
 
 router = routers.DefaultRouter()
@@ -12,6 +13,7 @@ router.register('courses', CourseViewSet, basename='course')
 router.register('certificates', CertificateViewSet, basename='certificate')
 router.register('modules', ModuleViewSet, basename='module')
 router.register('lessons', LessonViewSet, basename='lesson')
+router.register('search', SearchViewSet, basename='search')
 
 
 urlpatterns = [
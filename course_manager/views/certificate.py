@@ -1,10 +1,13 @@
 from rest_framework import viewsets, permissions
 from course_manager.models.certificate import Certificate
 from course_manager.serializers.certificate import CertificateSerializer
+from course_manager.views.mixins import QueryBudgetMixin
 
-class CertificateViewSet(viewsets.ReadOnlyModelViewSet):
+class CertificateViewSet(QueryBudgetMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = CertificateSerializer
     permission_classes = [permissions.IsAuthenticated]
+    keyset_ordering = ('issued_at', 'id')
+    query_budgets = {'list': 2, 'retrieve': 1}
 
     def get_queryset(self):
         if self.request.user.role == 'INSTRUCTOR':
@@ -1,26 +1,53 @@
+import csv
+import io
+import json
+from datetime import timedelta
+
+from django.http import StreamingHttpResponse
+from django.db import IntegrityError, transaction
+from django.db.models import Sum
+from django.utils import timezone
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from account_manager.models.user import User
 from course_manager.models.course import Course
 from course_manager.models.enrollment import Enrollment
 from course_manager.serializers.course import CourseSerializer
-from course_manager.serializers.enrollment import EnrollmentSerializer
-from course_manager.views.permissions import IsInstructor, IsInstructorOrReadOnly, IsStudent
+from course_manager.serializers.prefetch import prefetch_plan
+from course_manager.serializers.enrollment import EnrollmentFilterSerializer, EnrollmentImportSerializer, EnrollmentSerializer
+from course_manager.services.enrollment_import_services import EnrollmentImportServices
+from course_manager.services.progress_export_services import ProgressExportServices
+from course_manager.services.course_funnel_services import CourseFunnelServices
+from course_manager.services.enrolled_courses_services import EnrolledCoursesServices
+from course_manager.serializers.course_stats import CourseDailyStatsSerializer, CourseStatsFilterSerializer
+from course_manager.views.permissions import IsInstructor, IsInstructorOrAdmin, IsInstructorOrReadOnly, IsStudent
+from course_manager.views.mixins import CompletedLessonsContextMixin, QueryBudgetMixin
 from course_manager.serializers.module import ModuleSerializer
+from course_manager.serializers.lesson import LessonCompletionBatchSerializer
+from course_manager.services.lesson_progress_services import LessonProgressServices
 
-class CourseViewSet(viewsets.ModelViewSet):
+class CourseViewSet(QueryBudgetMixin, CompletedLessonsContextMixin, viewsets.ModelViewSet):
     queryset = Course.objects.all()
     serializer_class = CourseSerializer
     permission_classes = [permissions.IsAuthenticated, IsInstructorOrReadOnly]
+    completed_lessons_lookup = 'course__in'
+    keyset_ordering = ('created_at', 'id')
+    # enroll: the course and the insert, plus the SAVEPOINT/RELEASE its atomic() sends inside a transaction
+    # export_progress: the course, then the one query its content streams the rows from
+    query_budgets = {'list': 5, 'retrieve': 4, 'enroll': 4, 'enrollments': 5, 'complete_lessons': 12, 'funnel': 4, 'daily_stats': 4,
+                     'export_progress': 2}
 
     def get_permissions(self):
-        if self.action in 'enroll':
+        if self.action in ('enroll', 'complete_lessons'):
             return [permissions.IsAuthenticated(), IsStudent()]
+        if self.action in ('import_enrollments', 'export_progress', 'funnel', 'daily_stats'):
+            return [permissions.IsAuthenticated(), IsInstructorOrAdmin()]
         return super().get_permissions()
 
     def check_object_permissions(self, request, obj):
-        if request.user.role == User.Role.INSTRUCTOR and obj.instructor != request.user:
+        if request.user.role == User.Role.INSTRUCTOR and obj.instructor_id != request.user.pk:
             self.permission_denied(request)
         
         if request.user.role == User.Role.STUDENT and self.action == 'enroll':
@@ -28,26 +55,41 @@ class CourseViewSet(viewsets.ModelViewSet):
         
         return super().check_object_permissions(request, obj)
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['use_outline_cache'] = self.action == 'retrieve'
+        return context
+
     def perform_create(self, serializer):
         serializer.save(instructor=self.request.user)
 
     def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ('list', 'retrieve') and self.request.user.is_authenticated:
+            queryset = queryset.with_progress(self.request.user)
+        if self.action in ('list', 'retrieve'):
+            # retrieve serializes modules from the outline cache, so its plan has no prefetches
+            queryset = prefetch_plan(self.get_serializer(), queryset)
         if self.action == 'list' and self.request.user.role == User.Role.INSTRUCTOR:
-            return super().get_queryset().filter(instructor=self.request.user)
+            return queryset.filter(instructor=self.request.user)
         elif self.action == 'enroll':
-            return super().get_queryset().filter(is_published=True)
-        return super().get_queryset()
+            return queryset.filter(is_published=True)
+        return queryset
 
 
     @action(detail=True, methods=['post'])
     def enroll(self, request, pk=None):
         course = self.get_object()
-        if Enrollment.objects.filter(student=request.user, course=course).exists():
+        # the unique constraint decides, not the cached id set, which may be stale
+        try:
+            with transaction.atomic():
+                enrollment = Enrollment.objects.create(student=request.user, course=course)
+        except IntegrityError:
+            EnrolledCoursesServices.invalidate(request.user.pk)
             return Response(
                 {'detail': 'Already enrolled in this course.'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        enrollment = Enrollment.objects.create(student=request.user, course=course)
         return Response(
             EnrollmentSerializer(enrollment).data,
             status=status.HTTP_201_CREATED
@@ -70,8 +112,117 @@ class CourseViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['get'], url_path='enrollments')
     def enrollments(self, request, pk=None):
         course = self.get_object()
-        enrollments = Enrollment.objects.filter(course=course)
-        return Response(
-            EnrollmentSerializer(enrollments, many=True).data
+        filters = EnrollmentFilterSerializer(data=request.query_params.dict())
+        if not filters.is_valid():
+            return Response(filters.errors, status=status.HTTP_400_BAD_REQUEST)
+        enrollments = Enrollment.objects.filter(course=course).select_related('student').order_by('enrolled_at', 'id')
+        if 'completed' in filters.validated_data:
+            enrollments = enrollments.filter(completed=filters.validated_data['completed'])
+        if 'enrolled_after' in filters.validated_data:
+            enrollments = enrollments.filter(enrolled_at__gte=filters.validated_data['enrolled_after'])
+        if 'enrolled_before' in filters.validated_data:
+            enrollments = enrollments.filter(enrolled_at__lt=filters.validated_data['enrolled_before'])
+        page = self.paginate_queryset(enrollments)
+        return self.get_paginated_response(EnrollmentSerializer(page, many=True).data)
+
+    @action(detail=True, methods=['get'])
+    def funnel(self, request, pk=None):
+        """Number of enrolled students who completed each lesson, in module/lesson order."""
+        course = self.get_object()
+        return Response(CourseFunnelServices.get_funnel(course))
+
+    @action(detail=True, methods=['get'], url_path='daily-stats')
+    def daily_stats(self, request, pk=None):
+        """
+        Per-day enrollments, lesson completions and certificates between `since` and `until`
+        (default: the last 30 days), read from the rollups kept by rollup_course_stats.
+        """
+        course = self.get_object()
+        filters = CourseStatsFilterSerializer(data=request.query_params.dict())
+        if not filters.is_valid():
+            return Response(filters.errors, status=status.HTTP_400_BAD_REQUEST)
+        until = filters.validated_data.get('until', timezone.localdate())
+        since = filters.validated_data.get('since', until - timedelta(days=29))
+        days = course.daily_stats.filter(date__gte=since, date__lte=until).order_by('date')
+        totals = days.aggregate(
+            enrollments=Sum('enrollments'),
+            lesson_completions=Sum('lesson_completions'),
+            certificates_issued=Sum('certificates_issued'),
+        )
+        return Response({
+            'course': course.id,
+            'since': since,
+            'until': until,
+            'totals': {field: total or 0 for field, total in totals.items()},
+            'days': CourseDailyStatsSerializer(days, many=True).data,
+        })
+
+    @action(detail=True, methods=['get'], url_path='export-progress')
+    def export_progress(self, request, pk=None):
+        """Stream every enrollment's progress as CSV (default) or NDJSON (?output=ndjson)."""
+        course = self.get_object()
+        output = request.query_params.get('output', 'csv')
+        if output == 'csv':
+            response = StreamingHttpResponse(ProgressExportServices.csv_lines(course), content_type='text/csv')
+        elif output == 'ndjson':
+            response = StreamingHttpResponse(ProgressExportServices.ndjson_lines(course), content_type='application/x-ndjson')
+        else:
+            return Response({'output': ['Expected csv or ndjson.']}, status=status.HTTP_400_BAD_REQUEST)
+        response['Content-Disposition'] = f'attachment; filename="course-{course.id}-progress.{output}"'
+        return response
+
+    @action(detail=True, methods=['post'], url_path='import-enrollments')
+    def import_enrollments(self, request, pk=None):
+        """
+        Enroll students from `emails` or from an uploaded CSV/JSON `file`, streaming the
+        running totals as one JSON line per batch.
+        """
+        course = self.get_object()
+        serializer = EnrollmentImportSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        emails = serializer.validated_data.get('emails')
+        if emails is None:
+            upload = serializer.validated_data['file']
+            file_format = serializer.validated_data.get('format') or (
+                'json' if upload.name.lower().endswith('.json') else 'csv'
+            )
+            try:
+                emails = list(EnrollmentImportServices.read_emails(
+                    io.TextIOWrapper(upload.file, encoding='utf-8-sig'), file_format
+                ))
+            except (ValueError, csv.Error) as error:
+                return Response({'file': [str(error)]}, status=status.HTTP_400_BAD_REQUEST)
+        progress = EnrollmentImportServices.import_emails(course, emails)
+        return StreamingHttpResponse(
+            (json.dumps(totals) + '\n' for totals in progress), content_type='application/x-ndjson'
         )
 
+    @action(detail=True, methods=['put'], url_path='complete-lessons')
+    def complete_lessons(self, request, pk=None):
+        serializer = LessonCompletionBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        # the course is never loaded, so reject a malformed pk the way get_object() would
+        try:
+            course_id = int(pk)
+        except ValueError:
+            raise NotFound()
+        enrollment = Enrollment.objects.select_related('course', 'student').filter(
+            course=course_id, student=request.user
+        ).first()
+        if enrollment is None:
+            return Response({'message': 'You are not enrolled in this course'}, status=status.HTTP_400_BAD_REQUEST)
+
+        lesson_ids = serializer.validated_data['lessons']
+        created, already_completed, _ = LessonProgressServices.complete_lessons(enrollment, lesson_ids)
+        results = []
+        for lesson_id in dict.fromkeys(lesson_ids):
+            if lesson_id in created:
+                result = 'completed'
+            elif lesson_id in already_completed:
+                result = 'already_completed'
+            else:
+                result = 'not_in_course'
+            results.append({'lesson': lesson_id, 'result': result})
+        return Response({'results': results, 'course_completed': enrollment.completed}, status=status.HTTP_200_OK)
@@ -5,16 +5,22 @@ from course_manager.models.lesson import Lesson
 from course_manager.models.module import Module
 from course_manager.serializers.lesson import LessonSerializer
 from course_manager.views.permissions import IsInstructorOrReadOnly, IsStudent
+from course_manager.views.mixins import CompletedLessonsContextMixin, QueryBudgetMixin
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
-from course_manager.models.enrollment import LessonProgress, Enrollment
-from django.db import transaction
+from rest_framework.exceptions import NotFound
+from course_manager.models.enrollment import LessonProgress
+from course_manager.services.lesson_progress_services import LessonProgressServices
+from course_manager.services.enrolled_courses_services import EnrolledCoursesServices
 
-class LessonViewSet(viewsets.ModelViewSet):
+class LessonViewSet(QueryBudgetMixin, CompletedLessonsContextMixin, viewsets.ModelViewSet):
     queryset = Lesson.objects.all()
     serializer_class = LessonSerializer
     permission_classes = [permissions.IsAuthenticated, IsInstructorOrReadOnly]
+    completed_lessons_lookup = 'lesson__in'
+    keyset_ordering = ('order', 'id')
+    query_budgets = {'list': 4, 'retrieve': 2, 'complete': 6}
 
     def get_permissions(self):
         if self.action == 'complete':
@@ -22,25 +28,28 @@ class LessonViewSet(viewsets.ModelViewSet):
         return super().get_permissions()
 
     def get_queryset(self):
-        if self.action == 'complete' and self.request.user.role == User.Role.STUDENT:
-            student_courses = self.request.user.courses_enrolled.values_list('course', flat=True)
-            return super().get_queryset().filter(module__course__in=student_courses)
         if self.action == 'list' and self.request.user.role == User.Role.STUDENT:
-            student_courses = self.request.user.courses_enrolled.values_list('course', flat=True)
-            return super().get_queryset().filter(module__course__in=student_courses)
+            # one cached id list instead of an enrollment subquery per request
+            student_courses = EnrolledCoursesServices.get_course_ids(self.request.user.pk)
+            return super().get_queryset().filter(course__in=student_courses)
+        if self.action != 'list':
+            return super().get_queryset().with_instructor_id()
         return super().get_queryset()
 
-    @transaction.atomic
     @action(detail=True, methods=['put'], url_path='complete', permission_classes=[IsStudent])
     def complete(self, request, pk=None):
+        # one INSERT ... ON CONFLICT resolves the enrollment and settles concurrent duplicates;
+        # the lookups below only run to explain a request that inserted nothing
         try:
-            lesson = self.get_object()
-            user = request.user
-            if LessonProgress.objects.filter(lesson=lesson, enrollment__student=user).exists():
-                return Response({'message': 'You have already completed this lesson'}, status=status.HTTP_400_BAD_REQUEST)
-            print(user)
-            enrollment = Enrollment.objects.get(course=lesson.module.course, student=user)
-            LessonProgress.objects.create(lesson=lesson, enrollment=enrollment)
+            lesson_id = int(pk)
+        except ValueError:
+            raise NotFound()
+        if LessonProgressServices.complete_lesson(request.user, lesson_id):
             return Response({'message': 'Lesson marked as complete'}, status=status.HTTP_200_OK)
-        except Enrollment.DoesNotExist:
+        if LessonProgress.objects.filter(lesson=lesson_id, enrollment__student=request.user).exists():
+            return Response({'message': 'You have already completed this lesson'}, status=status.HTTP_400_BAD_REQUEST)
+        # as before, a student only finds the lessons of their courses; anyone else finds
+        # any lesson and is told they are not enrolled
+        if request.user.role != User.Role.STUDENT and Lesson.objects.filter(pk=lesson_id).exists():
             return Response({'message': 'You are not enrolled in this course'}, status=status.HTTP_400_BAD_REQUEST)
+        raise NotFound()
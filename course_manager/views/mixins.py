@@ -0,0 +1,100 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from course_manager.models.enrollment import LessonProgress
+
+logger = logging.getLogger(__name__)
+
+
+class CompletedLessonsContextMixin:
+    """
+    Loads the requesting user's completed lesson ids for the objects being
+    serialized with one query and shares them through the serializer context,
+    so every nested LessonSerializer answers `completed` from memory.
+    """
+    # LessonProgress lookup matching the viewset's objects, e.g. 'course__in'
+    completed_lessons_lookup = None
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('context', self.get_serializer_context())
+        if args and args[0] is not None and self.request.user.is_authenticated:
+            instances = args[0] if kwargs.get('many') else [args[0]]
+            kwargs['context']['completed_lesson_ids'] = set(
+                LessonProgress.objects.filter(
+                    enrollment__student=self.request.user,
+                    **{self.completed_lessons_lookup: instances}
+                ).values_list('lesson_id', flat=True)
+            )
+        return super().get_serializer(*args, **kwargs)
+
+
+class QueryBudgetMixin:
+    """
+    Records the number of SQL queries and the total DB time of every request
+    the viewset handles. With QUERY_BUDGET_HEADERS enabled they are returned as
+    X-Query-Count / X-Query-Time-Ms (plus X-Query-Budget for actions listed in
+    `query_budgets`), and going over an action's budget is logged. The queries of a
+    streaming response's content are counted as it is consumed, towards the budget but
+    not the headers, which are sent before it.
+    """
+    # Maximum queries per action, independent of page size, e.g. {'list': 4, 'retrieve': 4}
+    query_budgets = {}
+
+    def dispatch(self, request, *args, **kwargs):
+        self.query_count = 0
+        self.query_time = 0.0
+        with self._recording():
+            response = super().dispatch(request, *args, **kwargs)
+
+        action = getattr(self, 'action', None) or request.method.lower()
+        budget = self.query_budgets.get(action)
+        if settings.QUERY_BUDGET_HEADERS:
+            response['X-Query-Count'] = self.query_count
+            response['X-Query-Time-Ms'] = f'{self.query_time * 1000:.2f}'
+            if budget is not None:
+                response['X-Query-Budget'] = budget
+        if response.streaming:
+            # the content's queries run after dispatch returns, so the headers only cover
+            # dispatch and the budget is checked once the content has been consumed
+            response.streaming_content = self._stream_recorded(response.streaming_content, action, budget)
+        else:
+            self._check_budget(action, budget)
+        return response
+
+    def _recording(self):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(self._record_query))
+        return stack
+
+    def _stream_recorded(self, content, action, budget):
+        # record around each chunk only, so no wrapper stays installed between them
+        chunks = iter(content)
+        try:
+            while True:
+                with self._recording():
+                    chunk = next(chunks, None)
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            self._check_budget(action, budget)
+
+    def _check_budget(self, action, budget):
+        if budget is not None and self.query_count > budget:
+            logger.warning(
+                '%s.%s ran %d queries, over its budget of %d',
+                type(self).__name__, action, self.query_count, budget,
+            )
+
+    def _record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_count += 1
+            self.query_time += time.perf_counter() - started
@@ -8,23 +8,26 @@ from rest_framework.decorators import action
 from course_manager.serializers.lesson import LessonSerializer
 from rest_framework.response import Response
 from course_manager.views.permissions import IsInstructor, IsInstructorOrReadOnly
+from course_manager.views.mixins import CompletedLessonsContextMixin, QueryBudgetMixin
 
-class ModuleViewSet(viewsets.ModelViewSet):
+class ModuleViewSet(QueryBudgetMixin, CompletedLessonsContextMixin, viewsets.ModelViewSet):
     queryset = Module.objects.all()
     serializer_class = ModuleSerializer
     permission_classes = [permissions.IsAuthenticated, IsInstructorOrReadOnly]
-    
+    completed_lessons_lookup = 'lesson__module__in'
+    keyset_ordering = ('order', 'id')
+    query_budgets = {'list': 5, 'retrieve': 3}
 
     def get_queryset(self):
         if self.action == 'list':
-            return Module.objects.filter(course__instructor=self.request.user)
-        return Module.objects.all()
-    
+            return Module.objects.filter(course__instructor=self.request.user).prefetch_related('lessons')
+        return Module.objects.with_instructor_id()
+
     # already implemented as Course action
     def perform_create(self, serializer):
         course_id = self.request.data.get('course')
         course = get_object_or_404(Course, pk=course_id)
-        if course.instructor != self.request.user:
+        if course.instructor_id != self.request.user.pk:
             self.permission_denied(self.request)
         serializer.save(course=course)
 
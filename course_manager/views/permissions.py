@@ -1,5 +1,16 @@
 from rest_framework import permissions
 
+
+def instructor_id_of(obj):
+    """
+    The id of the instructor owning `obj`, without a query when the id came with the
+    lookup: Course has the column, Module and Lesson querysets annotate it with
+    with_instructor_id(). Anything else falls back to loading `obj.instructor`.
+    """
+    instructor_id = getattr(obj, 'instructor_id', None)
+    return instructor_id if instructor_id is not None else obj.instructor.pk
+
+
 class IsInstructorOrReadOnly(permissions.BasePermission):
     def has_permission(self, request, view):
         if request.method in permissions.SAFE_METHODS:
@@ -9,7 +20,7 @@ class IsInstructorOrReadOnly(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method in permissions.SAFE_METHODS:
             return True
-        return obj.instructor == request.user 
+        return instructor_id_of(obj) == request.user.pk
     
 class IsInstructor(permissions.BasePermission):
     def has_permission(self, request, view):
@@ -23,3 +34,11 @@ class IsStudent(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         return True
     
+
+
+class IsInstructorOrAdmin(permissions.BasePermission):
+    def has_permission(self, request, view):
+        return request.user.role in ('INSTRUCTOR', 'ADMIN') or request.user.is_staff
+
+    def has_object_permission(self, request, view, obj):
+        return request.user.role == 'ADMIN' or request.user.is_staff or instructor_id_of(obj) == request.user.pk
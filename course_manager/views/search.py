@@ -0,0 +1,26 @@
+from rest_framework import viewsets, permissions, status
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from course_manager.serializers.search import SearchQuerySerializer, SearchResultSerializer
+from course_manager.services.search_services import SearchServices
+from course_manager.views.mixins import QueryBudgetMixin
+
+
+class SearchViewSet(QueryBudgetMixin, viewsets.GenericViewSet):
+    """
+    Ranked full-text search over published courses, modules and lessons:
+    GET /api/search/?q=<words>[&kind=course&kind=lesson][&page=N]
+    """
+    serializer_class = SearchResultSerializer
+    permission_classes = [permissions.AllowAny]
+    # results are ordered by rank, which has no keyset index
+    pagination_class = PageNumberPagination
+    query_budgets = {'list': 2}
+
+    def list(self, request):
+        params = SearchQuerySerializer(data=request.query_params)
+        if not params.is_valid():
+            return Response(params.errors, status=status.HTTP_400_BAD_REQUEST)
+        results = SearchServices.search(params.validated_data['q'], params.validated_data.get('kind'))
+        page = self.paginate_queryset(results)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
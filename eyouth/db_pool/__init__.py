@@ -0,0 +1,7 @@
+"""
+PostgreSQL backend that keeps a bounded pool of connections per process.
+
+Select it with ENGINE='eyouth.db_pool' and configure it through the POOL entry
+of OPTIONS (see eyouth.settings). Django "closes" the connection at the end of
+every request (CONN_MAX_AGE=0); this backend returns it to the pool instead.
+"""
@@ -0,0 +1,30 @@
+from django.db.backends.postgresql import base
+
+from eyouth.db_pool.pool import ConnectionPool, get_pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    PostgreSQL wrapper whose connections come from a per-process ConnectionPool.
+
+    OPTIONS['POOL'] accepts `size`, `max_lifetime`, `timeout` and `health_checks`;
+    it is not passed on to psycopg2.
+    """
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop('POOL', None)
+        return conn_params
+
+    @property
+    def pool(self):
+        key = (self.alias, self.settings_dict['NAME'])
+        return get_pool(key, lambda: ConnectionPool(**self.settings_dict['OPTIONS'].get('POOL', {})))
+
+    def get_new_connection(self, conn_params):
+        return self.pool.checkout(lambda: super(DatabaseWrapper, self).get_new_connection(conn_params))
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.checkin(self.connection)
@@ -0,0 +1,157 @@
+import os
+import threading
+import time
+from collections import deque
+
+from psycopg2 import OperationalError
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_INERROR, TRANSACTION_STATUS_INTRANS
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of DB-API connections for one database alias.
+
+    - `size` caps the open connections; callers wait up to `timeout` seconds for one.
+    - Connections older than `max_lifetime` seconds are replaced on checkout and checkin.
+    - With `health_checks`, an idle connection is pinged before it is handed out and
+      replaced if the ping fails.
+    """
+
+    def __init__(self, size=5, max_lifetime=1800, timeout=10, health_checks=True):
+        self.size = size
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.health_checks = health_checks
+        self.idle = deque()
+        self.created_at = {}
+        self.open_connections = 0
+        self.condition = threading.Condition()
+        self.stats = {
+            'checkouts': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'connects': 0,
+            'reconnects': 0,
+        }
+
+    def checkout(self, connect):
+        """Hand out an idle connection, or open one with `connect()` while below `size`."""
+        deadline = time.monotonic() + self.timeout
+        with self.condition:
+            self.stats['checkouts'] += 1
+            waited = False
+            while not self.idle and self.open_connections >= self.size:
+                remaining = deadline - time.monotonic()
+                if not waited:
+                    self.stats['waits'] += 1
+                    waited = True
+                if remaining <= 0 or not self.condition.wait(remaining):
+                    if not self.idle and self.open_connections >= self.size:
+                        self.stats['timeouts'] += 1
+                        raise OperationalError(f'connection pool exhausted after waiting {self.timeout}s')
+            connection = self.idle.pop() if self.idle else None
+            self.open_connections += connection is None
+
+        if connection is not None and self._usable(connection):
+            return connection
+        return self._open(connect, replacing=connection)
+
+    def checkin(self, connection):
+        reusable = not connection.closed and not self._expired(connection)
+        if reusable:
+            status = connection.info.transaction_status
+            if status in (TRANSACTION_STATUS_INTRANS, TRANSACTION_STATUS_INERROR):
+                try:
+                    connection.rollback()
+                except Exception:
+                    reusable = False
+            elif status != TRANSACTION_STATUS_IDLE:
+                reusable = False
+        if not reusable:
+            self._discard(connection)
+        with self.condition:
+            if reusable:
+                self.idle.append(connection)
+            else:
+                self.open_connections -= 1
+            self.condition.notify()
+
+    def close_all(self):
+        with self.condition:
+            while self.idle:
+                self._discard(self.idle.popleft())
+                self.open_connections -= 1
+
+    def metrics(self):
+        with self.condition:
+            return {
+                **self.stats,
+                'size': self.size,
+                'open': self.open_connections,
+                'idle': len(self.idle),
+                'in_use': self.open_connections - len(self.idle),
+            }
+
+    def _open(self, connect, replacing=None):
+        if replacing is not None:
+            self._discard(replacing)
+        try:
+            connection = connect()
+        except Exception:
+            with self.condition:
+                self.open_connections -= 1
+                self.condition.notify()
+            raise
+        with self.condition:
+            self.stats['reconnects' if replacing is not None else 'connects'] += 1
+        self.created_at[id(connection)] = time.monotonic()
+        return connection
+
+    def _usable(self, connection):
+        if connection.closed or self._expired(connection):
+            return False
+        if not self.health_checks:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            if not connection.autocommit:
+                connection.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _expired(self, connection):
+        created_at = self.created_at.get(id(connection))
+        return created_at is not None and time.monotonic() - created_at > self.max_lifetime
+
+    def _discard(self, connection):
+        self.created_at.pop(id(connection), None)
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+_pools_pid = os.getpid()
+
+
+def get_pool(key, factory):
+    """Return the pool registered under `key`, creating it with `factory()` on first use in this process."""
+    global _pools_pid
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            # forked: connections inherited from the parent must not be shared
+            _pools.clear()
+            _pools_pid = os.getpid()
+        if key not in _pools:
+            _pools[key] = factory()
+        return _pools[key]
+
+
+def all_metrics():
+    with _pools_lock:
+        pools = dict(_pools)
+    return {key: pool.metrics() for key, pool in pools.items()}
@@ -0,0 +1,17 @@
+import os
+
+from rest_framework import permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from eyouth.db_pool.pool import all_metrics
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def pool_metrics(request):
+    """Connection pool counters of the process that served this request."""
+    return Response({
+        'pid': os.getpid(),
+        'pools': {f'{alias}:{name}': metrics for (alias, name), metrics in all_metrics().items()},
+    })
@@ -0,0 +1,138 @@
+"""
+API pagination.
+
+Lists are paginated by page number unless the request asks for keyset
+pagination with `?pagination=cursor` (or passes a `cursor`). Keyset pages are
+found with a WHERE on the ordering key instead of OFFSET and skip the
+COUNT(*), so the cost of a page doesn't grow with its depth.
+"""
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Forward-only keyset pagination.
+
+    The ordering key is the queryset's explicit order_by, else the view's
+    `keyset_ordering`, with `id` appended when missing so the key is unique.
+    It should match an index for pages to stay constant-time. The cursor is
+    the key of the last row of the previous page.
+    """
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset, view)
+        queryset = queryset.order_by(*self.ordering)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            try:
+                queryset = queryset.filter(self.after(self.decode_cursor(cursor)))
+            except (ValueError, TypeError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        results = results[:self.page_size]
+        self.last_key = [self.field_value(results[-1], field) for field in self.ordering] if results else None
+        return results
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_ordering(self, queryset, view):
+        ordering = list(queryset.query.order_by or getattr(view, 'keyset_ordering', ()))
+        if not any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+            ordering.append('id')
+        return ordering
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.last_key))
+
+    def after(self, key):
+        """
+        Rows after `key` in ordering order: (a > x) OR (a = x AND b > y) ..., plus a
+        redundant bound on the first field so the index range starts at the cursor.
+        """
+        if len(key) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        condition = Q()
+        equal = {}
+        for field, value in zip(self.ordering, key):
+            name = field.lstrip('-')
+            direction = 'lt' if field.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{name}__{direction}': value})
+            equal[name] = value
+        first = self.ordering[0]
+        return Q(**{f"{first.lstrip('-')}__{'lte' if first.startswith('-') else 'gte'}": key[0]}) & condition
+
+    def field_value(self, obj, field):
+        name = field.lstrip('-')
+        value = getattr(obj, 'pk' if name == 'id' else name)
+        return value.isoformat() if hasattr(value, 'isoformat') else value
+
+    def encode_cursor(self, key):
+        return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (binascii.Error, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(key, list):
+            raise NotFound(self.invalid_cursor_message)
+        return key
+
+
+class SelectablePagination(PageNumberPagination):
+    """Page number pagination, switching to KeysetPagination when the request asks for it."""
+    keyset_pagination_class = KeysetPagination
+    pagination_query_param = 'pagination'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if request.query_params.get(self.pagination_query_param) == 'cursor' or \
+                self.keyset_pagination_class.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_pagination_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -110,9 +110,40 @@ DATABASES = {
         'PASSWORD': env('DB_PASSWORD'),
         'HOST': env('DB_HOST'),
         'PORT': env('DB_PORT'),
+        # Keep connections open between requests instead of reconnecting every time
+        'CONN_MAX_AGE': env.int('DB_CONN_MAX_AGE', default=60),
+        'CONN_HEALTH_CHECKS': env.bool('DB_CONN_HEALTH_CHECKS', default=True),
     }
 }
 
+# With DB_POOL_SIZE > 0 each process shares a bounded pool of connections between its
+# threads (see eyouth.db_pool); connections are returned to the pool after every request.
+DB_POOL_SIZE = env.int('DB_POOL_SIZE', default=0)
+if DB_POOL_SIZE:
+    DATABASES['default'].update({
+        'ENGINE': 'eyouth.db_pool',
+        'CONN_MAX_AGE': 0,
+        'OPTIONS': {
+            'POOL': {
+                'size': DB_POOL_SIZE,
+                'max_lifetime': env.int('DB_POOL_MAX_LIFETIME', default=1800),  # seconds
+                'timeout': env.float('DB_POOL_TIMEOUT', default=10),  # seconds to wait for a free connection
+                'health_checks': env.bool('DB_CONN_HEALTH_CHECKS', default=True),
+            },
+        },
+    })
+
+# Cache
+# Use a shared backend (e.g. CACHE_URL=redis://redis:6379/1) whenever more than one
+# process serves requests; per-process locmem caches can't see each other's invalidations.
+SHARED_CACHE = bool(env('CACHE_URL', default=''))
+CACHES = {
+    'default': env.cache('CACHE_URL') if SHARED_CACHE else env.cache_url_config('locmemcache://'),
+}
+# without a shared cache an invalidation only reaches the process that made it, so the
+# other gunicorn workers may serve an entry until it expires: keep the default timeouts short
+LOCAL_CACHE_TIMEOUT = env.int('LOCAL_CACHE_TIMEOUT', default=60)  # seconds
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -167,7 +198,8 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    # page numbers by default, keyset pages with ?pagination=cursor (see eyouth.pagination)
+    'DEFAULT_PAGINATION_CLASS': 'eyouth.pagination.SelectablePagination',
     'PAGE_SIZE': 10,
     'DEFAULT_SCHEMA_CLASS': 'rest_framework.schemas.coreapi.AutoSchema'
 }
@@ -214,9 +246,28 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 # Custom settings
 AUTH_USER_MODEL = 'account_manager.User'
 
+# Course outline cache
+COURSE_OUTLINE_CACHE_TIMEOUT = env.int('COURSE_OUTLINE_CACHE_TIMEOUT', default=60 * 60 * 24 if SHARED_CACHE else LOCAL_CACHE_TIMEOUT)  # seconds
+
+# Course funnel cache
+COURSE_FUNNEL_CACHE_TIMEOUT = env.int('COURSE_FUNNEL_CACHE_TIMEOUT', default=60 * 60 * 24 if SHARED_CACHE else LOCAL_CACHE_TIMEOUT)  # seconds
+
+# Per-student enrolled course ids cache
+ENROLLED_COURSES_CACHE_TIMEOUT = env.int('ENROLLED_COURSES_CACHE_TIMEOUT', default=60 * 60 if SHARED_CACHE else LOCAL_CACHE_TIMEOUT)  # seconds
+
+# Certificate rendering
+CERTIFICATE_RENDERER = env('CERTIFICATE_RENDERER', default='raster')  # 'raster' (Pillow bitmap) or 'vector' (reportlab)
+CERTIFICATE_RENDER_MAX_ATTEMPTS = env.int('CERTIFICATE_RENDER_MAX_ATTEMPTS', default=3)
+CERTIFICATE_RENDER_RETRY_DELAY = env.int('CERTIFICATE_RENDER_RETRY_DELAY', default=60)  # seconds, multiplied by attempt
+CERTIFICATE_RENDER_LOCK_TIMEOUT = env.int('CERTIFICATE_RENDER_LOCK_TIMEOUT', default=600)  # seconds before a claimed job is retried
+
 
 # django-allauth settings
 ACCOUNT_AUTHENTICATION_METHOD = 'email'
 ACCOUNT_EMAIL_REQUIRED = True
 ACCOUNT_EMAIL_VERIFICATION = 'none'
 ACCOUNT_USERNAME_REQUIRED = False
+
+# Per-action SQL query count and DB time response headers (course_manager.views.mixins.QueryBudgetMixin);
+# keep disabled in production
+QUERY_BUDGET_HEADERS = env.bool('QUERY_BUDGET_HEADERS', default=DEBUG)
@@ -0,0 +1,125 @@
+import pytest
+from psycopg2 import OperationalError
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_INTRANS
+from django.db import connection
+
+from eyouth.db_pool.base import DatabaseWrapper
+from eyouth.db_pool.pool import ConnectionPool
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute(self, sql):
+        if self.connection.broken:
+            raise OperationalError('server closed the connection unexpectedly')
+
+
+class FakeInfo:
+    transaction_status = TRANSACTION_STATUS_IDLE
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.autocommit = True
+        self.broken = False
+        self.rolled_back = False
+        self.info = FakeInfo()
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        self.rolled_back = True
+        self.info.transaction_status = TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+class TestConnectionPool:
+
+    def test_reuses_idle_connection(self):
+        pool = ConnectionPool(size=2)
+        first = pool.checkout(FakeConnection)
+        pool.checkin(first)
+        second = pool.checkout(FakeConnection)
+
+        assert second is first
+        metrics = pool.metrics()
+        assert metrics['checkouts'] == 2
+        assert metrics['connects'] == 1
+        assert metrics['in_use'] == 1
+
+    def test_times_out_when_exhausted(self):
+        pool = ConnectionPool(size=1, timeout=0.05)
+        pool.checkout(FakeConnection)
+
+        with pytest.raises(OperationalError):
+            pool.checkout(FakeConnection)
+        metrics = pool.metrics()
+        assert metrics['waits'] == 1
+        assert metrics['timeouts'] == 1
+
+    def test_replaces_expired_connection(self):
+        pool = ConnectionPool(size=1, max_lifetime=0)
+        first = pool.checkout(FakeConnection)
+        pool.checkin(first)
+        second = pool.checkout(FakeConnection)
+
+        assert second is not first
+        assert first.closed
+        assert pool.metrics()['open'] == 1
+
+    def test_health_check_reconnects_broken_connection(self):
+        pool = ConnectionPool(size=1)
+        first = pool.checkout(FakeConnection)
+        pool.checkin(first)
+        first.broken = True
+        second = pool.checkout(FakeConnection)
+
+        assert second is not first
+        assert pool.metrics()['reconnects'] == 1
+
+    def test_checkin_rolls_back_open_transaction(self):
+        pool = ConnectionPool(size=1)
+        conn = pool.checkout(FakeConnection)
+        conn.info.transaction_status = TRANSACTION_STATUS_INTRANS
+        pool.checkin(conn)
+
+        assert conn.rolled_back
+        assert pool.checkout(FakeConnection) is conn
+
+
+@pytest.mark.django_db
+class TestPooledBackend:
+
+    def test_close_returns_connection_to_pool(self):
+        settings_dict = {
+            **connection.settings_dict,
+            'ENGINE': 'eyouth.db_pool',
+            'OPTIONS': {'POOL': {'size': 1}},
+        }
+        wrapper = DatabaseWrapper(settings_dict, alias='pool_test')
+        try:
+            with wrapper.cursor() as cursor:
+                cursor.execute('SELECT pg_backend_pid()')
+                first_pid = cursor.fetchone()[0]
+            wrapper.close()
+            with wrapper.cursor() as cursor:
+                cursor.execute('SELECT pg_backend_pid()')
+                second_pid = cursor.fetchone()[0]
+            wrapper.close()
+
+            assert first_pid == second_pid
+            assert wrapper.pool.metrics()['connects'] == 1
+        finally:
+            wrapper.pool.close_all()
@@ -0,0 +1,7 @@
+import os
+
+bind = '0.0.0.0:8000'
+workers = int(os.environ.get('GUNICORN_WORKERS', 3))
+# Threads per worker share the worker's DB connection pool (DB_POOL_SIZE)
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))